@@ -0,0 +1,216 @@
+"""Per-request overhead of ``SpecTree.validate`` across plugins and model adapters.
+
+Every scenario is sent to a decorated endpoint and to the same handler left
+undecorated, so the difference is the cost added by spectree. Timings are the
+best of ``--repeat`` runs in ns/request, allocations are the tracemalloc peak
+in bytes/request.
+
+    python -m benchmarks --save baseline.json
+    python -m benchmarks --compare baseline.json --frameworks flask
+"""
+
+import argparse
+import contextlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from importlib import import_module
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Callable
+
+from benchmarks.apps import APPS, Send
+from benchmarks.scenarios import SIZES, Scenario, build_scenarios
+from spectree import SpecTree
+from spectree.model_adapter import (
+    get_msgspec_model_adapter,
+    get_pydantic_model_adapter,
+)
+
+#: model adapter name -> (adapter factory, module of the models)
+ADAPTERS: dict[str, tuple[Callable[[], Any], str]] = {
+    "pydantic": (get_pydantic_model_adapter, "benchmarks.pydantic_models"),
+    "msgspec": (get_msgspec_model_adapter, "benchmarks.msgspec_models"),
+}
+PARTS = ("query", "json", "form", "headers", "cookies", "resp")
+PACKAGES = ("spectree", "pydantic", "msgspec", "flask", "quart", "falcon", "starlette")
+
+
+def _versions() -> dict[str, str]:
+    versions = {"python": platform.python_version()}
+    for package in PACKAGES:
+        with contextlib.suppress(PackageNotFoundError):
+            versions[package] = version(package)
+    return versions
+
+
+def _time(send: Send, scenario: Scenario, bare: bool, number: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        send(scenario, bare)
+    return (time.perf_counter_ns() - start) / number
+
+
+def time_requests(
+    send: Send, scenario: Scenario, min_time: float, repeat: int
+) -> tuple[float, float]:
+    """Best ns/request of the decorated and the bare endpoint.
+
+    The runs of both endpoints are interleaved so that a slow phase of the
+    machine affects them alike.
+    """
+    number = 1
+    while _time(send, scenario, False, number) * number < min_time * 1e9:
+        number *= 2
+    decorated = bare = float("inf")
+    for _ in range(repeat):
+        bare = min(bare, _time(send, scenario, True, number))
+        decorated = min(decorated, _time(send, scenario, False, number))
+    return decorated, bare
+
+
+def peak_allocation(send: Send, scenario: Scenario, bare: bool, number: int) -> int:
+    """Smallest tracemalloc peak of one request, in bytes."""
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(number):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            send(scenario, bare)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return min(peaks)
+
+
+def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    results = {}
+    for framework in args.frameworks:
+        for adapter_name in args.adapters:
+            try:
+                app = APPS[framework]
+                build = getattr(import_module(app.name, app.package), app.builder)
+                adapter, models = ADAPTERS[adapter_name]
+                # `Response` keeps the validation error model of its `SpecTree`
+                scenarios = build_scenarios(
+                    import_module(models), args.sizes, args.parts
+                )
+                api = SpecTree(framework, model_adapter=adapter())
+                send = build(api, scenarios)
+            except ImportError as err:
+                print(f"skip {framework}/{adapter_name}: {err}", file=sys.stderr)
+                continue
+            for scenario in scenarios:
+                key = f"{framework}/{adapter_name}/{scenario.key}"
+                for bare in (True, False):
+                    status = send(scenario, bare)
+                    if status != 200:
+                        raise RuntimeError(f"{key} (bare={bare}) returned {status}")
+                ns, bare_ns = time_requests(send, scenario, args.min_time, args.repeat)
+                results[key] = {
+                    "ns": ns,
+                    "bare_ns": bare_ns,
+                    "overhead_ns": ns - bare_ns,
+                    "peak_bytes": peak_allocation(send, scenario, False, args.allocs),
+                    "bare_peak_bytes": peak_allocation(
+                        send, scenario, True, args.allocs
+                    ),
+                }
+                print(_format_row(key, results[key]), flush=True)
+    return results
+
+
+def _format_row(key: str, result: dict[str, float]) -> str:
+    return (
+        f"{key:<36} {result['ns']:>14,.0f} {result['bare_ns']:>14,.0f} "
+        f"{result['overhead_ns']:>14,.0f} {result['peak_bytes']:>14,} "
+        f"{result['bare_peak_bytes']:>14,}"
+    )
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Print the change of the overhead and the peak allocation per scenario.
+
+    Return the keys whose overhead grew by more than `threshold`.
+    """
+
+    def change(key: str, name: str) -> float:
+        before = baseline[key][name]
+        return (results[key][name] - before) / before if before > 0 else 0.0
+
+    keys = [key for key in results if key in baseline]
+    print(
+        f"\n{'scenario':<36} {'overhead ns':>14} {'baseline':>14} {'change':>8} "
+        f"{'peak B/req':>14} {'baseline':>14} {'change':>8}"
+    )
+    for key in keys:
+        result, before = results[key], baseline[key]
+        print(
+            f"{key:<36} {result['overhead_ns']:>14,.0f} {before['overhead_ns']:>14,.0f} "
+            f"{change(key, 'overhead_ns'):>+8.1%} {result['peak_bytes']:>14,} "
+            f"{before['peak_bytes']:>14,} {change(key, 'peak_bytes'):>+8.1%}"
+        )
+    return [key for key in keys if change(key, "overhead_ns") > threshold]
+
+
+def main(argv=None) -> int:
+    def csv(choices):
+        def parse(value):
+            values = value.split(",")
+            unknown = set(values) - set(choices)
+            if unknown:
+                raise argparse.ArgumentTypeError(f"unknown values: {unknown}")
+            return values
+
+        return parse
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--frameworks", type=csv(APPS), default=list(APPS))
+    parser.add_argument("--adapters", type=csv(ADAPTERS), default=list(ADAPTERS))
+    parser.add_argument("--sizes", type=csv(SIZES), default=list(SIZES))
+    parser.add_argument("--parts", type=csv(PARTS), default=list(PARTS))
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per timing run"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs")
+    parser.add_argument(
+        "--allocs", type=int, default=5, help="requests traced for allocations"
+    )
+    parser.add_argument("--save", metavar="PATH", help="save the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="diff against a saved run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="overhead growth reported as a regression (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'scenario':<36} {'ns/req':>14} {'bare ns/req':>14} {'overhead ns':>14} "
+        f"{'peak B/req':>14} {'bare peak B':>14}"
+    )
+    results = run(args)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({"versions": _versions(), "results": results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\noverhead regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
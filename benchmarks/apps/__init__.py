@@ -0,0 +1,33 @@
+"""In-process apps and test clients for every plugin.
+
+Each app module provides ``build(api, scenarios)``. It registers two routes
+per scenario: ``/<key>`` decorated with ``api.validate`` and ``/bare/<key>``
+with the same handler left undecorated. It returns a ``send(scenario, bare)``
+callable that issues one request through the framework's own test client and
+returns the response status code.
+"""
+
+from collections import namedtuple
+from typing import Callable
+
+from benchmarks.scenarios import Scenario
+
+Send = Callable[[Scenario, bool], int]
+
+App = namedtuple("App", ("name", "package", "builder"))
+
+#: backend name of `SpecTree` -> app module
+APPS = {
+    "flask": App(".flask_app", __name__, "build"),
+    "quart": App(".quart_app", __name__, "build"),
+    "falcon": App(".falcon_app", __name__, "build"),
+    "falcon-asgi": App(".falcon_app", __name__, "build_asgi"),
+    "starlette": App(".starlette_app", __name__, "build"),
+}
+
+
+def route_path(scenario: Scenario, bare: bool) -> str:
+    return f"/bare/{scenario.key}" if bare else f"/{scenario.key}"
+
+
+__all__ = ["APPS", "App", "Send", "route_path"]
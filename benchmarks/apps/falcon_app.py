@@ -0,0 +1,53 @@
+from falcon import App, testing
+from falcon.asgi import App as AsyncApp
+
+from benchmarks.apps import Send, route_path
+from benchmarks.scenarios import Scenario
+from spectree import SpecTree
+
+
+def _resource(api: SpecTree, scenario: Scenario, bare: bool, is_async: bool):
+    if is_async:
+
+        async def handler(self, req, resp):
+            resp.media = scenario.result
+
+    else:
+
+        def handler(self, req, resp):
+            resp.media = scenario.result
+
+    if not bare:
+        handler = api.validate(**scenario.validate_kwargs)(handler)
+    return type("Resource", (), {f"on_{scenario.method.lower()}": handler})()
+
+
+def _build(api: SpecTree, scenarios: list[Scenario], is_async: bool) -> Send:
+    app = AsyncApp() if is_async else App()
+    for scenario in scenarios:
+        for bare in (True, False):
+            app.add_route(
+                route_path(scenario, bare),
+                _resource(api, scenario, bare, is_async),
+            )
+    api.register(app)
+    client = testing.TestClient(app)
+
+    def send(scenario: Scenario, bare: bool) -> int:
+        return client.simulate_request(
+            scenario.method,
+            route_path(scenario, bare),
+            query_string=scenario.query_string or None,
+            body=scenario.body or None,
+            headers=scenario.headers,
+        ).status_code
+
+    return send
+
+
+def build(api: SpecTree, scenarios: list[Scenario]) -> Send:
+    return _build(api, scenarios, is_async=False)
+
+
+def build_asgi(api: SpecTree, scenarios: list[Scenario]) -> Send:
+    return _build(api, scenarios, is_async=True)
@@ -0,0 +1,37 @@
+from flask import Flask
+
+from benchmarks.apps import Send, route_path
+from benchmarks.scenarios import Scenario
+from spectree import SpecTree
+
+
+def build(api: SpecTree, scenarios: list[Scenario]) -> Send:
+    app = Flask(__name__)
+    for scenario in scenarios:
+
+        def view(result=scenario.result):
+            return result
+
+        for bare in (True, False):
+            app.add_url_rule(
+                route_path(scenario, bare),
+                endpoint=route_path(scenario, bare),
+                view_func=view
+                if bare
+                else api.validate(**scenario.validate_kwargs)(view),
+                methods=[scenario.method],
+            )
+    api.register(app)
+    # the cookie jar would replace the `Cookie` header of the scenario
+    client = app.test_client(use_cookies=False)
+
+    def send(scenario: Scenario, bare: bool) -> int:
+        return client.open(
+            route_path(scenario, bare),
+            method=scenario.method,
+            query_string=scenario.query_string,
+            data=scenario.body,
+            headers=scenario.headers,
+        ).status_code
+
+    return send
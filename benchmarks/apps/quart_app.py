@@ -0,0 +1,44 @@
+import asyncio
+
+from quart import Quart
+
+from benchmarks.apps import Send, route_path
+from benchmarks.scenarios import Scenario
+from spectree import SpecTree
+
+
+def build(api: SpecTree, scenarios: list[Scenario]) -> Send:
+    app = Quart(__name__)
+    for scenario in scenarios:
+
+        async def view(result=scenario.result):
+            return result
+
+        for bare in (True, False):
+            app.add_url_rule(
+                route_path(scenario, bare),
+                endpoint=route_path(scenario, bare),
+                view_func=view
+                if bare
+                else api.validate(**scenario.validate_kwargs)(view),
+                methods=[scenario.method],
+            )
+    api.register(app)
+    client = app.test_client()
+    loop = asyncio.new_event_loop()
+
+    def send(scenario: Scenario, bare: bool) -> int:
+        path = route_path(scenario, bare)
+        if scenario.query_string:
+            path = f"{path}?{scenario.query_string}"
+        response = loop.run_until_complete(
+            client.open(
+                path,
+                method=scenario.method,
+                data=scenario.body,
+                headers=scenario.headers,
+            )
+        )
+        return response.status_code
+
+    return send
@@ -0,0 +1,43 @@
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from benchmarks.apps import Send, route_path
+from benchmarks.scenarios import Scenario
+from spectree import SpecTree
+
+
+def build(api: SpecTree, scenarios: list[Scenario]) -> Send:
+    routes = []
+    for scenario in scenarios:
+
+        async def endpoint(request, result=scenario.result):
+            return JSONResponse(result)
+
+        for bare in (True, False):
+            routes.append(
+                Route(
+                    route_path(scenario, bare),
+                    endpoint
+                    if bare
+                    else api.validate(**scenario.validate_kwargs)(endpoint),
+                    methods=[scenario.method],
+                )
+            )
+    app = Starlette(routes=routes)
+    api.register(app)
+    client = TestClient(app)
+
+    def send(scenario: Scenario, bare: bool) -> int:
+        path = route_path(scenario, bare)
+        if scenario.query_string:
+            path = f"{path}?{scenario.query_string}"
+        return client.request(
+            scenario.method,
+            path,
+            content=scenario.body or None,
+            headers=scenario.headers,
+        ).status_code
+
+    return send
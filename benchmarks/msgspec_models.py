@@ -0,0 +1,31 @@
+import msgspec
+
+
+class Query(msgspec.Struct):
+    limit: int = 10
+    tags: list[str] = []
+
+
+class Headers(msgspec.Struct):
+    authorization: str
+    accept: str = "*/*"
+
+
+class Cookies(msgspec.Struct):
+    session: str
+
+
+class Form(msgspec.Struct):
+    name: str
+    limit: int
+
+
+class Item(msgspec.Struct):
+    id: int
+    name: str
+    price: float
+    tags: list[str]
+
+
+class Payload(msgspec.Struct):
+    items: list[Item]
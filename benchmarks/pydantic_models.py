@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+
+
+class Query(BaseModel):
+    limit: int = 10
+    tags: list[str] = []
+
+
+class Headers(BaseModel):
+    authorization: str
+    accept: str = "*/*"
+
+
+class Cookies(BaseModel):
+    session: str
+
+
+class Form(BaseModel):
+    name: str
+    limit: int
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    price: float
+    tags: list[str]
+
+
+class Payload(BaseModel):
+    items: list[Item]
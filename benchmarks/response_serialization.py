@@ -0,0 +1,125 @@
+"""Time of serializing dataclass and TypedDict responses by the pydantic adapter.
+
+Each response is a stdlib dataclass (or a TypedDict) with a few scalar fields
+and a list of `--items` nested items. `dump_json` serializes it by the
+cached `TypeAdapter` of its type, `validate+dump` is the former path that
+validated the instance again before serializing it.
+
+    python -m benchmarks.response_serialization --items 100 --count 1000
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from typing_extensions import TypedDict
+
+from spectree.model_adapter import get_pydantic_model_adapter
+
+
+@dataclass
+class Item:
+    name: str
+    price: float
+    tags: list[str]
+
+
+@dataclass
+class Order:
+    id: int
+    customer: str
+    note: str
+    items: list[Item]
+
+
+class ItemDict(TypedDict):
+    name: str
+    price: float
+    tags: list[str]
+
+
+class OrderDict(TypedDict):
+    id: int
+    customer: str
+    note: str
+    items: list[ItemDict]
+
+
+def make_dataclass(index: int, items: int) -> tuple[Any, Any]:
+    return Order, Order(
+        id=index,
+        customer=f"customer {index}",
+        note="x" * 32,
+        items=[Item(f"item {i}", i * 1.5, ["a", "b"]) for i in range(items)],
+    )
+
+
+def make_typed_dict(index: int, items: int) -> tuple[Any, Any]:
+    order: OrderDict = {
+        "id": index,
+        "customer": f"customer {index}",
+        "note": "x" * 32,
+        "items": [
+            {"name": f"item {i}", "price": i * 1.5, "tags": ["a", "b"]}
+            for i in range(items)
+        ],
+    }
+    return OrderDict, order
+
+
+#: response kind -> factory of the (model, instance) pairs
+RESPONSES: dict[str, Callable[[int, int], tuple[Any, Any]]] = {
+    "dataclass": make_dataclass,
+    "typeddict": make_typed_dict,
+}
+
+
+def run(func: Callable[[], None], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.response_serialization", description=__doc__
+    )
+    parser.add_argument("--responses", default=",".join(RESPONSES))
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    adapter = get_pydantic_model_adapter()
+    print(f"{'response':<10} {'dump_json us':>13} {'validate+dump us':>17} {'gain':>6}")
+    for kind in args.responses.split(","):
+        pairs = [RESPONSES[kind](i, args.items) for i in range(args.count)]
+
+        def dump():
+            for _, instance in pairs:  # noqa: B023
+                adapter.dump_json(instance)
+
+        def validate_and_dump():
+            for model, instance in pairs:  # noqa: B023
+                adapter.dump_json(adapter.validate_obj(model, instance))
+
+        # builds the cached type adapters
+        dump()
+        validate_and_dump()
+        dump_time = run(dump, args.repeat) / args.count
+        validate_time = run(validate_and_dump, args.repeat) / args.count
+        print(
+            f"{kind:<10} {dump_time * 1e6:>13.1f} {validate_time * 1e6:>17.1f} "
+            f"{validate_time / dump_time:>5.1f}x",
+            flush=True,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Payloads and request scenarios shared by all the framework apps."""
+
+import json
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+from spectree import Response
+
+#: number of items in the JSON request and response payloads
+SIZES = {"small": 1, "medium": 100, "huge": 10_000}
+#: headers added by proxies, not declared by the header model
+EXTRA_HEADERS = {f"X-Proxy-Header-{i}": f"value-{i}" for i in range(40)}
+
+
+def build_payload(size: int) -> dict[str, Any]:
+    return {
+        "items": [
+            {"id": i, "name": f"item-{i}", "price": i * 0.5, "tags": ["a", "b"]}
+            for i in range(size)
+        ]
+    }
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One request part validated by an endpoint, and the request to send."""
+
+    #: request part, also the route path
+    name: str
+    method: str
+    #: kwargs of `SpecTree.validate`
+    validate_kwargs: dict[str, Any]
+    query_string: str = ""
+    body: bytes = b""
+    headers: dict[str, str] = field(default_factory=dict)
+    #: returned by the endpoint function
+    result: Any = None
+    #: payload size name if the scenario depends on it
+    size: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}/{self.size}" if self.size else self.name
+
+
+def build_scenarios(
+    models: ModuleType, sizes: list[str], parts: list[str]
+) -> list[Scenario]:
+    """Build the scenarios validated by the `models` module of an adapter."""
+    ok = {"ok": True}
+    scenarios = []
+    if "query" in parts:
+        scenarios.append(
+            Scenario(
+                "query",
+                "GET",
+                {"query": models.Query},
+                query_string="limit=5&tags=a&tags=b",
+                result=ok,
+            )
+        )
+    if "form" in parts:
+        scenarios.append(
+            Scenario(
+                "form",
+                "POST",
+                {"form": models.Form},
+                body=urlencode({"name": "demo", "limit": 3}).encode(),
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                result=ok,
+            )
+        )
+    if "headers" in parts:
+        scenarios.append(
+            Scenario(
+                "headers",
+                "GET",
+                {"headers": models.Headers},
+                headers={"Authorization": "Bearer token", **EXTRA_HEADERS},
+                result=ok,
+            )
+        )
+    if "cookies" in parts:
+        scenarios.append(
+            Scenario(
+                "cookies",
+                "GET",
+                {"cookies": models.Cookies},
+                headers={"Cookie": "session=abc; theme=dark; lang=en"},
+                result=ok,
+            )
+        )
+    for size in sizes:
+        payload = build_payload(SIZES[size])
+        if "json" in parts:
+            scenarios.append(
+                Scenario(
+                    "json",
+                    "POST",
+                    {"json": models.Payload},
+                    body=json.dumps(payload).encode(),
+                    headers={"Content-Type": "application/json"},
+                    result=ok,
+                    size=size,
+                )
+            )
+        if "resp" in parts:
+            scenarios.append(
+                Scenario(
+                    "resp",
+                    "GET",
+                    {"resp": Response(HTTP_200=models.Payload)},
+                    result=payload,
+                    size=size,
+                )
+            )
+    return scenarios
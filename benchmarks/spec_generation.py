@@ -0,0 +1,129 @@
+"""Time of generating the OpenAPI spec of deeply nested models.
+
+Every route takes a model nested `--depth` levels deep, each level has
+`--width` scalar fields and a list of the next level. The spec is generated
+by a new `SpecTree` in each run, the decoration is not timed. The time spent
+in the `json_schema` of the model adapter is reported separately, the rest is
+the processing done by spectree.
+
+    python -m benchmarks.spec_generation --routes 50 --depth 8
+"""
+
+import argparse
+import sys
+import time
+from typing import Any, Callable
+
+import msgspec
+from pydantic import Field, create_model
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from spectree import Response, SpecTree
+from spectree.model_adapter import (
+    get_msgspec_model_adapter,
+    get_pydantic_model_adapter,
+)
+
+
+def pydantic_model(name: str, width: int, child: Any) -> Any:
+    fields: dict[str, Any] = {
+        f"field_{i}": (float, Field(description=f"field {i}", le=float("inf")))
+        for i in range(width)
+    }
+    if child is not None:
+        fields["children"] = (list[child], ...)
+    return create_model(name, **fields)
+
+
+def msgspec_model(name: str, width: int, child: Any) -> Any:
+    fields: list[Any] = [(f"field_{i}", float) for i in range(width)]
+    if child is not None:
+        fields.append(("children", list[child]))
+    return msgspec.defstruct(name, fields)
+
+
+#: model adapter name -> (adapter factory, model factory)
+ADAPTERS: dict[str, tuple[Callable[[], Any], Callable[[str, int, Any], Any]]] = {
+    "pydantic": (get_pydantic_model_adapter, pydantic_model),
+    "msgspec": (get_msgspec_model_adapter, msgspec_model),
+}
+
+
+def build_api(adapter_name: str, routes: int, depth: int, width: int) -> SpecTree:
+    adapter, make_model = ADAPTERS[adapter_name]
+    api = SpecTree("starlette", model_adapter=adapter())
+    app_routes = []
+    for route in range(routes):
+        model = None
+        for level in range(depth, 0, -1):
+            model = make_model(f"Route{route}Level{level}", width, model)
+
+        async def endpoint(request):
+            pass
+
+        endpoint.__name__ = f"endpoint_{route}"
+        app_routes.append(
+            Route(
+                f"/route/{route}",
+                api.validate(json=model, resp=Response(HTTP_200=model))(endpoint),
+                methods=["POST"],
+            )
+        )
+    api.register(Starlette(routes=app_routes))
+    return api
+
+
+class AdapterTimer:
+    """Accumulate the time spent in `json_schema` of the model adapter."""
+
+    def __init__(self, model_adapter: Any):
+        self.model_adapter = model_adapter
+        self.seconds = 0.0
+        self._json_schema = model_adapter.json_schema
+        model_adapter.json_schema = self.json_schema
+
+    def json_schema(self, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return self._json_schema(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def stop(self):
+        # the adapter instance is shared by the `SpecTree` instances
+        del self.model_adapter.json_schema
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.spec_generation", description=__doc__
+    )
+    parser.add_argument("--adapters", default=",".join(ADAPTERS))
+    parser.add_argument("--routes", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'adapter':<10} {'spec ms':>10} {'adapter ms':>10} {'spectree ms':>12}")
+    for adapter_name in args.adapters.split(","):
+        best = (float("inf"), 0.0)
+        for _ in range(args.repeat):
+            api = build_api(adapter_name, args.routes, args.depth, args.width)
+            timer = AdapterTimer(api.model_adapter)
+            start = time.perf_counter()
+            api.spec  # noqa: B018
+            best = min(best, (time.perf_counter() - start, timer.seconds))
+            timer.stop()
+        total, adapter_time = best
+        print(
+            f"{adapter_name:<10} {total * 1000:>10.1f} {adapter_time * 1000:>10.1f} "
+            f"{(total - adapter_time) * 1000:>12.1f}",
+            flush=True,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import logging
 
+from spectree.cache import set_cache_maxsize
 from spectree.model_adapter import get_msgspec_model_adapter, get_pydantic_model_adapter
 from spectree.models import ExternalDocs, SecurityScheme, SecuritySchemeData, Tag
 from spectree.response import Response
@@ -14,6 +15,7 @@ __all__ = [
     "Tag",
     "get_msgspec_model_adapter",
     "get_pydantic_model_adapter",
+    "set_cache_maxsize",
 ]
 
 # setup library logging
@@ -1,3 +1,4 @@
+import warnings
 from typing import (
     Any,
     Callable,
@@ -31,7 +32,7 @@ class MultiDict(Protocol):
         pass
 
 
-class MultiDictStarlette(Protocol):
+class _MultiDictStarlette(Protocol):
     def __iter__(self) -> Iterator[str]:
         pass
 
@@ -42,6 +43,17 @@ class MultiDictStarlette(Protocol):
         pass
 
 
+def __getattr__(name: str) -> Any:
+    if name == "MultiDictStarlette":
+        warnings.warn(
+            "`MultiDictStarlette` is deprecated, use `MultiDict` instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return _MultiDictStarlette
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class FunctionDecorator(Protocol):
     resp: Any
     tags: Sequence[Any]
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
+from typing import (
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    Hashable,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+from weakref import WeakSet
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+# the caches created so far, resized by `set_cache_maxsize`
+_CACHES: "WeakSet[Cache]" = WeakSet()
+
+
+def _check_maxsize(maxsize: Optional[int]):
+    if maxsize is not None and maxsize < 1:
+        raise ValueError(f"cache maxsize must be >= 1 or None, got {maxsize}")
+
+
+def set_cache_maxsize(maxsize: Optional[int]):
+    """
+    bound the internal caches (type hints, validators, decoding plans) of the
+    process to keep the least recently used entries, `None` makes them unbounded.
+
+    The caches are shared by all the :class:`spectree.SpecTree` instances, the
+    bound applies to the existing caches and the ones created later.
+    """
+    _check_maxsize(maxsize)
+    Cache.default_maxsize = maxsize
+    for cache in list(_CACHES):
+        cache.resize(maxsize)
+
+
+class CacheStats(NamedTuple):
+    """the counters of a :class:`Cache`"""
+
+    #: number of lookups that found the value
+    hits: int
+    #: number of lookups that built the value
+    misses: int
+    #: number of the stored values
+    size: int
+    #: the LRU bound, `None` means unbounded
+    maxsize: Optional[int]
+
+
+class Cache(Generic[K, V]):
+    """
+    A thread-safe cache of the values built from their keys.
+
+    The value of each key is built once, the concurrent lookups of the same key
+    wait for it. Building different keys doesn't block each other.
+
+    :param name: name of the cache in :meth:`spectree.SpecTree.cache_stats`
+    :param maxsize: the number of values to keep, the least recently used ones
+        are evicted. `None` means the bound of :func:`set_cache_maxsize`
+    """
+
+    #: the bound of the caches created without `maxsize`
+    default_maxsize: ClassVar[Optional[int]] = None
+
+    def __init__(self, name: str, maxsize: Optional[int] = None):
+        self.name = name
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = Lock()
+        self._building: Dict[K, Lock] = {}
+        # `next` of the counter is atomic, the hits don't take the lock
+        self._hits = count()
+        # the values taken from `_hits` by `stats`
+        self._hits_read = 0
+        self._misses = 0
+        self.maxsize: Optional[int] = None
+        self.resize(self.default_maxsize if maxsize is None else maxsize)
+        _CACHES.add(self)
+
+    def resize(self, maxsize: Optional[int]):
+        """change the LRU bound, the values over it are evicted"""
+        _check_maxsize(maxsize)
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def _evict(self):
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _hit(self, key: K, value: V) -> V:
+        next(self._hits)
+        if self.maxsize is not None:
+            with self._lock:
+                if key in self._data:
+                    self._data.move_to_end(key)
+        return value
+
+    def get(self, key: K, build: Callable[[K], V]) -> V:
+        """return the value of the key, build and store it if it's missing"""
+        value = self._data.get(key, _MISSING)
+        if value is not _MISSING:
+            return self._hit(key, value)  # type: ignore[arg-type]
+
+        with self._lock:
+            building = self._building.setdefault(key, Lock())
+        try:
+            with building:
+                # built by another thread while waiting for the lock
+                value = self._data.get(key, _MISSING)
+                if value is not _MISSING:
+                    return self._hit(key, value)  # type: ignore[arg-type]
+                with self._lock:
+                    self._misses += 1
+                value = build(key)
+                with self._lock:
+                    self._data[key] = value  # type: ignore[assignment]
+                    self._evict()
+                return value  # type: ignore[return-value]
+        finally:
+            with self._lock:
+                if self._building.get(key) is building:
+                    del self._building[key]
+
+    def clear(self):
+        """remove the values, the counters are kept"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            hits = next(self._hits) - self._hits_read
+            self._hits_read += 1
+            return CacheStats(
+                hits=hits,
+                misses=self._misses,
+                size=len(self._data),
+                maxsize=self.maxsize,
+            )
@@ -0,0 +1,96 @@
+"""Command line interface of spectree.
+
+spectree export myapp.main:app -o openapi.json
+spectree export myapp.main:api -o openapi.json.gz --gzip
+"""
+
+import argparse
+import os
+import sys
+from importlib import import_module
+from typing import Any, Optional
+
+from spectree.plugins.base import EncodedSpec
+from spectree.spec import SpecTree
+
+
+def find_spectree(target: str) -> SpecTree:
+    """
+    :param target: `module:attribute` of a :class:`SpecTree` instance, or of an
+        application with one :class:`SpecTree` instance registered in the module
+
+    import the module of the target and return its :class:`SpecTree` instance
+    """
+    module_name, _, attribute = target.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"expect `module:attribute`, got {target!r}")
+    module = import_module(module_name)
+    obj: Any = module
+    for name in attribute.split("."):
+        obj = getattr(obj, name)
+    if isinstance(obj, SpecTree):
+        return obj
+
+    found = [
+        value
+        for value in vars(module).values()
+        if isinstance(value, SpecTree) and getattr(value, "app", None) is obj
+    ]
+    if len(found) != 1:
+        raise ValueError(
+            f"found {len(found)} SpecTree instances registered to {target}, "
+            "use `module:attribute` of the SpecTree instance instead"
+        )
+    return found[0]
+
+
+def export(args: argparse.Namespace):
+    api = find_spectree(args.target)
+    encoded = EncodedSpec(api.backend.export_spec(), api.config.spec_cache_control)
+    body = encoded.gzip if args.gzip else encoded.identity
+    if args.output == "-":
+        sys.stdout.buffer.write(body)
+        sys.stdout.buffer.flush()
+    else:
+        with open(args.output, "wb") as file:
+            file.write(body)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="spectree", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser(
+        "export",
+        help="generate the OpenAPI spec without running the app",
+        description="Write the minified OpenAPI spec of the app, it can be served "
+        "by setting the `spec_file` config without generating it at runtime.",
+    )
+    export_parser.add_argument(
+        "target",
+        help="`module:attribute` of the SpecTree instance or the app it's "
+        "registered to",
+    )
+    export_parser.add_argument(
+        "-o",
+        "--output",
+        default="openapi.json",
+        help="output file, `-` for stdout (default: openapi.json)",
+    )
+    export_parser.add_argument(
+        "--gzip", action="store_true", help="compress the output with gzip"
+    )
+    export_parser.set_defaults(handler=export)
+    args = parser.parse_args(argv)
+
+    # like the app servers, import the target from the working directory
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    try:
+        args.handler(args)
+    except (ImportError, AttributeError, ValueError) as err:
+        parser.error(f"cannot export {args.target}: {err}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
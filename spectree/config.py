@@ -67,6 +67,19 @@ class Configuration(AdapterBackedDataclass):
     path: str = "apidoc"
     #: OpenAPI file route path suffix (i.e. /apidoc/openapi.json)
     filename: str = "openapi.json"
+    #: `Cache-Control` header of the OpenAPI file and doc page routes, the default
+    #: lets clients keep a copy and revalidate it with the `ETag`
+    spec_cache_control: str = "no-cache"
+    #: directory to store the generated OpenAPI spec in, the processes that have the
+    #: same routes, models and configuration load it instead of generating it again
+    spec_cache_dir: Optional[str] = None
+    #: OpenAPI file written by `spectree export` (can be gzipped), it's served as-is
+    #: and the spec is not generated at runtime, `spec_cache_dir` is not used
+    spec_file: Optional[str] = None
+    #: name the nested models lifted from `$defs` by their content instead of the
+    #: `nested_naming_strategy`, the identical schemas of different parents are
+    #: stored once. The child name is kept unless it's taken by a different schema
+    dedup_nested_schemas: bool = False
     #: OpenAPI version (doesn't affect anything)
     openapi_version: str = "3.1.0"
     #: the mode of the SpecTree validator :class:`ModeEnum`
@@ -79,6 +92,19 @@ class Configuration(AdapterBackedDataclass):
     page_templates: dict[str, str] = field(default_factory=lambda: dict(PAGE_TEMPLATES))
     #: opt-in type annotation feature, see the README examples
     annotations: bool = True
+    #: validate JSON request bodies from the raw bytes with the model adapter
+    #: (`model_validate_json` / `msgspec.json.decode`) instead of the framework's
+    #: parsed object, malformed JSON will be reported as a validation error.
+    #: Falcon always uses its media handlers since `req.get_media()` needs them.
+    raw_json_body: bool = True
+    #: number of the invalid lines of an `ndjson` request body that are skipped,
+    #: the request is rejected with the validation errors after more of them
+    ndjson_max_errors: int = 0
+    #: stop parsing a multipart form once all the fields of the form model are found
+    #: (Falcon), a file part that is the last of them is left unread for the endpoint
+    #: to stream it from `part.stream`. The parts after it are not validated, they're
+    #: in `req.context.form_parts`
+    lazy_form_files: bool = False
     #: servers section of OAS :py:class:`spectree.models.Server`
     servers: list[Server] = field(default_factory=list)
     #: OpenAPI `securitySchemes` :py:class:`spectree.models.SecurityScheme`
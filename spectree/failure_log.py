@@ -0,0 +1,198 @@
+import logging
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from spectree._types import ModelAdapterType
+
+logger = logging.getLogger(__name__)
+
+#: (phase, endpoint, error type), the phase is "request" or "response", the error
+#: type is the kind of the first error, see `ModelAdapter.error_type`
+FailureKey = Tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class ValidationFailure:
+    """a validation failure kept by :class:`FailureLog`"""
+
+    #: "request" or "response"
+    phase: str
+    #: the HTTP method and the route template (or the path) of the request
+    endpoint: str
+    #: the validation error
+    error: Exception
+    #: the adapter that raised the error
+    model_adapter: ModelAdapterType
+    #: unix timestamp of the failure
+    timestamp: float
+
+    @property
+    def errors(self) -> Any:
+        """the formatted errors, they're only formatted when read"""
+        return self.model_adapter.validation_errors(self.error)
+
+
+def get_endpoint(req: Any) -> str:
+    """
+    get the HTTP method and the route template of the request, so the requests
+    of the same route with different path parameters are aggregated together
+    """
+    # flask & quart
+    template = getattr(getattr(req, "url_rule", None), "rule", None)
+    # falcon
+    template = template or getattr(req, "uri_template", None)
+    # starlette sets the matched route in the ASGI scope
+    scope = getattr(req, "scope", None)
+    if not template and isinstance(scope, dict):
+        template = getattr(scope.get("route"), "path", None)
+    if not template:
+        url = getattr(req, "url", None)
+        template = getattr(req, "path", None) or getattr(url, "path", "?")
+    return f"{getattr(req, 'method', '?')} {template}"
+
+
+class FailureLog:
+    """
+    Hooks that aggregate the validation failures instead of logging each of them.
+
+    The failures are counted by the endpoint and the error type, a summary of
+    the counts is logged at most once per `interval`. Only the first failure of
+    each endpoint and error type in an interval is logged with its errors. The
+    last `samples` failures are kept for inspection, the errors are formatted
+    when they're read.
+
+    The counts since the last summary are only logged by the next failure, call
+    :meth:`flush` at shutdown to log them.
+
+    .. code-block:: python
+
+        failures = FailureLog(interval=60, samples=100)
+        api = SpecTree("flask", before=failures.before, after=failures.after)
+        atexit.register(failures.flush)
+
+    :param interval: minimum seconds between two summaries
+    :param samples: number of the recent failures to keep
+    :param logger: logger of the summaries and the first failures
+    """
+
+    def __init__(
+        self,
+        interval: float = 60.0,
+        samples: int = 100,
+        logger: logging.Logger = logger,
+    ):
+        if interval < 0:
+            raise ValueError(f"interval must be >= 0, got {interval}")
+        self.interval = interval
+        self.logger = logger
+        self._samples: deque[ValidationFailure] = deque(maxlen=samples)
+        self._counts: Counter[FailureKey] = Counter()
+        self._lock = Lock()
+        self._since = time.monotonic()
+
+    def before(
+        self,
+        req: Any,
+        resp: Any,
+        req_validation_error: Optional[Exception],
+        instance: Any,
+        model_adapter: ModelAdapterType,
+    ):
+        """the `before` hook, see :meth:`spectree.utils.default_before_handler`"""
+        if req_validation_error:
+            self.record("request", req, req_validation_error, model_adapter)
+
+    def after(
+        self,
+        req: Any,
+        resp: Any,
+        resp_validation_error: Optional[Exception],
+        instance: Any,
+        model_adapter: ModelAdapterType,
+    ):
+        """the `after` hook, see :meth:`spectree.utils.default_after_handler`"""
+        if resp_validation_error:
+            self.record("response", req, resp_validation_error, model_adapter)
+
+    def record(
+        self,
+        phase: str,
+        req: Any,
+        error: Exception,
+        model_adapter: ModelAdapterType,
+    ):
+        """count the failure, keep it as a sample and log if it's due"""
+        failure = ValidationFailure(
+            phase=phase,
+            endpoint=get_endpoint(req),
+            error=error,
+            model_adapter=model_adapter,
+            timestamp=time.time(),
+        )
+        key = (phase, failure.endpoint, model_adapter.error_type(error))
+        with self._lock:
+            self._samples.append(failure)
+            self._counts[key] += 1
+            first = self._counts[key] == 1
+            summary = self._pop_summary(force=False)
+
+        if first:
+            self.logger.error(
+                "%s %s validation error: %s",
+                failure.endpoint,
+                phase,
+                failure.errors,
+            )
+        if summary:
+            self._log_summary(*summary)
+
+    def _pop_summary(
+        self, force: bool
+    ) -> Optional[Tuple[float, Dict[FailureKey, int]]]:
+        now = time.monotonic()
+        elapsed = now - self._since
+        if not force and elapsed < self.interval:
+            return None
+        counts = dict(self._counts)
+        self._counts.clear()
+        self._since = now
+        return elapsed, counts
+
+    def _log_summary(self, elapsed: float, counts: Dict[FailureKey, int]):
+        # the first failure of each key has been logged, report the others
+        repeated = {key: count - 1 for key, count in counts.items() if count > 1}
+        if not repeated:
+            return
+        self.logger.error(
+            "%d more validation errors in %.0fs: %s",
+            sum(repeated.values()),
+            elapsed,
+            ", ".join(
+                f"{endpoint} {phase} {error} x{count}"
+                for (phase, endpoint, error), count in sorted(
+                    repeated.items(), key=lambda item: -item[1]
+                )
+            ),
+        )
+
+    def flush(self):
+        """log the summary of the current interval now and start a new one"""
+        with self._lock:
+            summary = self._pop_summary(force=True)
+        if summary:
+            self._log_summary(*summary)
+
+    @property
+    def samples(self) -> List[ValidationFailure]:
+        """the recent failures, from the oldest to the newest"""
+        with self._lock:
+            return list(self._samples)
+
+    @property
+    def counts(self) -> Dict[FailureKey, int]:
+        """the failures of the current interval by (phase, endpoint, error type)"""
+        with self._lock:
+            return dict(self._counts)
@@ -1,12 +1,39 @@
 import re
-from typing import Annotated, Any, TypeAlias, get_args, get_origin
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass
+from typing import (
+    Annotated,
+    Any,
+    Iterator,
+    Sequence,
+    TypeAlias,
+    get_args,
+    get_origin,
+)
 
 import msgspec
+import msgspec.inspect
+import msgspec.structs
 
+from spectree.cache import Cache
 from spectree.model_adapter.protocol import ModelAdapter, SchemaMode
 from spectree.models import ValidationErrorElement
 
 _ERROR_PATH_RE = re.compile(r" - at `(?P<path>.+)`$")
+# the settings of `msgspec.structs.StructConfig` that change the JSON schema
+STRUCT_CONFIG = (
+    "array_like",
+    "forbid_unknown_fields",
+    "omit_defaults",
+    "tag",
+    "tag_field",
+)
+
+# number of the buffers kept by `MsgspecModelAdapter.encode_buffer`
+BUFFER_POOL_SIZE = 16
+# larger buffers are not kept, the pool doesn't hold the memory of rare large bodies
+MAX_POOLED_BUFFER_SIZE = 1 << 20
 
 MsgspecValidationError: TypeAlias = Annotated[
     list[ValidationErrorElement], msgspec.Meta(title="ValidationError")
@@ -38,6 +65,16 @@ class MsgspecModelAdapter(ModelAdapter[Any, msgspec.ValidationError, BaseFile]):
 
     def __init__(self) -> None:
         self.encoder = msgspec.json.Encoder()
+        self._decoders: Cache[Any, msgspec.json.Decoder[Any]] = Cache(
+            "msgspec_decoders"
+        )
+        # reusable buffers of `encode_buffer`, `append` and `pop` are atomic
+        self._buffers: deque[bytearray] = deque(maxlen=BUFFER_POOL_SIZE)
+
+    def _decoder(self, model: Any) -> msgspec.json.Decoder[Any]:
+        return self._decoders.get(
+            model, lambda model: msgspec.json.Decoder(model, strict=False)
+        )
 
     def is_model_type(self, value: type) -> bool:
         """All kinds of types are treated the same."""
@@ -76,15 +113,116 @@ class MsgspecModelAdapter(ModelAdapter[Any, msgspec.ValidationError, BaseFile]):
             return any(self.is_partial_model_instance(item) for item in value)
         return False
 
+    def field_keys(self, model: type[Any]) -> frozenset[str] | None:
+        info = msgspec.inspect.type_info(model)
+        while isinstance(info, msgspec.inspect.Metadata):
+            info = info.type
+        if isinstance(info, msgspec.inspect.StructType):
+            if info.forbid_unknown_fields:
+                return None
+        elif not isinstance(info, msgspec.inspect.DataclassType):
+            return None
+        return frozenset(
+            key for field in info.fields for key in (field.name, field.encode_name)
+        )
+
+    def field_aliases(self, model: type[Any]) -> dict[str, frozenset[str]]:
+        info = msgspec.inspect.type_info(model)
+        while isinstance(info, msgspec.inspect.Metadata):
+            info = info.type
+        if not isinstance(
+            info, (msgspec.inspect.StructType, msgspec.inspect.DataclassType)
+        ):
+            return {}
+        return {
+            field.name: frozenset((field.name, field.encode_name))
+            for field in info.fields
+        }
+
+    def schema_sources(self, model: type) -> list[Any]:
+        if issubclass(model, msgspec.Struct):
+            config = model.__struct_config__
+            sources: list[Any] = [
+                repr({name: getattr(config, name) for name in STRUCT_CONFIG})
+            ]
+            for field in msgspec.structs.fields(model):
+                sources.extend((repr(field), field.type))
+            return sources
+        if is_dataclass(model):
+            return [
+                item
+                for field in fields(model)
+                for item in (f"{field.name}: {field!r}", field.type)
+            ]
+        return []
+
+    def warmup(self, model: type[Any]) -> None:
+        if model is msgspec.ValidationError:
+            # only used by the OpenAPI spec
+            return
+        self._decoder(model)
+
+    def caches(self) -> list[Cache[Any, Any]]:
+        return [self._decoders]
+
     def validate_obj(self, model: type[Any], value: Any) -> Any:
         return msgspec.convert(value, type=model, strict=False)
 
     def validate_json(self, model: type[Any], value: bytes) -> Any:
-        return msgspec.json.decode(value, type=model, strict=False)
+        try:
+            return self._decoder(model).decode(value)
+        except msgspec.ValidationError:
+            raise
+        except msgspec.DecodeError as err:
+            # malformed JSON is a validation error, the same as `pydantic`
+            raise msgspec.ValidationError(str(err)) from err
 
     def dump_json(self, value: Any) -> bytes:
         return self.encoder.encode(value)
 
+    def try_dump_json(self, value: Any) -> bytes | None:
+        try:
+            return self.encoder.encode(value)
+        except TypeError:
+            return None
+
+    def encode_into(self, value: Any, buffer: bytearray, offset: int = 0) -> None:
+        """Serialize the value into the buffer from the offset.
+
+        The buffer is resized to fit the JSON, nothing is allocated if it's large
+        enough.
+        """
+        self.encoder.encode_into(value, buffer, offset)
+
+    @contextmanager
+    def encode_buffer(self, value: Any) -> Iterator[memoryview]:
+        """Serialize the value into a buffer taken from a pool.
+
+        For the consumers that accept a `memoryview` and are done with it in the
+        `with` block, e.g. writing to a socket or a file. The buffer is returned to
+        the pool after the block, the view must not be kept.
+        """
+        try:
+            buffer = self._buffers.pop()
+        except IndexError:
+            buffer = bytearray()
+        self.encoder.encode_into(value, buffer)
+        view = memoryview(buffer)
+        try:
+            yield view
+        finally:
+            reusable = True
+            try:
+                view.release()
+                # resizing fails if a slice of the view is still kept
+                buffer.append(0)
+            except BufferError:
+                reusable = False
+            if reusable:
+                buffer.pop()
+                if len(buffer) <= MAX_POOLED_BUFFER_SIZE:
+                    self._buffers.append(buffer)
+
     def make_root_model(
         self,
         root_type: type[Any],
@@ -151,3 +289,14 @@ class MsgspecModelAdapter(ModelAdapter[Any, msgspec.ValidationError, BaseFile]):
                 "type": "validation_error",
             }
         ]
+
+    def error_type(self, err: msgspec.ValidationError) -> str:
+        """`msgspec` errors don't have a type, the message without its path is used"""
+        return _ERROR_PATH_RE.sub("", str(err))
+
+    def make_validation_error(
+        self, loc: Sequence[str], msg: str, error_type: str
+    ) -> msgspec.ValidationError:
+        """`msgspec` errors don't have a type, the `loc` is kept in the message"""
+        path = "".join(f".{part}" for part in loc)
+        return msgspec.ValidationError(f"{msg} - at `${path}`")
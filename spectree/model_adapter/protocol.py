@@ -1,4 +1,6 @@
-from typing import Any, Literal, Protocol, TypeAlias, TypeVar
+from typing import Any, Literal, Protocol, Sequence, TypeAlias, TypeVar
+
+from spectree.cache import Cache
 
 ModelClass: TypeAlias = type[Any]
 ModelT = TypeVar("ModelT")
@@ -33,12 +35,58 @@ class ModelAdapter(Protocol[ModelT, ValidationErrorT, BaseFileT]):
 
     def is_partial_model_instance(self, value: Any) -> bool: ...
 
+    def field_keys(self, model: ModelClass) -> frozenset[str] | None:
+        """Return the input keys (field names and aliases) the model reads.
+
+        `None` means the model may read any key, e.g. it accepts extra fields or
+        has a validator that runs before the fields are parsed.
+        """
+        ...
+
+    def field_aliases(self, model: ModelClass) -> dict[str, frozenset[str]]:
+        """Return the input keys (the name and the aliases) of each field, keyed
+        by the field name.
+
+        The fields without aliases may be missing.
+        """
+        ...
+
+    def schema_sources(self, model: type) -> list[Any]:
+        """Return what the JSON schema of the model class is generated from.
+
+        A `str` describes the settings of the model and its fields, any other item
+        is a type that's followed by the caller. The list is empty if the class is
+        not a model. Used to check if a cached schema is still valid without
+        generating it.
+        """
+        ...
+
+    def warmup(self, model: ModelClass) -> None:
+        """Build what the validation and the serialization of the model need.
+
+        Otherwise it's built lazily by the first request that uses the model.
+        """
+        ...
+
+    def caches(self) -> list[Cache[Any, Any]]:
+        """Return the caches of the adapter, their stats are reported by the
+        :class:`spectree.SpecTree` instances that use it."""
+        ...
+
     def validate_obj(self, model: type[ModelT], value: Any) -> ModelT: ...
 
     def validate_json(self, model: type[ModelT], value: bytes) -> ModelT: ...
 
     def dump_json(self, value: Any) -> bytes: ...
 
+    def try_dump_json(self, value: Any) -> bytes | None:
+        """Serialize a payload that may contain model instances at any level.
+
+        This is done in one pass without checking the payload first. Return `None`
+        if the payload contains a value that cannot be serialized by the adapter.
+        """
+        ...
+
     def make_root_model(
         self,
         root_type: Any,
@@ -58,3 +106,20 @@ class ModelAdapter(Protocol[ModelT, ValidationErrorT, BaseFileT]):
     ) -> dict[str, Any]: ...
 
     def validation_errors(self, err: ValidationErrorT) -> Any: ...
+
+    def error_type(self, err: ValidationErrorT) -> str:
+        """The kind of the first error of `err`, without its location.
+
+        It's used to aggregate the errors, the errors aren't formatted.
+        """
+        ...
+
+    def make_validation_error(
+        self, loc: Sequence[str], msg: str, error_type: str
+    ) -> ValidationErrorT:
+        """Create a validation error of the request that isn't raised by a model.
+
+        E.g. the body is too large to be read, it's handled like the other
+        validation errors.
+        """
+        ...
@@ -1,10 +1,23 @@
 from collections.abc import Mapping
-from dataclasses import is_dataclass
+from dataclasses import fields, is_dataclass
 from typing import Any, Sequence
 
-from pydantic import BaseModel, RootModel, TypeAdapter, ValidationError
-from pydantic_core import core_schema
+from pydantic import (
+    AliasChoices,
+    AliasPath,
+    BaseModel,
+    RootModel,
+    TypeAdapter,
+    ValidationError,
+)
+from pydantic_core import (
+    InitErrorDetails,
+    PydanticCustomError,
+    PydanticSerializationError,
+    core_schema,
+)
 
+from spectree.cache import Cache
 from spectree.model_adapter.protocol import ModelAdapter, SchemaMode
 from spectree.models import ValidationErrorElement
 
@@ -39,14 +52,17 @@ class PydanticModelAdapter(ModelAdapter[Any, ValidationError, type[BaseFile]]):
     basefile = BaseFile
 
     def __init__(self) -> None:
-        self._type_adapters: dict[type[Any], TypeAdapter[Any]] = {}
+        self._type_adapters: Cache[Any, TypeAdapter[Any]] = Cache(
+            "pydantic_type_adapters"
+        )
+        # infers the serializer of each value, including the model instances
+        self._any_adapter: TypeAdapter[Any] = TypeAdapter(Any)
 
     def _type_adapter(self, value: type[Any]) -> TypeAdapter[Any]:
-        adapter = self._type_adapters.get(value)
-        if adapter is None:
-            adapter = TypeAdapter(value)
-            self._type_adapters[value] = adapter
-        return adapter
+        return self._type_adapters.get(value, TypeAdapter)
+
+    def caches(self) -> list[Cache[Any, Any]]:
+        return [self._type_adapters]
 
     def is_model_type(self, value: type) -> bool:
         return (
@@ -73,6 +89,89 @@ class PydanticModelAdapter(ModelAdapter[Any, ValidationError, type[BaseFile]]):
             return any(self.is_partial_model_instance(item) for item in value)
         return False
 
+    def field_keys(self, model: type[Any]) -> frozenset[str] | None:
+        if isinstance(model, type) and issubclass(model, BaseModel):
+            schema = model.__pydantic_core_schema__
+        else:
+            schema = self._type_adapter(model).core_schema
+        if schema["type"] not in ("model", "dataclass"):
+            return None
+        if schema.get("config", {}).get("extra_fields_behavior") in ("allow", "forbid"):
+            return None
+        fields_schema = schema["schema"]
+        if fields_schema.get("extra_behavior") in ("allow", "forbid"):
+            return None
+        if fields_schema["type"] == "model-fields":
+            fields = fields_schema["fields"].items()
+        elif fields_schema["type"] == "dataclass-args":
+            fields = ((field["name"], field) for field in fields_schema["fields"])
+        else:
+            # wrapped by a `before` or `wrap` validator that may read any key
+            return None
+
+        keys = set()
+        for name, field in fields:
+            keys.add(name)
+            alias = field.get("validation_alias")
+            # the alias can be a str, a path list or a list of choices
+            for choice in [alias] if isinstance(alias, str) else alias or ():
+                path = choice if isinstance(choice, list) else [choice]
+                if path and isinstance(path[0], str):
+                    keys.add(path[0])
+        return frozenset(keys)
+
+    def field_aliases(self, model: type[Any]) -> dict[str, frozenset[str]]:
+        if isinstance(model, type) and issubclass(model, RootModel):
+            return {}
+        # the fields of `BaseModel` and pydantic dataclasses
+        model_fields = getattr(model, "__pydantic_fields__", None)
+        if not isinstance(model_fields, dict):
+            return {}
+        aliases = {}
+        for name, field in model_fields.items():
+            keys = {name}
+            if field.alias:
+                keys.add(field.alias)
+            alias = field.validation_alias
+            choices = alias.choices if isinstance(alias, AliasChoices) else [alias]
+            for choice in choices:
+                key = choice.path[0] if isinstance(choice, AliasPath) else choice
+                if isinstance(key, str):
+                    keys.add(key)
+            aliases[name] = frozenset(keys)
+        return aliases
+
+    def schema_sources(self, model: type) -> list[Any]:
+        if issubclass(model, BaseModel):
+            model_fields, config = model.model_fields, model.model_config
+        elif hasattr(model, "__pydantic_fields__"):
+            model_fields, config = model.__pydantic_fields__, model.__pydantic_config__
+        elif is_dataclass(model):
+            return [
+                item
+                for field in fields(model)
+                for item in (f"{field.name}: {field!r}", field.type)
+            ]
+        else:
+            return []
+
+        sources: list[Any] = [repr(config)]
+        for name, field in model_fields.items():
+            sources.extend((f"{name}: {field!r}", field.annotation))
+        for name, computed in model.__pydantic_decorators__.computed_fields.items():
+            sources.extend((f"{name}: {computed.info!r}", computed.info.return_type))
+        return sources
+
+    def warmup(self, model: type[Any]) -> None:
+        if model is ValidationError:
+            # only used by the OpenAPI spec
+            return
+        if isinstance(model, type) and issubclass(model, BaseModel):
+            # builds the validator of a model with `defer_build`
+            model.model_rebuild()
+        else:
+            self._type_adapter(model)
+
     def validate_obj(self, model: type[Any], value: Any) -> Any:
         if issubclass(model, BaseModel):
             return model.model_validate(value)
@@ -84,12 +183,16 @@ class PydanticModelAdapter(ModelAdapter[Any, ValidationError, type[BaseFile]]):
         return self._type_adapter(model).validate_json(value)
 
     def dump_json(self, value: Any) -> bytes:
-        instance = value
-        if not isinstance(value, BaseModel):
-            instance = self.validate_obj(type(instance), instance)
-        if isinstance(instance, BaseModel):
-            return instance.model_dump_json().encode("utf-8")
-        return self._type_adapter(type(instance)).dump_json(instance)
+        if isinstance(value, BaseModel):
+            return value.model_dump_json().encode("utf-8")
+        # the serializer doesn't validate the value, it only needs the type
+        return self._type_adapter(type(value)).dump_json(value)
+
+    def try_dump_json(self, value: Any) -> bytes | None:
+        try:
+            return self._any_adapter.dump_json(value)
+        except PydanticSerializationError:
+            return None
 
     def make_root_model(
         self,
@@ -127,4 +230,29 @@ class PydanticModelAdapter(ModelAdapter[Any, ValidationError, type[BaseFile]]):
         )
 
     def validation_errors(self, err: ValidationError) -> Any:
-        return err.errors(include_context=False)
+        errors = err.errors(include_context=False)
+        for error in errors:
+            # malformed JSON bodies from `validate_json` keep the raw bytes as input
+            if isinstance(error.get("input"), bytes):
+                error["input"] = error["input"].decode("utf-8", errors="replace")
+        return errors
+
+    def error_type(self, err: ValidationError) -> str:
+        errors = err.errors(
+            include_url=False, include_context=False, include_input=False
+        )
+        return errors[0]["type"] if errors else "validation_error"
+
+    def make_validation_error(
+        self, loc: Sequence[str], msg: str, error_type: str
+    ) -> ValidationError:
+        return ValidationError.from_exception_data(
+            "Request",
+            [
+                InitErrorDetails(
+                    type=PydanticCustomError(error_type, msg),
+                    loc=tuple(loc),
+                    input=None,
+                )
+            ],
+        )
@@ -0,0 +1,143 @@
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+)
+
+from spectree._types import ModelAdapterType
+from spectree.model_adapter import ModelClass
+
+#: bytes read from the request stream at a time by the sync plugins
+CHUNK_SIZE = 64 * 1024
+
+
+class NDJSONValidationError(Exception):
+    """
+    Raised by the NDJSON records when more lines are invalid than allowed by the
+    `ndjson_max_errors` config, or the body is too large. The plugins return the
+    `errors` with the validation error status.
+    """
+
+    def __init__(self, errors: list[Any]):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def iter_stream(stream: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """read a file-like request stream in chunks"""
+    while chunk := stream.read(chunk_size):
+        yield chunk
+
+
+class NDJSONRecords:
+    """
+    Validated records of a newline-delimited JSON request body.
+
+    The body is read in chunks while the records are iterated, only the current
+    chunk and the incomplete line are kept in memory. Each line is validated by
+    the model, the invalid lines are skipped and their errors are collected in
+    :attr:`errors` with the line number (from 1) prepended to the `loc`. Once
+    there are more invalid lines than `max_errors`,
+    :class:`NDJSONValidationError` is raised.
+
+    The records can be iterated once, in the endpoint function.
+
+    :param chunks: the request body
+    :param model: model class of each line
+    :param model_adapter: adapter that validates the lines
+    :param max_errors: number of the invalid lines that are skipped
+    :param max_body_size: the maximum size of the body in bytes
+    :param body_too_large: create the validation error of a large body
+    """
+
+    def __init__(
+        self,
+        chunks: Any,
+        model: ModelClass,
+        model_adapter: ModelAdapterType,
+        max_errors: int = 0,
+        max_body_size: Optional[int] = None,
+        body_too_large: Optional[Callable[[], Exception]] = None,
+    ):
+        self.chunks = chunks
+        self.model = model
+        self.model_adapter = model_adapter
+        self.max_errors = max_errors
+        self.max_body_size = max_body_size
+        self.body_too_large = body_too_large
+        #: the errors of the skipped lines
+        self.errors: list[Any] = []
+        # the pieces of the incomplete line, joined once its end arrives
+        self._pending: list[bytes] = []
+        self._size = 0
+        self._line_number = 0
+        self._invalid_lines = 0
+
+    def _lines(self, chunk: bytes) -> list[bytes]:
+        self._size += len(chunk)
+        if self.max_body_size is not None and self._size > self.max_body_size:
+            assert self.body_too_large  # make mypy happy
+            raise NDJSONValidationError(
+                self.model_adapter.validation_errors(self.body_too_large())
+            )
+        if b"\n" not in chunk:
+            self._pending.append(chunk)
+            return []
+        lines = chunk.split(b"\n")
+        if self._pending:
+            self._pending.append(lines[0])
+            lines[0] = b"".join(self._pending)
+        # the last one is incomplete
+        self._pending = [lines.pop()]
+        return lines
+
+    def _validate(self, line: bytes) -> tuple[bool, Any]:
+        self._line_number += 1
+        if not line.strip():
+            return False, None
+        try:
+            return True, self.model_adapter.validate_json(self.model, line)
+        except self.model_adapter.validation_error as err:
+            self.errors.extend(
+                {**error, "loc": [self._line_number, *error["loc"]]}
+                for error in self.model_adapter.validation_errors(err)
+            )
+            self._invalid_lines += 1
+            if self._invalid_lines > self.max_errors:
+                raise NDJSONValidationError(self.errors) from None
+            return False, None
+
+    def _last_line(self) -> bytes:
+        line = b"".join(self._pending)
+        self._pending = []
+        return line
+
+    def __iter__(self) -> Iterator[Any]:
+        chunks: Iterable[bytes] = self.chunks
+        for chunk in chunks:
+            for line in self._lines(chunk):
+                valid, record = self._validate(line)
+                if valid:
+                    yield record
+        valid, record = self._validate(self._last_line())
+        if valid:
+            yield record
+
+
+class AsyncNDJSONRecords(NDJSONRecords):
+    """:class:`NDJSONRecords` of the async frameworks, iterated by `async for`"""
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        chunks: AsyncIterable[bytes] = self.chunks
+        async for chunk in chunks:
+            for line in self._lines(chunk):
+                valid, record = self._validate(line)
+                if valid:
+                    yield record
+        valid, record = self._validate(self._last_line())
+        if valid:
+            yield record
@@ -1,5 +1,11 @@
+import gzip
+import hashlib
+import json
 import logging
-from dataclasses import dataclass
+import random
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import count
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -13,9 +19,13 @@ from typing import (
 )
 
 from spectree._types import HookHandler, JsonType, ModelAdapterType
+from spectree.cache import Cache
 from spectree.config import Configuration
 from spectree.model_adapter import ModelClass
+from spectree.ndjson import AsyncNDJSONRecords, NDJSONRecords
 from spectree.response import Response
+from spectree.streaming import ResponseStream, StreamFormat, frame
+from spectree.utils import get_multidict_plan
 
 if TYPE_CHECKING:
     # to avoid cyclic import
@@ -28,9 +38,244 @@ class Context(NamedTuple):
     form: Optional[Any]
     headers: Optional[Any]
     cookies: Optional[Any]
+    #: the validated records of a newline-delimited JSON body, see
+    #: :class:`spectree.ndjson.NDJSONRecords`
+    ndjson: Optional[Any] = None
+
+
+#: request parts that can be injected into the endpoint function by annotations
+REQUEST_PARTS = ("query", "json", "form", "headers", "cookies", "ndjson")
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class ResponseSampler:
+    """
+    Decide which responses of an endpoint should be validated.
+
+    The first ``first`` responses are always validated, after that each response
+    is validated with the probability ``rate``. Responses that are not selected
+    are only serialized.
+
+    :param rate: fraction of the responses to validate, from 0 to 1
+    :param first: number of the first responses to always validate
+    :param inherit: follow the global setting of the :class:`spectree.SpecTree`
+    """
+
+    def __init__(self, rate: float = 1.0, first: int = 0, inherit: bool = True):
+        self.inherit = inherit
+        self.set(rate, first)
+
+    def set(self, rate: float = 1.0, first: int = 0):
+        """update the sampling setting and restart counting the first responses"""
+        if not 0 <= rate <= 1:
+            raise ValueError(f"response validation rate must be in [0, 1], got {rate}")
+        if first < 0:
+            raise ValueError(f"response validation first must be >= 0, got {first}")
+        self.rate = rate
+        self.first = first
+        # `next()` on `itertools.count` is atomic, no lock is required
+        self._counter = count()
+
+    def sample(self) -> bool:
+        """whether the current response should be validated"""
+        if self.rate >= 1:
+            return True
+        if self.first and next(self._counter) < self.first:
+            return True
+        return self.rate > 0 and random.random() < self.rate
+
+
+@dataclass(frozen=True)
+class ValidationPlan:
+    """
+    Everything a plugin needs to validate a decorated endpoint, compiled once by
+    :meth:`spectree.spec.SpecTree.validate` so nothing is resolved per request.
+    """
+
+    #: the endpoint function
+    func: Callable
+    query: Optional[ModelClass]
+    json: Optional[ModelClass]
+    form: Optional[ModelClass]
+    headers: Optional[ModelClass]
+    cookies: Optional[ModelClass]
+    resp: Optional[Response]
+    before: HookHandler
+    after: HookHandler
+    validation_error_status: int
+    skip_validation: bool = False
+    force_resp_serialize: bool = False
+    #: whether the endpoint function is a coroutine function
+    is_coroutine: bool = False
+    #: request parts passed to the endpoint function as keyword arguments
+    annotated: tuple[str, ...] = ()
+    #: header names read by the ``headers`` model, `None` means all the headers
+    header_keys: Optional[frozenset[str]] = None
+    #: cookie names read by the ``cookies`` model, `None` means all the cookies
+    cookie_keys: Optional[frozenset[str]] = None
+    #: select the responses to validate
+    resp_sampler: ResponseSampler = field(default_factory=ResponseSampler)
+    #: the maximum size of the request body in bytes, `None` means unlimited
+    max_body_size: Optional[int] = None
+    #: model class of each line of a newline-delimited JSON body
+    ndjson: Optional[ModelClass] = None
+    #: stream the items returned by the endpoint, see :class:`ResponseStream`
+    stream_format: Optional[StreamFormat] = None
+
+    def validate_resp(self) -> bool:
+        """whether the current response should be validated"""
+        return (
+            not self.skip_validation
+            and self.resp is not None
+            and self.resp_sampler.sample()
+        )
+
+    @property
+    def resp_models(self) -> Mapping[int, ModelClass]:
+        """
+        response models keyed by the integer status code, they're read from the
+        `resp` so the models added by :meth:`Response.add_model` are validated
+        """
+        return self.resp.status_models() if self.resp else {}
+
+    def find_resp_model(self, code: int) -> Optional[ModelClass]:
+        """
+        :param code: HTTP status code
+        """
+        return self.resp_models.get(code)
+
+
+class DocumentResponse(NamedTuple):
+    """framework independent response of the OpenAPI file and doc page routes"""
+
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    :param accept_encoding: value of the `Accept-Encoding` request header
+
+    whether the client accepts a gzip encoded response
+    """
+    if not accept_encoding:
+        return False
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+class EncodedDocument:
+    """
+    A document route body encoded once, with a gzip variant compressed on the
+    first request that accepts it.
+
+    :param identity: the encoded body
+    :param content_type: value of the `Content-Type` response header
+    :param cache_control: value of the `Cache-Control` response header
+    :param gzipped: the body compressed in advance
+    """
+
+    def __init__(
+        self,
+        identity: bytes,
+        content_type: str,
+        cache_control: str,
+        gzipped: Optional[bytes] = None,
+    ):
+        self.identity = identity
+        self.content_type = content_type
+        self.cache_control = cache_control
+        digest = hashlib.sha256(identity).hexdigest()
+        # strong validators must differ between the encodings of a resource
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+        self._gzip = gzipped
+
+    @property
+    def gzip(self) -> bytes:
+        if self._gzip is None:
+            # a fixed mtime keeps the compressed bytes reproducible
+            self._gzip = gzip.compress(self.identity, mtime=0)
+        return self._gzip
+
+    def is_not_modified(self, if_none_match: Optional[str]) -> bool:
+        """
+        :param if_none_match: value of the `If-None-Match` request header
+
+        `If-None-Match` uses the weak comparison, either encoding matches
+        """
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags or self.gzip_etag in tags
+
+    def response(
+        self, if_none_match: Optional[str] = None, accept_encoding: Optional[str] = None
+    ) -> DocumentResponse:
+        use_gzip = accepts_gzip(accept_encoding)
+        headers = {
+            "ETag": self.gzip_etag if use_gzip else self.etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if self.is_not_modified(if_none_match):
+            return DocumentResponse(304, headers, b"")
+
+        headers["Content-Type"] = self.content_type
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return DocumentResponse(200, headers, self.gzip)
+        return DocumentResponse(200, headers, self.identity)
+
+
+class EncodedSpec(EncodedDocument):
+    """
+    The OpenAPI spec encoded to JSON once.
+
+    :param spec: the OpenAPI spec
+    :param cache_control: value of the `Cache-Control` response header
+    """
+
+    def __init__(self, spec: Mapping[str, Any], cache_control: str):
+        self.spec = spec
+        super().__init__(
+            json.dumps(spec, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            "application/json",
+            cache_control,
+        )
+
+
+def read_spec_file(path: str, cache_control: str) -> EncodedDocument:
+    """
+    The OpenAPI file written by `spectree export`, served as-is. A gzipped file
+    is sent to the clients that accept it and decompressed once for the others.
+
+    :param path: path of the OpenAPI file
+    :param cache_control: value of the `Cache-Control` response header
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:2] == GZIP_MAGIC:
+        return EncodedDocument(
+            gzip.decompress(data), "application/json", cache_control, gzipped=data
+        )
+    return EncodedDocument(data, "application/json", cache_control)
 
 
 BackendRoute = TypeVar("BackendRoute")
+T = TypeVar("T")
 
 
 class BasePlugin(Generic[BackendRoute]):
@@ -49,6 +294,9 @@ class BasePlugin(Generic[BackendRoute]):
         self.config: Configuration = spectree.config
         self.model_adapter: ModelAdapterType = spectree.model_adapter
         self.logger = logging.getLogger(__name__)
+        self._encoded_spec: Optional[EncodedDocument] = None
+        self._pages: dict[str, EncodedDocument] = {}
+        self._oauth2_config: Optional[dict[str, Any]] = None
 
     def register_route(self, app: Any):
         """
@@ -58,28 +306,201 @@ class BasePlugin(Generic[BackendRoute]):
         """
         raise NotImplementedError
 
-    def validate(
+    def spec_response(
+        self, if_none_match: Optional[str], accept_encoding: Optional[str]
+    ) -> DocumentResponse:
+        """
+        :param if_none_match: value of the `If-None-Match` request header
+        :param accept_encoding: value of the `Accept-Encoding` request header
+
+        response of the OpenAPI file route, the spec is only encoded again after
+        :attr:`spectree.SpecTree.spec` has been regenerated. The configured
+        `spec_file` is served as-is without generating the spec.
+        """
+        encoded = self._encoded_spec
+        if self.config.spec_file:
+            if encoded is None:
+                encoded = self._encoded_spec = read_spec_file(
+                    self.config.spec_file, self.config.spec_cache_control
+                )
+            return encoded.response(if_none_match, accept_encoding)
+
+        spec = self.spectree.spec
+        if not isinstance(encoded, EncodedSpec) or encoded.spec is not spec:
+            encoded = self._encoded_spec = EncodedSpec(
+                spec, self.config.spec_cache_control
+            )
+        return encoded.response(if_none_match, accept_encoding)
+
+    def in_app_context(self, func: Callable[[], T]) -> T:
+        """
+        :param func: function that finds the routes of the app
+
+        call the `func` outside of a request, some frameworks need a context to
+        access the app
+        """
+        return func()
+
+    def export_spec(self) -> dict[str, Any]:
+        """
+        generate the OpenAPI spec outside of a request, used by `spectree export`
+        """
+        return self.in_app_context(self.spectree._generate_spec)
+
+    def warmup(self):
+        """
+        generate the OpenAPI spec and encode the OpenAPI file route body in all
+        the encodings, used by :meth:`spectree.SpecTree.warmup`
+        """
+        self.in_app_context(lambda: self.spec_response(None, "gzip"))
+
+    def caches(self) -> list[Cache[Any, Any]]:
+        """the caches of the plugin, reported by :meth:`spectree.SpecTree.cache_stats`"""
+        return []
+
+    def page_response(
         self,
-        func: Callable,
-        query: Optional[ModelClass],
-        json: Optional[ModelClass],
-        form: Optional[ModelClass],
-        headers: Optional[ModelClass],
-        cookies: Optional[ModelClass],
-        resp: Optional[Response],
-        before: HookHandler,
-        after: HookHandler,
-        validation_error_status: int,
-        skip_validation: bool,
-        force_resp_serialize: bool,
-        *args: Any,
-        **kwargs: Any,
-    ):
+        ui: str,
+        spec_url: str,
+        if_none_match: Optional[str],
+        accept_encoding: Optional[str],
+    ) -> DocumentResponse:
+        """
+        :param ui: name of the page template in ``page_templates``
+        :param spec_url: OpenAPI file URL used by the page
+        :param if_none_match: value of the `If-None-Match` request header
+        :param accept_encoding: value of the `Accept-Encoding` request header
+
+        response of the doc page route, each page is rendered on the first request
+        """
+        page = self._pages.get(ui)
+        if page is None:
+            if self._oauth2_config is None:
+                # computed once, it warns about a configured client secret
+                self._oauth2_config = self.config.swagger_oauth2_config()
+            html = self.config.page_templates[ui].format(
+                spec_url=spec_url,
+                spec_path=self.config.path,
+                **self._oauth2_config,
+            )
+            page = self._pages[ui] = EncodedDocument(
+                html.encode("utf-8"),
+                "text/html; charset=utf-8",
+                self.config.spec_cache_control,
+            )
+        return page.response(if_none_match, accept_encoding)
+
+    def validate(self, plan: ValidationPlan, *args: Any, **kwargs: Any):
         """
         validate the request and response
+
+        :param plan: :class:`ValidationPlan` compiled for the endpoint
         """
         raise NotImplementedError
 
+    def validate_json_body(self, model: ModelClass, body: bytes) -> Any:
+        """
+        :param model: model class for the JSON request body
+        :param body: raw request body, an empty body is treated as an empty object
+
+        validate the JSON request body without building an intermediate object
+        """
+        if not body:
+            return self.model_adapter.validate_obj(model, {})
+        return self.model_adapter.validate_json(model, body)
+
+    def check_body_size(self, plan: ValidationPlan, size: Optional[int]):
+        """
+        :param plan: validation plan of the endpoint
+        :param size: the `Content-Length` of the request, or the number of the bytes
+            read so far. `None` if it's unknown
+
+        raise a validation error if the body is larger than `plan.max_body_size`
+        """
+        if (
+            plan.max_body_size is not None
+            and size is not None
+            and size > plan.max_body_size
+        ):
+            raise self.body_too_large(plan)
+
+    def body_too_large(self, plan: ValidationPlan) -> Exception:
+        """the validation error of a body larger than `plan.max_body_size`"""
+        return self.model_adapter.make_validation_error(
+            ["body"],
+            f"Request body is larger than {plan.max_body_size} bytes",
+            "body_too_large",
+        )
+
+    def decode_multidict(self, model: ModelClass, items: Any) -> dict[str, Any]:
+        """
+        :param model: the query or form model
+        :param items: the (key, value) pairs of the query string or the form
+
+        decode the items into the validation input by the plan of the model, see
+        :class:`spectree.utils.MultiDictPlan`
+        """
+        return get_multidict_plan(model, self.model_adapter).decode(items)
+
+    def ndjson_records(self, plan: ValidationPlan, chunks: Any) -> NDJSONRecords:
+        """
+        :param plan: validation plan of the endpoint
+        :param chunks: the request body, an (async) iterable of bytes
+
+        the records of the body validated while they're iterated
+        """
+        assert plan.ndjson  # make mypy happy
+        records_class = AsyncNDJSONRecords if self.ASYNC else NDJSONRecords
+        return records_class(
+            chunks,
+            plan.ndjson,
+            self.model_adapter,
+            max_errors=self.config.ndjson_max_errors,
+            max_body_size=plan.max_body_size,
+            body_too_large=partial(self.body_too_large, plan),
+        )
+
+    def stream_response(self, plan: ValidationPlan, items: Any) -> ResponseStream:
+        """
+        :param plan: validation plan of the endpoint
+        :param items: the (async) iterator returned by the endpoint
+
+        the body of the streaming response, each item is validated by the model
+        of the 200 response and serialized when it's sent
+        """
+        assert plan.stream_format  # make mypy happy
+        model_adapter = self.model_adapter
+        model = plan.find_resp_model(200) if plan.validate_resp() else None
+
+        def encode(item: Any) -> bytes:
+            payload = validate_response(
+                model_adapter, model, item, force_serialize=plan.force_resp_serialize
+            ).payload
+            if isinstance(payload, bytes):
+                return payload
+            serialized = model_adapter.try_dump_json(payload)
+            return json.dumps(payload).encode() if serialized is None else serialized
+
+        def on_error(err: Exception) -> Optional[bytes]:
+            errors = model_adapter.validation_errors(err)
+            self.logger.error(
+                "500 Response Validation Error, the stream is stopped: %s", errors
+            )
+            if plan.stream_format != "sse":
+                return None
+            data = model_adapter.try_dump_json(errors)
+            if data is None:
+                data = json.dumps(errors, default=str).encode()
+            return frame("sse", data, event="error")
+
+        return ResponseStream(
+            items,
+            plan.stream_format,
+            encode,
+            model_adapter.validation_error,
+            on_error,
+        )
+
     def find_routes(self) -> BackendRoute:
         """
         find the routes from application
@@ -129,6 +550,52 @@ class BasePlugin(Generic[BackendRoute]):
         return operation_id
 
 
+#: the JSON encoder of a web framework, `dumps(payload, default)` returns the body
+#: of the payload, `default` is called before the framework's own fallback for the
+#: values unknown to the encoder, it raises `TypeError` to pass them on
+JSONDumps = Callable[[Any, Callable[[Any], Any]], bytes]
+
+
+def chain_default(default: Callable, fallback: Callable, value: Any) -> Any:
+    """the `default` of a JSON encoder, `fallback` gets the values `default` passes on"""
+    try:
+        return default(value)
+    except TypeError:
+        return fallback(value)
+
+
+class _ModelInstanceFound(Exception):
+    """stop the encoding of the web framework at the first model instance"""
+
+
+def _dumps_plain(
+    model_adapter: ModelAdapterType, payload: Any, dumps: Optional[JSONDumps]
+) -> Optional[bytes]:
+    """
+    encode a payload without model instances by the web framework in one pass,
+    :class:`_ModelInstanceFound` is raised at the first model instance. Return
+    `None` if the payload is left to the web framework
+    """
+
+    def default(value: Any) -> Any:
+        if model_adapter.is_partial_model_instance(value):
+            raise _ModelInstanceFound
+        raise TypeError(
+            f"Object of type {type(value).__name__} is not JSON serializable"
+        )
+
+    if dumps is not None and isinstance(payload, (dict, list, tuple)):
+        try:
+            return dumps(payload, default)
+        except TypeError:
+            # unknown to the framework too, or its encoder doesn't call `default`
+            pass
+    # the check stops at the first model instance
+    if model_adapter.is_partial_model_instance(payload):
+        raise _ModelInstanceFound
+    return None
+
+
 @dataclass(frozen=True)
 class RawResponsePayload:
     payload: Union[JsonType, bytes]
@@ -144,6 +611,7 @@ def validate_response(
     validation_model: Optional[ModelClass],
     response_payload: Any,
     force_serialize: bool = False,
+    dumps: Optional[JSONDumps] = None,
 ) -> ResponseValidationResult:
     """Validate a given ``response_payload`` against a ``validation_model``.
     This does nothing if ``validation_model is None``.
@@ -154,6 +622,8 @@ def validate_response(
         should be provided when the plugin view function returned an already
         JSON-serialized response payload.
     :param force_serialize: Always serialize the validation model instance.
+    :param dumps: the JSON encoder of the web framework, the payloads without model
+        instances are encoded by it in one pass, see :func:`serialize_response`
     """
     if not validation_model:
         return ResponseValidationResult(payload=response_payload)
@@ -181,10 +651,36 @@ def validate_response(
         # in case the response model contains (alias, default_none, unset fields) which
         # might not be what the users want, we only return the validated payload when
         # the response contains a partial model instance or the user explicitly sets
-        # `force_serialize`
-        if force_serialize or model_adapter.is_partial_model_instance(
-            final_response_payload
-        ):
+        # `force_serialize`, other payloads are serialized by the web framework
+        if force_serialize:
             final_response_payload = model_adapter.dump_json(validated_instance)
+        elif not isinstance(response_payload, RawResponsePayload):
+            try:
+                plain = _dumps_plain(model_adapter, final_response_payload, dumps)
+            except _ModelInstanceFound:
+                final_response_payload = model_adapter.dump_json(validated_instance)
+            else:
+                if plain is not None:
+                    final_response_payload = plain
 
     return ResponseValidationResult(payload=final_response_payload)
+
+
+def serialize_response(
+    model_adapter: ModelAdapterType, payload: Any, dumps: Optional[JSONDumps] = None
+) -> Optional[bytes]:
+    """Serialize a model instance, or a ``dict`` / ``list`` / ``tuple`` payload that
+    contains model instances, by the model adapter in one pass.
+
+    The other payloads are encoded by `dumps`, the JSON encoder of the web framework,
+    so its JSON provider is kept. The encoding stops at the first model instance it
+    meets, the payload isn't scanned upfront. Without `dumps`, the payload is scanned.
+
+    Return `None` if the payload should be serialized by the web framework, i.e. it
+    doesn't contain a model instance and `dumps` isn't given, or it contains values
+    unknown to the model adapter.
+    """
+    try:
+        return _dumps_plain(model_adapter, payload, dumps)
+    except _ModelInstanceFound:
+        return model_adapter.try_dump_json(payload)
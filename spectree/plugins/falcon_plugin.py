@@ -1,21 +1,15 @@
 import asyncio
 import inspect
+import mmap
+import os
 import re
 from collections.abc import AsyncIterator
 from functools import partial
-from typing import Any, Callable, Mapping, Optional
-
-try:
-    # some platforms may ban `tempfile`, e.g. Google App Engine
-    # this is similar to what `werkzeug` did in `werkzeug.formparser`
-    from tempfile import SpooledTemporaryFile
-
-    CachedFile = partial(SpooledTemporaryFile, max_size=1024 * 1024)
-except ImportError:
-    from io import BytesIO as CachedFile  # type: ignore[assignment]
+from io import BytesIO
+from json import dumps as json_dumps
+from typing import Any, Callable, Optional
 
 from falcon import (
-    MEDIA_HTML,
     MEDIA_JSON,
     Request as FalconRequest,
     Response as FalconResponse,
@@ -23,19 +17,45 @@ from falcon import (
 )
 from falcon.asgi import Request as FalconASGIRequest
 from falcon.asgi.reader import BufferedReader as ASGIBufferedReader
+from falcon.media import JSONHandler
 from falcon.routing.compiled import _FIELD_PATTERN as FALCON_FIELD_PATTERN
 from falcon.util.reader import DEFAULT_CHUNK_SIZE, BufferedReader
 
-from spectree._types import HookHandler
 from spectree.model_adapter import ModelClass
-from spectree.plugins.base import BasePlugin, validate_response
-from spectree.response import Response
-from spectree.utils import cached_type_hints
+from spectree.ndjson import NDJSONValidationError, iter_stream
+from spectree.plugins.base import (
+    BasePlugin,
+    DocumentResponse,
+    JSONDumps,
+    ValidationPlan,
+    chain_default,
+    serialize_response,
+    validate_response,
+)
+from spectree.streaming import is_stream, iterate_in_thread
+from spectree.utils import get_projected_items
+
+#: bytes of a file part kept in memory before it's moved to a temporary file
+MAX_MEMORY_SIZE = 1024 * 1024
+#: bytes written to (or read from) the temporary file by one executor call
+SPOOL_BATCH_SIZE = 1024 * 1024
+
+try:
+    # some platforms may ban `tempfile`, e.g. Google App Engine
+    # this is similar to what `werkzeug` did in `werkzeug.formparser`
+    from tempfile import SpooledTemporaryFile, TemporaryFile
+
+    CachedFile = partial(SpooledTemporaryFile, max_size=MAX_MEMORY_SIZE)
+    DiskFile = TemporaryFile
+except ImportError:
+    CachedFile = BytesIO  # type: ignore[assignment,misc]
+    DiskFile = BytesIO  # type: ignore[assignment,misc]
 
 
 class StreamWrapper:
     def __init__(self, stream: BufferedReader):
         self._buf = CachedFile()
+        self._mmap: Optional[mmap.mmap] = None
         stream.pipe(self._buf)
         self._buf.seek(0)
 
@@ -43,55 +63,148 @@ class StreamWrapper:
         """read bytes from the stream, size -1 or None means max bytes"""
         return self._buf.read(size if size is not None else -1)
 
+    def getbuffer(self) -> memoryview:
+        """
+        the data without copying it, the temporary file is memory-mapped once the
+        data has been moved to the disk. Release the views before `exhaust()` or
+        `close()`, they unmap the file
+        """
+        # the underlying file of `SpooledTemporaryFile`
+        buf = getattr(self._buf, "_file", self._buf)
+        if isinstance(buf, BytesIO):
+            return buf.getbuffer()
+        if self._mmap is None:
+            buf.flush()
+            if not os.fstat(buf.fileno()).st_size:
+                # an empty file can't be mapped
+                return memoryview(b"")
+            self._mmap = mmap.mmap(buf.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def _unmap(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
     def exhaust(self) -> None:
+        self._unmap()
         self._buf.seek(0)
         self._buf.truncate(0)
 
+    def close(self) -> None:
+        """unmap and remove the temporary file"""
+        self._unmap()
+        self._buf.close()
+
 
 class AsyncStreamWrapper(StreamWrapper):
-    def __init__(self):
-        self._buf = CachedFile()
+    """
+    The data of a file part in the ASGI multipart form, spooled while the form
+    is parsed.
+
+    The data is kept in memory up to `max_memory_size` bytes without touching
+    the thread pool. Past that, it's moved to a temporary file and written in
+    batches of :data:`SPOOL_BATCH_SIZE` bytes, one executor call per batch.
+
+    :param max_memory_size: bytes kept in memory
+    """
+
+    def __init__(self, max_memory_size: int = MAX_MEMORY_SIZE):
+        self._buf: Any = BytesIO()
+        self._mmap = None
+        self.max_memory_size = max_memory_size
+        #: number of the spooled bytes
+        self.size = 0
+        #: whether the data has been moved to a temporary file
+        self.on_disk = False
+        self._pending: list[Any] = []
+        self._pending_size = 0
 
     @classmethod
-    async def from_stream(cls, stream: ASGIBufferedReader):
-        obj = cls()
-        loop = asyncio.get_running_loop()
+    async def from_stream(
+        cls, stream: ASGIBufferedReader, max_memory_size: int = MAX_MEMORY_SIZE
+    ):
+        obj = cls(max_memory_size)
         async for chunk in stream:
-            await loop.run_in_executor(None, obj._buf.write, chunk)
-        await loop.run_in_executor(None, obj._buf.seek, 0)
+            await obj.write(chunk)
+        if obj.on_disk:
+            await asyncio.get_running_loop().run_in_executor(
+                None, obj._write_pending, True
+            )
+        else:
+            obj._buf.seek(0)
         return obj
 
+    async def write(self, chunk: bytes) -> None:
+        """spool a chunk, the pending batch is written once it's large enough"""
+        self.size += len(chunk)
+        if not self.on_disk:
+            if self.size <= self.max_memory_size:
+                self._buf.write(chunk)
+                return
+            # the data in memory goes with the first batch
+            memory = self._buf.getbuffer()
+            self._pending.append(memory)
+            self._pending_size = len(memory)
+            self._buf = DiskFile()
+            self.on_disk = True
+
+        self._pending.append(chunk)
+        self._pending_size += len(chunk)
+        if self._pending_size >= SPOOL_BATCH_SIZE:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write_pending, False
+            )
+
+    def _write_pending(self, rewind: bool) -> None:
+        pending, self._pending, self._pending_size = self._pending, [], 0
+        if pending:
+            self._buf.write(b"".join(pending))
+        if rewind:
+            self._buf.seek(0)
+
     async def read(self, size: Optional[int] = -1, /) -> bytes:  # type: ignore[override]
+        if not self.on_disk:
+            return super().read(size)
         return await asyncio.get_running_loop().run_in_executor(
             None, super().read, size
         )
 
     async def __aiter__(self) -> AsyncIterator[bytes]:
-        chunk = await self.read(DEFAULT_CHUNK_SIZE)
+        chunk_size = SPOOL_BATCH_SIZE if self.on_disk else DEFAULT_CHUNK_SIZE
+        chunk = await self.read(chunk_size)
         while chunk:
             yield chunk
-            chunk = await self.read(DEFAULT_CHUNK_SIZE)
+            chunk = await self.read(chunk_size)
 
     async def exhaust(self) -> None:  # type: ignore[override]
         super().exhaust()
 
 
-class OpenAPI:
-    def __init__(self, spec: Mapping[str, str]):
-        self.spec = spec
+def handler_dumps(dumps: partial, payload: Any, default: Callable) -> bytes:
+    """encode the payload like the JSON media handler, its `default` is kept"""
+    fallback = dumps.keywords.get("default")
+    if fallback is not None:
+        default = partial(chain_default, default, fallback)
+    return dumps(payload, default=default).encode()
 
-    def on_get(self, _: Any, resp: Any):
-        resp.content_type = MEDIA_JSON
-        resp.media = self.spec
 
+class OpenAPI:
+    def __init__(
+        self,
+        document_response: Callable[[Optional[str], Optional[str]], DocumentResponse],
+    ):
+        self.document_response = document_response
 
-class DocPage:
-    def __init__(self, html: str, **kwargs: Any):
-        self.page = html.format(**kwargs).encode("utf-8")
+    def on_get(self, req: Any, resp: Any):
+        resp.status, headers, resp.data = self.document_response(
+            req.get_header("If-None-Match"), req.get_header("Accept-Encoding")
+        )
+        resp.set_headers(headers)
 
-    def on_get(self, _: Any, resp: Any):
-        resp.content_type = MEDIA_HTML
-        resp.data = self.page
+
+class DocPage(OpenAPI):
+    """same as :class:`OpenAPI`, the class name keeps the pages out of the spec"""
 
 
 class OpenAPIAsgi(OpenAPI):
@@ -135,16 +248,13 @@ class FalconPlugin(BasePlugin):
 
     def register_route(self, app: Any):
         app.add_route(
-            self.config.spec_url, self.OPEN_API_ROUTE_CLASS(self.spectree.spec)
+            self.config.spec_url, self.OPEN_API_ROUTE_CLASS(self.spec_response)
         )
         for ui in self.config.page_templates:
             app.add_route(
                 f"/{self.config.path}/{ui}",
                 self.DOC_PAGE_ROUTE_CLASS(
-                    self.config.page_templates[ui],
-                    spec_url=self.config.filename,
-                    spec_path=self.config.path,
-                    **self.config.swagger_oauth2_config(),
+                    partial(self.page_response, ui, self.config.filename)
                 ),
             )
 
@@ -231,13 +341,81 @@ class FalconPlugin(BasePlugin):
 
         return f"/{'/'.join(subs)}", parameters
 
-    def validate_request(self, req: FalconRequest, query, json, form, headers, cookies):
-        if query:
-            req.context.query = self.model_adapter.validate_obj(query, req.params)
-        if headers:
-            req.context.headers = self.model_adapter.validate_obj(headers, req.headers)
-        if cookies:
-            req.context.cookies = self.model_adapter.validate_obj(cookies, req.cookies)
+    def validate_params(self, req: Any, plan: ValidationPlan):
+        """validate the query, headers and cookies which don't read the body"""
+        if plan.query:
+            req.context.query = self.model_adapter.validate_obj(plan.query, req.params)
+        if plan.headers:
+            req.context.headers = self.model_adapter.validate_obj(
+                plan.headers,
+                req.headers
+                if plan.header_keys is None
+                else get_projected_items(req.get_header, plan.header_keys),
+            )
+        if plan.cookies:
+            req.context.cookies = self.model_adapter.validate_obj(
+                plan.cookies,
+                req.cookies
+                if plan.cookie_keys is None
+                else get_projected_items(req.cookies.get, plan.cookie_keys),
+            )
+
+    def unread_fields(self, form: ModelClass) -> Optional[list[frozenset[str]]]:
+        """
+        the input keys of each field of the form model, a multipart form is parsed
+        until all of them are found with the `lazy_form_files` config. `None` if
+        the config is off, or the fields of the model are unknown
+        """
+        if not self.config.lazy_form_files:
+            return None
+        fields = list(self.model_adapter.field_aliases(form).values())
+        keys = self.model_adapter.field_keys(form)
+        if keys is not None:
+            # the fields without aliases
+            aliased = frozenset().union(*fields)
+            fields.extend(frozenset((key,)) for key in keys - aliased)
+        return fields or None
+
+    @staticmethod
+    def read_field(unread: Optional[list[frozenset[str]]], name: str) -> bool:
+        """mark the field of the part as read, return whether all of them are"""
+        if unread is None:
+            return False
+        unread[:] = [keys for keys in unread if name not in keys]
+        return not unread
+
+    def parse_multipart(self, req: FalconRequest, form: ModelClass) -> dict[str, Any]:
+        """
+        collect the fields of a multipart form, the file parts are passed as the
+        `falcon.BodyPart`. With the `lazy_form_files` config, it stops once all the
+        fields of the form model are found, a file part that is the last of them
+        is left unread, the earlier ones are spooled.
+        """
+        req_form: dict[str, Any] = {}
+        parts = iter(req.get_media())
+        unread = self.unread_fields(form)
+        if unread is not None:
+            # the next part drains the unread data of the file part
+            req.context.form_parts = parts
+        for part in parts:
+            done = self.read_field(unread, part.name)
+            if part.filename is None:
+                req_form[part.name] = part.get_data()
+            else:
+                req_form[part.name] = part
+                if not done:
+                    # try to consume the file data, otherwise it will be lost
+                    # this is hacky since it changed the underlying stream type
+                    part.stream = StreamWrapper(part.stream)
+            if done:
+                break
+        return req_form
+
+    def validate_request(self, req: FalconRequest, plan: ValidationPlan):
+        # the body without `Content-Length` isn't read by the WSGI request
+        self.check_body_size(plan, req.content_length)
+        self.validate_params(req, plan)
+        json, form = plan.json, plan.form
         if json:
             # https://falcon.readthedocs.io/en/stable/api/media.html#exception-handling
             # but `json` could be something optional, so we need to provide a default
@@ -250,36 +428,44 @@ class FalconPlugin(BasePlugin):
             if req.content_type == "application/x-www-form-urlencoded":
                 req_form = req.get_media()
             elif req.content_type.startswith("multipart/form-data"):
-                for part in req.get_media():
-                    if part.filename is None:
-                        req_form[part.name] = part.get_data()
-                    else:
-                        # pass the `falcon.BodyPart` if it's attached as a file
-                        req_form[part.name] = part
-                        # try to consume the file data, otherwise it will be lost
-                        # this is hacky since it changed the underlying stream type
-                        part.stream = StreamWrapper(part.stream)
+                req_form = self.parse_multipart(req, form)
             req.context.form = self.model_adapter.validate_obj(form, req_form)
+        if plan.ndjson:
+            req.context.ndjson = self.ndjson_records(
+                plan, iter_stream(req.bounded_stream)
+            )
+
+    @staticmethod
+    def json_dumps(resp: FalconResponse) -> Optional[JSONDumps]:
+        """
+        the encoder of the JSON media handler, `None` if it's not the `json.dumps`
+        of the default :class:`falcon.media.JSONHandler`, it may not take `default`
+        """
+        if resp.content_type != MEDIA_JSON:
+            return None
+        handler = resp.options.media_handlers.get(MEDIA_JSON)
+        if type(handler) is not JSONHandler:
+            return None
+        # the handler doesn't expose its encoder
+        dumps = getattr(handler, "_dumps", None)
+        if not (isinstance(dumps, partial) and dumps.func is json_dumps):
+            return None
+        return partial(handler_dumps, dumps)
 
     def validate_response(
-        self,
-        resp: FalconResponse,
-        resp_model: Optional[Response],
-        skip_validation: bool,
-        force_resp_serialize: bool,
+        self, resp: FalconResponse, plan: ValidationPlan
     ) -> Optional[Exception]:
         resp_validation_error = None
         if not self._data_set_manually(resp):
-            if not skip_validation and resp_model:
+            if plan.validate_resp():
                 try:
                     status = http_status_to_code(resp.status)
                     response_validation_result = validate_response(
                         model_adapter=self.model_adapter,
-                        validation_model=resp_model.find_model(status)
-                        if resp_model
-                        else None,
+                        validation_model=plan.find_resp_model(status),
                         response_payload=resp.media,
-                        force_serialize=force_resp_serialize,
+                        force_serialize=plan.force_resp_serialize,
+                        dumps=self.json_dumps(resp),
                     )
                 except self.model_adapter.validation_error as err:
                     resp_validation_error = err
@@ -291,61 +477,78 @@ class FalconPlugin(BasePlugin):
                         resp.content_type = MEDIA_JSON
                     else:
                         resp.media = response_validation_result.payload
-            elif self.model_adapter.is_partial_model_instance(resp.media):
-                resp.data = self.model_adapter.dump_json(resp.media)
-                resp.content_type = MEDIA_JSON
+            else:
+                serialized = serialize_response(
+                    self.model_adapter, resp.media, self.json_dumps(resp)
+                )
+                if serialized is not None:
+                    resp.data = serialized
+                    resp.content_type = MEDIA_JSON
 
         return resp_validation_error
 
-    def validate(
-        self,
-        func: Callable,
-        query: Optional[ModelClass],
-        json: Optional[ModelClass],
-        form: Optional[ModelClass],
-        headers: Optional[ModelClass],
-        cookies: Optional[ModelClass],
-        resp: Optional[Response],
-        before: HookHandler,
-        after: HookHandler,
-        validation_error_status: int,
-        skip_validation: bool,
-        force_resp_serialize: bool,
-        *args: Any,
-        **kwargs: Any,
-    ):
+    def validate(self, plan: ValidationPlan, *args: Any, **kwargs: Any):
         # falcon endpoint method arguments: (self, req, resp)
         _self, _req, _resp = args[:3]
         req_validation_error = None
-        if not skip_validation:
+        if not plan.skip_validation:
             try:
-                self.validate_request(_req, query, json, form, headers, cookies)
+                self.validate_request(_req, plan)
 
             except self.model_adapter.validation_error as err:
                 req_validation_error = err
-                _resp.status = f"{validation_error_status} Validation Error"
+                _resp.status = f"{plan.validation_error_status} Validation Error"
                 _resp.media = self.model_adapter.validation_errors(err)
 
-        before(_req, _resp, req_validation_error, _self, self.model_adapter)
+        plan.before(_req, _resp, req_validation_error, _self, self.model_adapter)
         if req_validation_error:
             return None
 
-        if self.config.annotations:
-            annotations = cached_type_hints(func)
-            for name in ("query", "json", "form", "headers", "cookies"):
-                if annotations.get(name):
-                    kwargs[name] = getattr(_req.context, name, None)
+        for name in plan.annotated:
+            kwargs[name] = getattr(_req.context, name, None)
 
-        result = func(*args, **kwargs)
+        try:
+            result = plan.func(*args, **kwargs)
+        except NDJSONValidationError as err:
+            self.ndjson_error(_resp, plan, err)
+            return None
 
-        resp_validation_error = self.validate_response(
-            _resp, resp, skip_validation, force_resp_serialize
-        )
-        after(_req, _resp, resp_validation_error, _self, self.model_adapter)
+        if self.set_stream(_resp, plan, result):
+            resp_validation_error = None
+        else:
+            resp_validation_error = self.validate_response(_resp, plan)
+        plan.after(_req, _resp, resp_validation_error, _self, self.model_adapter)
         # `falcon` doesn't use this return value. However, some users may have
         # their own processing logics that depend on this return value.
         return result
 
+    def set_stream(self, resp: Any, plan: ValidationPlan, result: Any) -> bool:
+        """
+        stream the items returned by the endpoint, or set as `resp.media`, if the
+        endpoint has a `stream_format`
+        """
+        items = result if is_stream(result) else resp.media
+        if not plan.stream_format or not is_stream(items):
+            return False
+        stream = self.stream_response(plan, items)
+        resp.media = None
+        if not self.ASYNC:
+            resp.stream = iter(stream)
+        elif stream.is_async:
+            resp.stream = stream.__aiter__()
+        else:
+            resp.stream = iterate_in_thread(iter(stream))
+        resp.content_type = stream.media_type
+        return True
+
+    @staticmethod
+    def ndjson_error(resp: Any, plan: ValidationPlan, err: NDJSONValidationError):
+        """replace the response with the errors of the NDJSON body"""
+        resp.status = f"{plan.validation_error_status} Validation Error"
+        resp.data = None
+        resp.text = None
+        resp.media = err.errors
+
     @staticmethod
     def _data_set_manually(resp):
         return (resp.text is not None or resp.data is not None) and resp.media is None
@@ -363,15 +566,34 @@ class FalconAsgiPlugin(FalconPlugin):
     OPEN_API_ROUTE_CLASS = OpenAPIAsgi
     DOC_PAGE_ROUTE_CLASS = DocPageAsgi
 
+    async def parse_multipart_async(
+        self, req: FalconASGIRequest, form: ModelClass
+    ) -> dict[str, Any]:
+        """the async version of :meth:`FalconPlugin.parse_multipart`"""
+        req_form: dict[str, Any] = {}
+        parts = (await req.get_media()).__aiter__()
+        unread = self.unread_fields(form)
+        if unread is not None:
+            req.context.form_parts = parts
+        async for part in parts:
+            done = self.read_field(unread, part.name)
+            if part.filename is None:
+                req_form[part.name] = await part.get_data()
+            else:
+                req_form[part.name] = part
+                if not done:
+                    # try to consume the file data, otherwise it will be lost
+                    part.stream = await AsyncStreamWrapper.from_stream(part.stream)
+            if done:
+                break
+        return req_form
+
     async def validate_async_request(
-        self, req: FalconASGIRequest, query, json, form, headers, cookies
+        self, req: FalconASGIRequest, plan: ValidationPlan
     ):
-        if query:
-            req.context.query = self.model_adapter.validate_obj(query, req.params)
-        if headers:
-            req.context.headers = self.model_adapter.validate_obj(headers, req.headers)
-        if cookies:
-            req.context.cookies = self.model_adapter.validate_obj(cookies, req.cookies)
+        self.check_body_size(plan, req.content_length)
+        self.validate_params(req, plan)
+        json, form = plan.json, plan.form
         if json:
             # https://falcon.readthedocs.io/en/stable/api/media.html#exception-handling
             # but `json` could be something optional, so we need to provide a default
@@ -383,65 +605,44 @@ class FalconAsgiPlugin(FalconPlugin):
             if req.content_type == "application/x-www-form-urlencoded":
                 req_form = await req.get_media()
             elif req.content_type.startswith("multipart/form-data"):
-                async for part in await req.get_media():
-                    if part.filename is None:
-                        req_form[part.name] = await part.get_data()
-                    else:
-                        # pass the `falcon.BodyPart` if it's attached as a file
-                        req_form[part.name] = part
-                        # try to consume the file data, otherwise it will be lost
-                        part.stream = await AsyncStreamWrapper.from_stream(part.stream)
+                req_form = await self.parse_multipart_async(req, form)
             req.context.form = self.model_adapter.validate_obj(form, req_form)
+        if plan.ndjson:
+            req.context.ndjson = self.ndjson_records(plan, req.stream)
 
-    async def validate(
-        self,
-        func: Callable,
-        query: Optional[ModelClass],
-        json: Optional[ModelClass],
-        form: Optional[ModelClass],
-        headers: Optional[ModelClass],
-        cookies: Optional[ModelClass],
-        resp: Optional[Response],
-        before: HookHandler,
-        after: HookHandler,
-        validation_error_status: int,
-        skip_validation: bool,
-        force_resp_serialize: bool,
-        *args: Any,
-        **kwargs: Any,
-    ):
+    async def validate(self, plan: ValidationPlan, *args: Any, **kwargs: Any):
         # falcon endpoint method arguments: (self, req, resp)
         _self, _req, _resp = args[:3]
         req_validation_error = None
-        if not skip_validation:
+        if not plan.skip_validation:
             try:
-                await self.validate_async_request(
-                    _req, query, json, form, headers, cookies
-                )
+                await self.validate_async_request(_req, plan)
 
             except self.model_adapter.validation_error as err:
                 req_validation_error = err
-                _resp.status = f"{validation_error_status} Validation Error"
+                _resp.status = f"{plan.validation_error_status} Validation Error"
                 _resp.media = self.model_adapter.validation_errors(err)
 
-        before(_req, _resp, req_validation_error, _self, self.model_adapter)
+        plan.before(_req, _resp, req_validation_error, _self, self.model_adapter)
         if req_validation_error:
             return None
 
-        if self.config.annotations:
-            annotations = cached_type_hints(func)
-            for name in ("query", "json", "form", "headers", "cookies"):
-                if annotations.get(name):
-                    kwargs[name] = getattr(_req.context, name, None)
+        for name in plan.annotated:
+            kwargs[name] = getattr(_req.context, name, None)
 
-        result = (
-            await func(*args, **kwargs)
-            if inspect.iscoroutinefunction(func)
-            else func(*args, **kwargs)
-        )
+        try:
+            result = (
+                await plan.func(*args, **kwargs)
+                if plan.is_coroutine
+                else plan.func(*args, **kwargs)
+            )
+        except NDJSONValidationError as err:
+            self.ndjson_error(_resp, plan, err)
+            return None
 
-        resp_validation_error = self.validate_response(
-            _resp, resp, skip_validation, force_resp_serialize
-        )
-        after(_req, _resp, resp_validation_error, _self, self.model_adapter)
+        if self.set_stream(_resp, plan, result):
+            resp_validation_error = None
+        else:
+            resp_validation_error = self.validate_response(_resp, plan)
+        plan.after(_req, _resp, resp_validation_error, _self, self.model_adapter)
         return result
@@ -1,20 +1,34 @@
-from typing import Any, Callable, Optional
+from contextlib import suppress
+from typing import Any, Callable, TypeVar
 
 import flask
 from flask import Blueprint, abort, current_app, jsonify, make_response, request
-
-from spectree._types import HookHandler
-from spectree.model_adapter import ModelClass
-from spectree.plugins.base import Context, validate_response
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from spectree.ndjson import NDJSONValidationError, iter_stream
+from spectree.plugins.base import (
+    Context,
+    ValidationPlan,
+    serialize_response,
+    validate_response,
+)
 from spectree.plugins.werkzeug_utils import WerkzeugPlugin, flask_response_unpack
-from spectree.response import Response
-from spectree.utils import cached_type_hints, get_multidict_items
+from spectree.streaming import is_stream
+from spectree.utils import get_multidict_items
+
+T = TypeVar("T")
 
 
 class FlaskPlugin(WerkzeugPlugin):
+    JSON_PROVIDER = DefaultJSONProvider
+
     def get_current_app(self):
         return current_app
 
+    def get_current_request(self):
+        return request
+
     def is_app_response(self, resp):
         return isinstance(resp, flask.Response)
 
@@ -22,40 +36,91 @@ class FlaskPlugin(WerkzeugPlugin):
     def is_blueprint(app: Any) -> bool:
         return isinstance(app, Blueprint)
 
-    def request_validation(self, request, query, json, form, headers, cookies):
+    def in_app_context(self, func: Callable[[], T]) -> T:
+        with self.registered_app().app_context():
+            return func()
+
+    def request_validation(self, request, plan: ValidationPlan):
         """
         req_query: werkzeug.datastructures.ImmutableMultiDict
         req_json: dict
         req_headers: werkzeug.datastructures.EnvironHeaders
         req_cookies: werkzeug.datastructures.ImmutableMultiDict
         """
-        req_query = get_multidict_items(request.args, query)
-        req_headers = dict(iter(request.headers)) or {}
-        req_cookies = get_multidict_items(request.cookies)
+        query, json, form, headers, cookies = (
+            plan.query,
+            plan.json,
+            plan.form,
+            plan.headers,
+            plan.cookies,
+        )
         has_data = request.method not in ("GET", "DELETE")
         # flask Request.mimetype is already normalized
         use_json = json and has_data and request.mimetype not in self.FORM_MIMETYPE
-        use_form = form and has_data and request.mimetype in self.FORM_MIMETYPE
-
-        request.context = Context(
-            self.model_adapter.validate_obj(query, req_query) if query else None,
-            self.model_adapter.validate_obj(json, request.get_json(silent=True) or {})
-            if use_json
-            else None,
-            self.model_adapter.validate_obj(form, self.fill_form(request))
-            if use_form
-            else None,
-            self.model_adapter.validate_obj(headers, req_headers) if headers else None,
-            self.model_adapter.validate_obj(cookies, req_cookies) if cookies else None,
-        )
+        use_form = has_data and request.mimetype in self.FORM_MIMETYPE
+
+        if plan.max_body_size is not None:
+            self.check_body_size(plan, request.content_length)
+            if not plan.ndjson:
+                # the NDJSON records are read in the endpoint, they check the size
+                self.limit_stream(request, plan)
+
+        try:
+            request.context = Context(
+                self.model_adapter.validate_obj(
+                    query, self.decode_multidict(query, request.args.items(multi=True))
+                )
+                if query
+                else None,
+                self.json_validation(request, json) if use_json else None,
+                self.model_adapter.validate_obj(form, self.fill_form(request, form))
+                if form and use_form
+                else None,
+                self.model_adapter.validate_obj(
+                    headers, self.get_headers(request, plan.header_keys)
+                )
+                if headers
+                else None,
+                self.model_adapter.validate_obj(
+                    cookies,
+                    get_multidict_items(request.cookies, keys=plan.cookie_keys),
+                )
+                if cookies
+                else None,
+                ndjson=self.ndjson_records(plan, iter_stream(request.stream))
+                if plan.ndjson and has_data
+                else None,
+            )
+        except RequestEntityTooLarge:
+            # raised by the stream when the limit of the endpoint is exceeded
+            if request.max_content_length != plan.max_body_size:
+                raise
+            raise self.body_too_large(plan) from None
 
-    def validate_response(
-        self,
-        resp,
-        resp_model: Optional[Response],
-        skip_validation: bool,
-        force_resp_serialize: bool,
-    ):
+    @staticmethod
+    def limit_stream(request, plan: ValidationPlan):
+        """
+        limit the body without `Content-Length` while it's read, the stream raises
+        :class:`werkzeug.exceptions.RequestEntityTooLarge` once it's exceeded
+        """
+        limit = request.max_content_length
+        if limit is not None and limit <= plan.max_body_size:
+            # the `MAX_CONTENT_LENGTH` of the app is stricter
+            return
+        # it's read-only before Flask 3.1, only `Content-Length` is checked then
+        with suppress(AttributeError):
+            request.max_content_length = plan.max_body_size
+
+    def json_validation(self, request, json):
+        if not self.config.raw_json_body:
+            return self.model_adapter.validate_obj(
+                json, request.get_json(silent=True) or {}
+            )
+        # non-JSON mimetype is treated as an empty body like `get_json(silent=True)`
+        body = request.get_data() if request.is_json else b""
+        return self.validate_json_body(json, body)
+
+    def validate_response(self, resp, plan: ValidationPlan):
         resp_validation_error = None
         payload, status, additional_headers = flask_response_unpack(resp)
 
@@ -70,13 +135,14 @@ class FlaskPlugin(WerkzeugPlugin):
             resp_headers.extend(additional_headers)
             additional_headers = resp_headers
 
-        if not skip_validation and resp_model:
+        if plan.validate_resp():
             try:
                 response_validation_result = validate_response(
                     model_adapter=self.model_adapter,
-                    validation_model=resp_model.find_model(status),
+                    validation_model=plan.find_resp_model(status),
                     response_payload=payload,
-                    force_serialize=force_resp_serialize,
+                    force_serialize=plan.force_resp_serialize,
+                    dumps=self.json_dumps(),
                 )
             except self.model_adapter.validation_error as err:
                 errors = self.model_adapter.validation_errors(err)
@@ -94,63 +160,51 @@ class FlaskPlugin(WerkzeugPlugin):
                     additional_headers,
                 )
         else:
-            if self.model_adapter.is_partial_model_instance(payload):
+            serialized = serialize_response(
+                self.model_adapter, payload, self.json_dumps()
+            )
+            if serialized is not None:
                 payload = self.get_current_app().response_class(
-                    self.model_adapter.dump_json(payload),
-                    mimetype="application/json",
+                    serialized, mimetype="application/json"
                 )
             response = make_response(payload, status, additional_headers)
 
         return response, resp_validation_error
 
-    def validate(
-        self,
-        func: Callable,
-        query: Optional[ModelClass],
-        json: Optional[ModelClass],
-        form: Optional[ModelClass],
-        headers: Optional[ModelClass],
-        cookies: Optional[ModelClass],
-        resp: Optional[Response],
-        before: HookHandler,
-        after: HookHandler,
-        validation_error_status: int,
-        skip_validation: bool,
-        force_resp_serialize: bool,
-        *args: Any,
-        **kwargs: Any,
-    ):
+    def validate(self, plan: ValidationPlan, *args: Any, **kwargs: Any):
         response, req_validation_error = None, None
-        if not skip_validation:
+        if not plan.skip_validation:
             try:
-                self.request_validation(request, query, json, form, headers, cookies)
+                self.request_validation(request, plan)
             except self.model_adapter.validation_error as err:
                 req_validation_error = err
                 errors = self.model_adapter.validation_errors(err)
-                response = make_response(jsonify(errors), validation_error_status)
+                response = make_response(jsonify(errors), plan.validation_error_status)
 
-        before(request, response, req_validation_error, None, self.model_adapter)
+        plan.before(request, response, req_validation_error, None, self.model_adapter)
 
         if req_validation_error is not None:
             assert response  # make mypy happy
             abort(response)
 
-        if self.config.annotations:
-            annotations = cached_type_hints(func)
-            for name in ("query", "json", "form", "headers", "cookies"):
-                if annotations.get(name):
-                    kwargs[name] = getattr(
-                        getattr(request, "context", None), name, None
-                    )
-
-        result = func(*args, **kwargs)
-
-        response, resp_validation_error = self.validate_response(
-            result,
-            resp,
-            skip_validation,
-            force_resp_serialize,
-        )
-        after(request, response, resp_validation_error, None, self.model_adapter)
+        if plan.annotated:
+            context = getattr(request, "context", None)
+            for name in plan.annotated:
+                kwargs[name] = getattr(context, name, None)
+
+        try:
+            result = plan.func(*args, **kwargs)
+        except NDJSONValidationError as err:
+            abort(make_response(jsonify(err.errors), plan.validation_error_status))
+
+        if plan.stream_format and is_stream(result):
+            stream = self.stream_response(plan, result)
+            response = self.get_current_app().response_class(
+                iter(stream), mimetype=stream.media_type
+            )
+            resp_validation_error = None
+        else:
+            response, resp_validation_error = self.validate_response(result, plan)
+        plan.after(request, response, resp_validation_error, None, self.model_adapter)
 
         return response
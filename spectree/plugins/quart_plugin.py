@@ -1,24 +1,39 @@
-import inspect
-from typing import Any, Callable, Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Callable, TypeVar
 
 import quart
 from quart import Blueprint, abort, current_app, jsonify, make_response, request
+from quart.json.provider import DefaultJSONProvider
+from quart.utils import run_sync_iterable
 
-from spectree._types import HookHandler
 from spectree.model_adapter import ModelClass
-from spectree.plugins.base import Context, validate_response
+from spectree.ndjson import NDJSONValidationError
+from spectree.plugins.base import (
+    Context,
+    ValidationPlan,
+    serialize_response,
+    validate_response,
+)
 from spectree.plugins.werkzeug_utils import WerkzeugPlugin, flask_response_unpack
-from spectree.response import Response
-from spectree.utils import cached_type_hints, get_multidict_items
+from spectree.streaming import is_stream
+from spectree.utils import get_multidict_items
+
+T = TypeVar("T")
 
 
 class QuartPlugin(WerkzeugPlugin):
     FORM_MIMETYPE = ("application/x-www-form-urlencoded", "multipart/form-data")
     ASYNC = True
+    JSON_PROVIDER = DefaultJSONProvider
 
     def get_current_app(self):
         return current_app
 
+    def get_current_request(self):
+        return request
+
     def is_app_response(self, resp):
         return isinstance(resp, quart.Response)
 
@@ -26,45 +41,86 @@ class QuartPlugin(WerkzeugPlugin):
     def is_blueprint(app: Any) -> bool:
         return isinstance(app, Blueprint)
 
-    async def request_validation(self, request, query, json, form, headers, cookies):
+    def in_app_context(self, func: Callable[[], T]) -> T:
+        async def call() -> T:
+            async with self.registered_app().app_context():
+                return func()
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(call())
+        # called from a coroutine, like a `before_serving` hook, the app context
+        # is pushed by a loop of its own in another thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, call()).result()
+
+    async def request_validation(self, request, plan: ValidationPlan):
         """
         req_query: werkzeug.datastructures.ImmutableMultiDict
         req_json: dict
         req_headers: werkzeug.datastructures.EnvironHeaders
         req_cookies: werkzeug.datastructures.ImmutableMultiDict
         """
-        req_query = get_multidict_items(request.args)
-        req_headers = dict(iter(request.headers)) or {}
-        req_cookies = get_multidict_items(request.cookies) or {}
+        query, json, form, headers, cookies = (
+            plan.query,
+            plan.json,
+            plan.form,
+            plan.headers,
+            plan.cookies,
+        )
         has_data = request.method not in ("GET", "DELETE")
         use_json = json and has_data and request.mimetype == "application/json"
-        use_form = (
-            form
-            and has_data
-            and any([x in request.mimetype for x in self.FORM_MIMETYPE])
-        )
+        use_form = has_data and any([x in request.mimetype for x in self.FORM_MIMETYPE])
+        if plan.max_body_size is not None:
+            self.check_body_size(plan, request.content_length)
+            if request.content_length is None and (use_json or (form and use_form)):
+                # quart buffers the body as it arrives (bounded by the app's
+                # `MAX_CONTENT_LENGTH`), a large one is rejected before parsing
+                self.check_body_size(plan, len(await request.get_data()))
 
         request.context = Context(
-            self.model_adapter.validate_obj(query, req_query) if query else None,
             self.model_adapter.validate_obj(
-                json, await request.get_json(silent=True) or {}
+                query, self.decode_multidict(query, request.args.items(multi=True))
             )
-            if use_json
+            if query
             else None,
-            self.model_adapter.validate_obj(form, self.fill_form(request))
-            if use_form
+            await self.json_validation(request, json) if use_json else None,
+            self.model_adapter.validate_obj(
+                form, await self.fill_async_form(request, form)
+            )
+            if form and use_form
+            else None,
+            self.model_adapter.validate_obj(
+                headers, self.get_headers(request, plan.header_keys)
+            )
+            if headers
+            else None,
+            self.model_adapter.validate_obj(
+                cookies, get_multidict_items(request.cookies, keys=plan.cookie_keys)
+            )
+            if cookies
+            else None,
+            ndjson=self.ndjson_records(plan, request.body)
+            if plan.ndjson and has_data
             else None,
-            self.model_adapter.validate_obj(headers, req_headers) if headers else None,
-            self.model_adapter.validate_obj(cookies, req_cookies) if cookies else None,
         )
 
-    async def validate_response(
-        self,
-        resp,
-        resp_model: Optional[Response],
-        skip_validation: bool,
-        force_resp_serialize: bool,
-    ):
+    async def fill_async_form(self, request, model: ModelClass) -> dict:
+        form, files = await request.form, await request.files
+        items = form.items(multi=True)
+        if files:
+            items = chain(items, files.items(multi=True))
+        return self.decode_multidict(model, items)
+
+    async def json_validation(self, request, json):
+        if not self.config.raw_json_body:
+            return self.model_adapter.validate_obj(
+                json, await request.get_json(silent=True) or {}
+            )
+        return self.validate_json_body(json, await request.get_data())
+
+    async def validate_response(self, resp, plan: ValidationPlan):
         resp_validation_error = None
         payload, status, additional_headers = flask_response_unpack(resp)
 
@@ -79,13 +135,14 @@ class QuartPlugin(WerkzeugPlugin):
             resp_headers.extend(additional_headers)
             additional_headers = resp_headers
 
-        if not skip_validation and resp_model:
+        if plan.validate_resp():
             try:
                 response_validation_result = validate_response(
                     model_adapter=self.model_adapter,
-                    validation_model=resp_model.find_model(status),
+                    validation_model=plan.find_resp_model(status),
                     response_payload=payload,
-                    force_serialize=force_resp_serialize,
+                    force_serialize=plan.force_resp_serialize,
+                    dumps=self.json_dumps(),
                 )
             except self.model_adapter.validation_error as err:
                 errors = self.model_adapter.validation_errors(err)
@@ -103,68 +160,60 @@ class QuartPlugin(WerkzeugPlugin):
                     additional_headers,
                 )
         else:
-            if self.model_adapter.is_partial_model_instance(payload):
+            serialized = serialize_response(
+                self.model_adapter, payload, self.json_dumps()
+            )
+            if serialized is not None:
                 payload = self.get_current_app().response_class(
-                    self.model_adapter.dump_json(payload),
-                    mimetype="application/json",
+                    serialized, mimetype="application/json"
                 )
             response = await make_response(payload, status, additional_headers)
 
         return response, resp_validation_error
 
-    async def validate(
-        self,
-        func: Callable,
-        query: Optional[ModelClass],
-        json: Optional[ModelClass],
-        form: Optional[ModelClass],
-        headers: Optional[ModelClass],
-        cookies: Optional[ModelClass],
-        resp: Optional[Response],
-        before: HookHandler,
-        after: HookHandler,
-        validation_error_status: int,
-        skip_validation: bool,
-        force_resp_serialize: bool,
-        *args: Any,
-        **kwargs: Any,
-    ):
+    async def validate(self, plan: ValidationPlan, *args: Any, **kwargs: Any):
         response, req_validation_error, resp_validation_error = None, None, None
-        if not skip_validation:
+        if not plan.skip_validation:
             try:
-                await self.request_validation(
-                    request, query, json, form, headers, cookies
-                )
+                await self.request_validation(request, plan)
             except self.model_adapter.validation_error as err:
                 req_validation_error = err
                 errors = self.model_adapter.validation_errors(err)
-                response = await make_response(jsonify(errors), validation_error_status)
+                response = await make_response(
+                    jsonify(errors), plan.validation_error_status
+                )
 
-        before(request, response, req_validation_error, None, self.model_adapter)
+        plan.before(request, response, req_validation_error, None, self.model_adapter)
         if req_validation_error:
             assert response  # make mypy happy
             abort(response)  # type: ignore
 
-        if self.config.annotations:
-            annotations = cached_type_hints(func)
-            for name in ("query", "json", "form", "headers", "cookies"):
-                if annotations.get(name):
-                    kwargs[name] = getattr(
-                        getattr(request, "context", None), name, None
-                    )
+        if plan.annotated:
+            context = getattr(request, "context", None)
+            for name in plan.annotated:
+                kwargs[name] = getattr(context, name, None)
 
-        result = (
-            await func(*args, **kwargs)
-            if inspect.iscoroutinefunction(func)
-            else func(*args, **kwargs)
-        )
+        try:
+            result = (
+                await plan.func(*args, **kwargs)
+                if plan.is_coroutine
+                else plan.func(*args, **kwargs)
+            )
+        except NDJSONValidationError as err:
+            abort(
+                await make_response(jsonify(err.errors), plan.validation_error_status)  # type: ignore
+            )
 
-        response, resp_validation_error = await self.validate_response(
-            result,
-            resp,
-            skip_validation,
-            force_resp_serialize,
-        )
-        after(request, response, resp_validation_error, None, self.model_adapter)
+        if plan.stream_format and is_stream(result):
+            stream = self.stream_response(plan, result)
+            response = self.get_current_app().response_class(
+                stream.__aiter__()
+                if stream.is_async
+                else run_sync_iterable(iter(stream)),
+                mimetype=stream.media_type,
+            )
+        else:
+            response, resp_validation_error = await self.validate_response(result, plan)
+        plan.after(request, response, resp_validation_error, None, self.model_adapter)
 
         return response
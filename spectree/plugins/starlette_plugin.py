@@ -1,36 +1,42 @@
 import inspect
 from collections import namedtuple
-from functools import cache, partial
+from functools import partial
 from json import JSONDecodeError
 from typing import Any, Callable, Optional
 
 from starlette.convertors import CONVERTOR_TYPES
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, JSONResponse
+from starlette.responses import JSONResponse, Response, StreamingResponse
 from starlette.routing import compile_path
 
-from spectree._types import HookHandler
-from spectree.model_adapter import (
-    ModelClass,
-    get_pydantic_model_adapter,
-)
+from spectree.cache import Cache
+from spectree.model_adapter import get_pydantic_model_adapter
+from spectree.ndjson import NDJSONValidationError
 from spectree.plugins.base import (
     BasePlugin,
     Context,
+    DocumentResponse,
     RawResponsePayload,
+    ValidationPlan,
     validate_response,
 )
-from spectree.response import Response
-from spectree.utils import cached_type_hints, get_multidict_items_starlette
+from spectree.streaming import is_stream
+from spectree.utils import get_projected_items
 
 METHODS = {"get", "post", "put", "patch", "delete"}
 Route = namedtuple("Route", ["path", "methods", "func"])
 
 
-@cache
+#: the root model of any payload, by the pydantic adapter that validates it
+RESPONSE_MODEL_CACHE: Cache[Any, Any] = Cache("starlette_pydantic_response_model")
+
+
 def _get_pydantic_response_model():
     adapter = get_pydantic_model_adapter()
-    return adapter, adapter.make_root_model(Any, name="_PydanticResponseModel")
+    return adapter, RESPONSE_MODEL_CACHE.get(
+        adapter,
+        lambda adapter: adapter.make_root_model(Any, name="_PydanticResponseModel"),
+    )
 
 
 class _PydanticResponse(JSONResponse):
@@ -52,144 +58,200 @@ class StarlettePlugin(BasePlugin):
 
         self.conv2type = {conv: typ for typ, conv in CONVERTOR_TYPES.items()}
 
+    def caches(self) -> list[Cache[Any, Any]]:
+        return [RESPONSE_MODEL_CACHE]
+
+    async def document_view(
+        self,
+        request: Request,
+        document_response: Callable[[Optional[str], Optional[str]], DocumentResponse],
+    ) -> Response:
+        status, headers, body = document_response(
+            request.headers.get("if-none-match"), request.headers.get("accept-encoding")
+        )
+        return Response(body, status, headers=headers)
+
     def register_route(self, app):
         app.add_route(
             self.config.spec_url,
-            lambda request: JSONResponse(self.spectree.spec),
+            partial(self.document_view, document_response=self.spec_response),
         )
 
         for ui in self.config.page_templates:
             app.add_route(
                 f"/{self.config.path}/{ui}",
-                lambda request, ui=ui: HTMLResponse(
-                    self.config.page_templates[ui].format(
-                        spec_url=self.config.filename,
-                        spec_path=self.config.path,
-                        **self.config.swagger_oauth2_config(),
-                    )
+                partial(
+                    self.document_view,
+                    document_response=partial(
+                        self.page_response, ui, self.config.filename
+                    ),
                 ),
             )
 
-    async def request_validation(self, request, query, json, form, headers, cookies):
+    async def request_validation(self, request, plan: ValidationPlan):
+        query, json, form, headers, cookies = (
+            plan.query,
+            plan.json,
+            plan.form,
+            plan.headers,
+            plan.cookies,
+        )
         has_data = request.method not in ("GET", "DELETE")
         content_type = request.headers.get("content-type", "").lower()
         use_json = json and has_data and content_type == "application/json"
-        use_form = (
-            form and has_data and any([x in content_type for x in self.FORM_MIMETYPE])
-        )
+        use_form = has_data and any([x in content_type for x in self.FORM_MIMETYPE])
+        if plan.max_body_size is not None:
+            await self.read_body(request, plan, bool(use_json or (form and use_form)))
         request.context = Context(
             self.model_adapter.validate_obj(
-                query, get_multidict_items_starlette(request.query_params, query)
+                query, self.decode_multidict(query, request.query_params.multi_items())
             )
             if query
             else None,
-            self.model_adapter.validate_obj(json, await request.json() or {})
-            if use_json
-            else None,
-            self.model_adapter.validate_obj(form, await request.form() or {})
-            if use_form
+            await self.json_validation(request, json) if use_json else None,
+            self.model_adapter.validate_obj(
+                form, self.decode_multidict(form, (await request.form()).multi_items())
+            )
+            if form and use_form
             else None,
-            self.model_adapter.validate_obj(headers, request.headers)
+            self.model_adapter.validate_obj(
+                headers,
+                request.headers
+                if plan.header_keys is None
+                else get_projected_items(request.headers.get, plan.header_keys),
+            )
             if headers
             else None,
-            self.model_adapter.validate_obj(cookies, request.cookies)
+            self.model_adapter.validate_obj(
+                cookies,
+                request.cookies
+                if plan.cookie_keys is None
+                else get_projected_items(request.cookies.get, plan.cookie_keys),
+            )
             if cookies
             else None,
+            ndjson=self.ndjson_records(plan, request.stream())
+            if plan.ndjson and has_data
+            else None,
         )
 
-    async def validate(
-        self,
-        func: Callable,
-        query: Optional[ModelClass],
-        json: Optional[ModelClass],
-        form: Optional[ModelClass],
-        headers: Optional[ModelClass],
-        cookies: Optional[ModelClass],
-        resp: Optional[Response],
-        before: HookHandler,
-        after: HookHandler,
-        validation_error_status: int,
-        skip_validation: bool,
-        force_resp_serialize: bool,
-        *args: Any,
-        **kwargs: Any,
-    ):
+    async def read_body(self, request: Request, plan: ValidationPlan, read: bool):
+        """
+        :param read: whether the body will be parsed
+
+        reject the body larger than `plan.max_body_size` by its `Content-Length`,
+        or while it's read if the length is unknown
+        """
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit():
+            self.check_body_size(plan, int(content_length))
+            return
+        if not read:
+            return
+        chunks, size = [], 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            self.check_body_size(plan, size)
+            chunks.append(chunk)
+        # cached the same as `Request.body()`, it's read by `json()` and `form()`
+        request._body = b"".join(chunks)
+
+    async def json_validation(self, request, json):
+        if not self.config.raw_json_body:
+            return self.model_adapter.validate_obj(json, await request.json() or {})
+        return self.validate_json_body(json, await request.body())
+
+    def validate_response(self, response: Any, plan: ValidationPlan):
+        resp_validation_error = None
+        if (
+            response
+            and not (
+                isinstance(response, JSONResponse)
+                and hasattr(response, "_model_class")
+                and response._model_class == plan.find_resp_model(response.status_code)
+            )
+            and plan.validate_resp()
+        ):
+            try:
+                response_validation_result = validate_response(
+                    model_adapter=self.model_adapter,
+                    validation_model=plan.find_resp_model(response.status_code),
+                    response_payload=RawResponsePayload(payload=response.body),
+                    force_serialize=plan.force_resp_serialize,
+                )
+            except self.model_adapter.validation_error as err:
+                response = JSONResponse(
+                    self.model_adapter.validation_errors(err),
+                    500,
+                )
+                resp_validation_error = err
+            else:
+                # replace the body of the response if it was serialized during validation
+                if isinstance(response_validation_result.payload, bytes):
+                    response.body = response_validation_result.payload
+        return response, resp_validation_error
+
+    async def validate(self, plan: ValidationPlan, *args: Any, **kwargs: Any):
         if isinstance(args[0], Request):
             instance, request = None, args[0]
         else:
             instance, request = args[:2]
 
-        response = None
+        response: Any = None
         req_validation_error = resp_validation_error = json_decode_error = None
 
-        if not skip_validation:
+        if not plan.skip_validation:
             try:
-                await self.request_validation(
-                    request, query, json, form, headers, cookies
-                )
+                await self.request_validation(request, plan)
             except self.model_adapter.validation_error as err:
                 req_validation_error = err
                 response = JSONResponse(
                     self.model_adapter.validation_errors(err),
-                    validation_error_status,
+                    plan.validation_error_status,
                 )
             except JSONDecodeError as err:
                 json_decode_error = err
                 self.logger.info(
                     "%s Validation Error",
-                    validation_error_status,
+                    plan.validation_error_status,
                     extra={"spectree_json_decode_error": str(err)},
                 )
                 response = JSONResponse(
-                    {"error_msg": str(err)}, validation_error_status
+                    {"error_msg": str(err)}, plan.validation_error_status
                 )
 
-        before(request, response, req_validation_error, instance, self.model_adapter)
+        plan.before(
+            request, response, req_validation_error, instance, self.model_adapter
+        )
         if req_validation_error or json_decode_error:
             return response
 
-        if self.config.annotations:
-            annotations = cached_type_hints(func)
-            for name in ("query", "json", "form", "headers", "cookies"):
-                if annotations.get(name):
-                    kwargs[name] = getattr(
-                        getattr(request, "context", None), name, None
-                    )
+        if plan.annotated:
+            context = getattr(request, "context", None)
+            for name in plan.annotated:
+                kwargs[name] = getattr(context, name, None)
 
-        if inspect.iscoroutinefunction(func):
-            response = await func(*args, **kwargs)
-        else:
-            response = func(*args, **kwargs)
-
-        if (
-            not skip_validation
-            and resp
-            and response
-            and not (
-                isinstance(response, JSONResponse)
-                and hasattr(response, "_model_class")
-                and response._model_class == resp.find_model(response.status_code)
-            )
-        ):
-            try:
-                response_validation_result = validate_response(
-                    model_adapter=self.model_adapter,
-                    validation_model=resp.find_model(response.status_code),
-                    response_payload=RawResponsePayload(payload=response.body),
-                    force_serialize=force_resp_serialize,
-                )
-            except self.model_adapter.validation_error as err:
-                response = JSONResponse(
-                    self.model_adapter.validation_errors(err),
-                    500,
-                )
-                resp_validation_error = err
+        try:
+            if plan.is_coroutine:
+                response = await plan.func(*args, **kwargs)
             else:
-                # replace the body of the response if it was serialized during validation
-                if isinstance(response_validation_result.payload, bytes):
-                    response.body = response_validation_result.payload
+                response = plan.func(*args, **kwargs)
+        except NDJSONValidationError as err:
+            return JSONResponse(err.errors, plan.validation_error_status)
+
+        if plan.stream_format and is_stream(response):
+            stream = self.stream_response(plan, response)
+            # starlette iterates the sync iterators in its thread pool
+            response = StreamingResponse(
+                stream.__aiter__() if stream.is_async else iter(stream),
+                media_type=stream.media_type,
+            )
+        else:
+            response, resp_validation_error = self.validate_response(response, plan)
 
-        after(request, response, resp_validation_error, instance, self.model_adapter)
+        plan.after(
+            request, response, resp_validation_error, instance, self.model_adapter
+        )
 
         return response
 
@@ -1,11 +1,19 @@
 import re
-from typing import Any, Iterator, Mapping, Optional, Tuple, Union
+from functools import partial
+from itertools import chain
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, Tuple, Union
 
 from werkzeug.datastructures import Headers
 from werkzeug.routing import parse_converter_args
 
-from spectree.plugins.base import BasePlugin
-from spectree.utils import get_multidict_items
+from spectree.model_adapter import ModelClass
+from spectree.plugins.base import (
+    BasePlugin,
+    DocumentResponse,
+    JSONDumps,
+    chain_default,
+)
+from spectree.utils import get_projected_items
 
 RE_FLASK_RULE = re.compile(
     r"""
@@ -84,12 +92,25 @@ def flask_response_unpack(
     return payload, status, headers
 
 
+def provider_dumps(
+    provider: Any, dump_args: Mapping[str, Any], payload: Any, default: Callable
+) -> bytes:
+    """encode the payload like the responses of the default JSON provider"""
+    chained = partial(chain_default, default, provider.default)
+    return f"{provider.dumps(payload, default=chained, **dump_args)}\n".encode()
+
+
 class WerkzeugPlugin(BasePlugin):
     blueprint_state = None
+    #: the default JSON provider class of the framework, see :meth:`json_dumps`
+    JSON_PROVIDER: Optional[type] = None
 
     def get_current_app(self):
         raise NotImplementedError()
 
+    def get_current_request(self):
+        raise NotImplementedError()
+
     def is_app_response(self, resp) -> bool:
         raise NotImplementedError()
 
@@ -104,6 +125,32 @@ class WerkzeugPlugin(BasePlugin):
     def is_blueprint(app) -> bool:
         raise NotImplementedError()
 
+    def json_dumps(self) -> Optional[JSONDumps]:
+        """
+        the JSON encoder of the app, `None` if its JSON provider isn't the default
+        one, a custom provider may not pass `default` to its encoder
+        """
+        app = self.get_current_app()
+        provider = app.json
+        if self.JSON_PROVIDER is None or not isinstance(provider, self.JSON_PROVIDER):
+            return None
+        # the formatting of `DefaultJSONProvider.response`
+        if (provider.compact is None and app.debug) or provider.compact is False:
+            dump_args: dict[str, Any] = {"indent": 2}
+        else:
+            dump_args = {"separators": (",", ":")}
+        return partial(provider_dumps, provider, dump_args)
+
+    def registered_app(self):
+        """
+        the application the routes are registered to, the blueprint's app
+        """
+        if self.blueprint_state:
+            return self.blueprint_state.app
+        if self.is_blueprint(self.spectree.app):
+            raise RuntimeError("the blueprint is not registered to an app")
+        return self.spectree.app
+
     def find_routes(self):
         # https://werkzeug.palletsprojects.com/en/stable/routing/#werkzeug.routing.Rule
         for rule in self.get_current_app().url_map.iter_rules():
@@ -226,41 +273,54 @@ class WerkzeugPlugin(BasePlugin):
 
         return "".join(subs), parameters
 
-    def fill_form(self, request) -> dict:
-        req_data = get_multidict_items(request.form)
-        req_data.update(get_multidict_items(request.files) if request.files else {})
-        return req_data
+    def get_headers(self, request, keys: Optional[Iterable[str]]) -> dict:
+        if keys is None:
+            return dict(iter(request.headers))
+        return get_projected_items(request.headers.get, keys)
+
+    def fill_form(self, request, model: ModelClass) -> dict:
+        items = request.form.items(multi=True)
+        if request.files:
+            items = chain(items, request.files.items(multi=True))
+        return self.decode_multidict(model, items)
+
+    def document_view(
+        self,
+        document_response: Callable[[Optional[str], Optional[str]], DocumentResponse],
+    ):
+        headers = self.get_current_request().headers
+        status, resp_headers, body = document_response(
+            headers.get("If-None-Match"), headers.get("Accept-Encoding")
+        )
+        return self.get_current_app().response_class(
+            body, status=status, headers=resp_headers
+        )
+
+    def blueprint_spec_url(self) -> str:
+        if self.blueprint_state.url_prefix is None:
+            return self.config.spec_url
+        return "/".join(
+            (
+                self.blueprint_state.url_prefix.rstrip("/"),
+                self.config.spec_url.lstrip("/"),
+            )
+        )
 
     def register_route(self, app):
         app.add_url_rule(
             rule=self.config.spec_url,
             endpoint=f"openapi_{self.config.path}",
-            view_func=lambda: self.get_current_app().json.response(self.spectree.spec),
+            view_func=lambda: self.document_view(self.spec_response),
         )
 
         if self.is_blueprint(app):
-
-            def gen_doc_page(ui):
-                spec_url = self.config.spec_url
-                if self.blueprint_state.url_prefix is not None:
-                    spec_url = "/".join(
-                        (
-                            self.blueprint_state.url_prefix.rstrip("/"),
-                            self.config.spec_url.lstrip("/"),
-                        )
-                    )
-
-                return self.config.page_templates[ui].format(
-                    spec_url=spec_url,
-                    spec_path=self.config.path,
-                    **self.config.swagger_oauth2_config(),
-                )
-
             for ui in self.config.page_templates:
                 app.add_url_rule(
                     rule=f"/{self.config.path}/{ui}/",
                     endpoint=f"openapi_{self.config.path}_{ui.replace('.', '_')}",
-                    view_func=lambda ui=ui: gen_doc_page(ui),
+                    view_func=lambda ui=ui: self.document_view(
+                        partial(self.page_response, ui, self.blueprint_spec_url())
+                    ),
                 )
 
             app.record(lambda state: setattr(self, "blueprint_state", state))
@@ -269,9 +329,7 @@ class WerkzeugPlugin(BasePlugin):
                 app.add_url_rule(
                     rule=f"/{self.config.path}/{ui}/",
                     endpoint=f"openapi_{self.config.path}_{ui}",
-                    view_func=lambda ui=ui: self.config.page_templates[ui].format(
-                        spec_url=self.config.spec_url,
-                        spec_path=self.config.path,
-                        **self.config.swagger_oauth2_config(),
+                    view_func=lambda ui=ui: self.document_view(
+                        partial(self.page_response, ui, self.config.spec_url)
                     ),
                 )
@@ -1,4 +1,5 @@
 import sys
+import weakref
 from http import HTTPStatus
 from typing import Any, Iterable, Optional, Tuple, TypeAlias, Union
 
@@ -71,6 +72,11 @@ class Response:
             self.codes.append(code)
 
         self.code_models: dict[str, ModelClass] = {}
+        # `status_models()`, reset when the models change
+        self._status_models: Optional[dict[int, ModelClass]] = None
+        # the `SpecTree` instances that validate with this response, their specs
+        # are invalidated when a model is added
+        self._spectrees: "weakref.WeakSet[Any]" = weakref.WeakSet()
         self.code_descriptions: dict[str, Optional[str]] = {}
         for code, model_and_description in code_models.items():
             assert code in DEFAULT_CODE_DESC, "invalid HTTP status code"
@@ -100,6 +106,7 @@ class Response:
         """Bind a :py:class:`~spectree.model_adapter.ModelAdapter`"""
         self.model_adapter = model_adapter
         self.code_models = self._build_models(model_adapter)
+        self._status_models = None
 
     def _build_model(
         self, raw_model: Any, model_adapter: ModelAdapterType
@@ -143,8 +150,11 @@ class Response:
         self._raw_code_models[code_name] = model
         if self.model_adapter is not None:
             self.code_models[code_name] = self._build_model(model, self.model_adapter)
+            self._status_models = None
         if description:
             self.code_descriptions[code_name] = description
+        for spectree in self._spectrees:
+            spectree.invalidate_spec()
 
     def has_model(self) -> bool:
         """
@@ -158,6 +168,28 @@ class Response:
         """
         return self.code_models.get(f"HTTP_{code}")
 
+    def spec_key(self) -> Tuple[Any, ...]:
+        """
+        :returns: what the generated spec of this response depends on, the cached
+            operations are reused while it's equal
+        """
+        return (
+            tuple(self.codes),
+            tuple(self.code_descriptions.items()),
+            tuple(self.code_models.items()),
+        )
+
+    def status_models(self) -> dict[int, ModelClass]:
+        """
+        :returns: the models keyed by the integer status code, it's computed
+            once until the models are changed by :meth:`add_model`
+        """
+        if self._status_models is None:
+            self._status_models = {
+                int(parse_code(code)): model for code, model in self.code_models.items()
+            }
+        return self._status_models
+
     def get_code_description(self, code: str) -> str:
         """Get the description of the given status code.
 
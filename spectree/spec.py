@@ -1,3 +1,6 @@
+import inspect
+import json
+import os
 import warnings
 from collections import defaultdict
 from functools import wraps
@@ -6,9 +9,11 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     Mapping,
     Optional,
     Sequence,
+    Tuple,
     Type,
     get_type_hints,
 )
@@ -20,16 +25,29 @@ from spectree._types import (
     NamingStrategy,
     NestedNamingStrategy,
 )
+from spectree.cache import Cache, CacheStats
 from spectree.config import Configuration, ModeEnum
 from spectree.model_adapter import ModelClass, get_pydantic_model_adapter
 from spectree.model_adapter.protocol import SchemaMode
 from spectree.models import Tag
 from spectree.plugins import PLUGINS, BasePlugin
+from spectree.plugins.base import (
+    REQUEST_PARTS,
+    ResponseSampler,
+    ValidationPlan,
+    read_spec_file,
+)
 from spectree.response import Response
+from spectree.spec_cache import Fingerprint, load_spec, store_spec
+from spectree.streaming import StreamFormat
 from spectree.utils import (
+    MULTIDICT_PLAN_CACHE,
+    TYPE_HINTS_CACHE,
     default_after_handler,
     default_before_handler,
+    get_definition_digests,
     get_model_key,
+    get_multidict_plan,
     get_nested_key,
     get_security,
     json_compatible_deepcopy,
@@ -40,6 +58,13 @@ from spectree.utils import (
     parse_resp,
 )
 
+REF_TEMPLATE = "#/components/schemas/{model}"
+
+
+def check_max_body_size(max_body_size: Optional[int]):
+    if max_body_size is not None and max_body_size < 0:
+        raise ValueError(f"max body size must be >= 0 or None, got {max_body_size}")
+
 
 class SpecTree:
     """
@@ -71,14 +96,25 @@ class SpecTree:
         schema names and returns the component schema name for nested models
         lifted from ``$defs``. The default includes the parent name to avoid
         collisions. To share nested models by child name, use
-        ``lambda _parent, child: child``.
+        ``lambda _parent, child: child``. It's not used when the
+        ``dedup_nested_schemas`` config is enabled.
     :param model_adapter: adapter for validation and OpenAPI JSON schema generation.
         Choose from the `spectree.model_adapter`. If not set, will use `pydantic`.
+    :param response_validation_rate: The default fraction (from 0 to 1) of the
+        responses to validate, the rest are only serialized. It can be changed at
+        runtime with :meth:`set_response_validation_rate`.
+    :param response_validation_first: The default number of the first responses of
+        each endpoint that are always validated regardless of the rate.
+    :param max_body_size: The default maximum size of the request bodies in bytes.
+        A request with a larger `Content-Length` is rejected before the body is
+        read, a body without it is rejected once the limit is exceeded while it's
+        read. The rejection returns the `validation_error_status`. `None` means
+        unlimited.
     :param kwargs: init :class:`spectree.config.Configuration`, they can also be
         configured through the environment variables with prefix `spectree_`
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913  [too-many-arguments]
         self,
         backend_name: str = "base",
         backend: Optional[Type[BasePlugin]] = None,
@@ -90,6 +126,10 @@ class SpecTree:
         naming_strategy: NamingStrategy = get_model_key,
         nested_naming_strategy: NestedNamingStrategy = get_nested_key,
         model_adapter: Optional[ModelAdapterType] = None,
+        response_validation_rate: float = 1.0,
+        response_validation_first: int = 0,
+        *,
+        max_body_size: Optional[int] = None,
         **kwargs: Any,
     ):
         self.naming_strategy = naming_strategy
@@ -99,6 +139,15 @@ class SpecTree:
         self.validation_error_model = validation_error_model
         self.before = before
         self.after = after
+        #: the global response sampling setting inherited by the endpoints
+        self.resp_sampler = ResponseSampler(
+            response_validation_rate, response_validation_first
+        )
+        self._resp_samplers: list[ResponseSampler] = []
+        check_max_body_size(max_body_size)
+        self.max_body_size = max_body_size
+        # validation plans of the decorated endpoints
+        self._plans: list[ValidationPlan] = []
         self.config: Configuration = Configuration.model_validate(
             kwargs,
             model_adapter=self.model_adapter,
@@ -111,9 +160,39 @@ class SpecTree:
             module = import_module(plugin.name, plugin.package)
             self.backend = getattr(module, plugin.class_name)(self)
         self.models: Dict[str, Any] = {}
+        # model classes and schema modes, `models` is generated from them lazily
+        self._model_classes: Dict[str, Tuple[ModelClass, SchemaMode]] = {}
+        # nested model schemas lifted from the `$defs` of `models`
+        self._definitions: Dict[str, Any] = {}
+        # the nested model schemas of each model, `_definitions` is merged from them
+        self._model_definitions: Dict[str, Dict[str, Any]] = {}
+        # names of the nested model schemas by content with `dedup_nested_schemas`
+        self._digest_names: Dict[str, str] = {}
+        self._dedup_names: set[str] = set()
+        # OpenAPI operations keyed by (function, method, path), with the
+        # `Response.spec_key()` they're generated from
+        self._operations: Dict[
+            Tuple[Callable, str, str], Tuple[Any, Dict[str, Any]]
+        ] = {}
+        self._spec: Optional[Dict[str, Any]] = None
         if app:
             self.register(app)
 
+    def _caches(self) -> list[Cache[Any, Any]]:
+        return [
+            TYPE_HINTS_CACHE,
+            MULTIDICT_PLAN_CACHE,
+            *self.model_adapter.caches(),
+            *self.backend.caches(),
+        ]
+
+    def cache_stats(self) -> Dict[str, CacheStats]:
+        """
+        get the hits, misses and size of the internal caches used by this instance,
+        keyed by the cache name. Some of them are shared with other instances.
+        """
+        return {cache.name: cache.stats() for cache in self._caches()}
+
     def register(self, app: Any):
         """
         register to backend application
@@ -121,18 +200,45 @@ class SpecTree:
         This will be automatically triggered if the app is passed into the
         init step.
         """
+        previous = getattr(self, "app", None)
+        if previous is not None and previous is not app:
+            # the routes of the previous app are not in the new one
+            self.invalidate_spec()
         self.app = app
         self.backend.register_route(self.app)
 
     @property
     def spec(self):
         """
-        get the OpenAPI spec
+        get the OpenAPI spec, it's generated again after :meth:`invalidate_spec`
         """
-        if not hasattr(self, "_spec"):
-            self._spec = self._generate_spec()
+        if self._spec is None:
+            if self.config.spec_file:
+                encoded = read_spec_file(self.config.spec_file, "")
+                self._spec = json.loads(encoded.identity)
+            elif self.config.spec_cache_dir:
+                self._spec = self._load_or_generate_spec()
+            else:
+                self._spec = self._generate_spec()
         return self._spec
 
+    def invalidate_spec(self, func: Optional[Callable] = None):
+        """
+        mark the OpenAPI spec as outdated, the next access of :attr:`spec` will
+        generate it again. Only the operations of the routes that are new, or of
+        the function `func`, are parsed again, the others are reused.
+
+        This is done when a function is decorated by this instance or another app
+        is registered. Call it after adding routes to the app once the spec has
+        been generated.
+
+        :param func: the route function whose operations should be parsed again
+        """
+        self._spec = None
+        if func is not None:
+            for key in [key for key in self._operations if key[0] is func]:
+                del self._operations[key]
+
     def bypass(self, func: Callable):
         """
         bypass rules for routes (mode defined in config)
@@ -168,6 +274,11 @@ class SpecTree:
         skip_validation: bool = False,
         operation_id: Optional[str] = None,
         force_resp_serialize: bool = False,
+        response_validation_rate: Optional[float] = None,
+        response_validation_first: Optional[int] = None,
+        max_body_size: Optional[int] = None,
+        ndjson: Optional[ModelClass] = None,
+        stream_format: Optional[StreamFormat] = None,
     ) -> Callable:
         """
         - validate query, json, headers in request
@@ -199,11 +310,34 @@ class SpecTree:
         :param operation_id: a string override for operationId for the given endpoint
         :force_resp_serialize: Always return the serialized result of the validated response.
             Requires `skip_validation` to be `False`.
+        :param response_validation_rate: The fraction of the responses to validate for
+            the specific endpoint. If not specified, the global
+            `response_validation_rate` is used instead, defined in
+            :meth:`spectree.spec.SpecTree`.
+        :param response_validation_first: The number of the first responses to always
+            validate for the specific endpoint. If not specified, the global
+            `response_validation_first` is used instead.
+        :param max_body_size: The maximum size of the request body in bytes for the
+            specific endpoint. If not specified, the global `max_body_size` is used
+            instead, defined in :meth:`spectree.spec.SpecTree`.
+        :param ndjson: model class of each line of a newline-delimited JSON request
+            body. The endpoint gets an iterator of the validated records
+            (:class:`spectree.ndjson.NDJSONRecords`, `async for` in the async
+            frameworks) as `ndjson` in the request context. The body is read and
+            validated while it's iterated, consume it in the endpoint function.
+        :param stream_format: `ndjson` or `sse`. When the endpoint returns an
+            iterator (or an async iterator in the async frameworks), the items are
+            validated against the model of the 200 response and sent one by one
+            in the format, without buffering the body. An invalid item stops the
+            stream (after an `error` event of SSE).
         """
         # If the status code for validation errors is not overridden on the level of
         # the view function, use the globally set status code for validation errors.
         if validation_error_status == 0:
             validation_error_status = self.validation_error_status
+        check_max_body_size(max_body_size)
+        if max_body_size is None:
+            max_body_size = self.max_body_size
 
         if self.config.annotations and skip_validation:
             warnings.warn(
@@ -214,63 +348,86 @@ class SpecTree:
             )
 
         def decorate_validation(func: Callable):
+            nonlocal query, json, form, headers, cookies, ndjson
+            annotated: tuple[str, ...] = ()
+            if self.config.annotations:
+                annotations = get_type_hints(func, include_extras=True)
+                query = annotations.get("query", query)
+                json = annotations.get("json", json)
+                form = annotations.get("form", form)
+                headers = annotations.get("headers", headers)
+                cookies = annotations.get("cookies", cookies)
+                ndjson = annotations.get("ndjson", ndjson)
+                annotated = tuple(
+                    name for name in REQUEST_PARTS if annotations.get(name)
+                )
+
+            if resp:
+                resp.bind_model_adapter(self.model_adapter)
+                resp._spectrees.add(self)
+                # Make sure that the endpoint specific status code and data model for
+                # validation errors shows up in the response spec.
+                resp.add_model(
+                    validation_error_status,
+                    self.validation_error_model or self.model_adapter.validation_error,
+                    replace=False,
+                )
+
+            resp_sampler = ResponseSampler(
+                self.resp_sampler.rate
+                if response_validation_rate is None
+                else response_validation_rate,
+                self.resp_sampler.first
+                if response_validation_first is None
+                else response_validation_first,
+                inherit=response_validation_rate is None
+                and response_validation_first is None,
+            )
+            self._resp_samplers.append(resp_sampler)
+
+            plan = ValidationPlan(
+                func=func,
+                query=query,
+                json=json,
+                form=form,
+                headers=headers,
+                cookies=cookies,
+                resp=resp,
+                before=before or self.before,
+                after=after or self.after,
+                validation_error_status=validation_error_status,
+                skip_validation=skip_validation,
+                force_resp_serialize=force_resp_serialize,
+                is_coroutine=inspect.iscoroutinefunction(func),
+                annotated=annotated,
+                header_keys=self.model_adapter.field_keys(headers) if headers else None,
+                cookie_keys=self.model_adapter.field_keys(cookies) if cookies else None,
+                resp_sampler=resp_sampler,
+                max_body_size=max_body_size,
+                ndjson=ndjson,
+                stream_format=stream_format,
+            )
+
+            self._plans.append(plan)
+
             # for sync framework
             @wraps(func)
             def sync_validate(*args: Any, **kwargs: Any):
-                return self.backend.validate(
-                    func,
-                    query,
-                    json,
-                    form,
-                    headers,
-                    cookies,
-                    resp,
-                    before or self.before,
-                    after or self.after,
-                    validation_error_status,
-                    skip_validation,
-                    force_resp_serialize,
-                    *args,
-                    **kwargs,
-                )
+                return self.backend.validate(plan, *args, **kwargs)
 
             # for async framework
             @wraps(func)
             async def async_validate(*args: Any, **kwargs: Any):
-                return await self.backend.validate(
-                    func,
-                    query,
-                    json,
-                    form,
-                    headers,
-                    cookies,
-                    resp,
-                    before or self.before,
-                    after or self.after,
-                    validation_error_status,
-                    skip_validation,
-                    force_resp_serialize,
-                    *args,
-                    **kwargs,
-                )
+                return await self.backend.validate(plan, *args, **kwargs)
 
             validation: FunctionDecorator = (
                 async_validate if self.backend.ASYNC else sync_validate  # type: ignore
             )
 
-            if self.config.annotations:
-                nonlocal query, json, form, headers, cookies
-                annotations = get_type_hints(func, include_extras=True)
-                query = annotations.get("query", query)
-                json = annotations.get("json", json)
-                form = annotations.get("form", form)
-                headers = annotations.get("headers", headers)
-                cookies = annotations.get("cookies", cookies)
-
             # register
             for name, model in zip(
-                ("query", "json", "form", "headers", "cookies"),
-                (query, json, form, headers, cookies),
+                REQUEST_PARTS,
+                (query, json, form, headers, cookies, ndjson),
                 strict=True,
             ):
                 if model is not None:
@@ -278,14 +435,6 @@ class SpecTree:
                     setattr(validation, name, model_key)
 
             if resp:
-                resp.bind_model_adapter(self.model_adapter)
-                # Make sure that the endpoint specific status code and data model for
-                # validation errors shows up in the response spec.
-                resp.add_model(
-                    validation_error_status,
-                    self.validation_error_model or self.model_adapter.validation_error,
-                    replace=False,
-                )
                 for model in resp.models:
                     self._add_model(model=model, mode="serialization")
                 validation.resp = resp
@@ -297,59 +446,165 @@ class SpecTree:
             validation.deprecated = deprecated
             validation.path_parameter_descriptions = path_parameter_descriptions
             validation.operation_id = operation_id
+            validation.resp_sampler = resp_sampler
+            validation.max_body_size = max_body_size
+            validation.stream_format = stream_format
             # register decorator
             validation._decorator = self
+            self.invalidate_spec()
             return validation
 
         return decorate_validation
 
-    def _add_model(self, model: ModelClass, mode: SchemaMode = "validation") -> str:
+    def warmup(self):
+        """
+        compute what's otherwise computed by the first requests of each process:
+        the validators of the models, the type hints of the query models, the
+        OpenAPI spec and the encoded body of the OpenAPI file route.
+
+        Call it after the routes are added and the app is registered, like in the
+        master process of gunicorn with `preload_app`, so the forked workers
+        share the results. For Quart, it can also be called from a `before_serving`
+        hook.
+        """
+        for plan in self._plans:
+            for model in (
+                plan.query,
+                plan.json,
+                plan.form,
+                plan.headers,
+                plan.cookies,
+                *plan.resp_models.values(),
+            ):
+                if model is not None:
+                    self.model_adapter.warmup(model)
+            for model in (plan.query, plan.form):
+                if model is not None:
+                    # decodes the query string and the form
+                    get_multidict_plan(model, self.model_adapter)
+
+        if getattr(self, "app", None) is not None:
+            self.backend.warmup()
+
+    def set_response_validation_rate(
+        self,
+        rate: float = 1.0,
+        first: int = 0,
+        endpoint: Optional[Callable] = None,
+    ):
+        """
+        change the response validation sampling at runtime
+
+        :param rate: fraction of the responses to validate, from 0 to 1
+        :param first: number of the first responses to always validate, the
+            counting restarts from this call
+        :param endpoint: the function decorated by :meth:`validate`. If not set, the
+            global setting is changed, which applies to all the endpoints that
+            don't have their own setting.
+        """
+        if endpoint is not None:
+            sampler = getattr(endpoint, "resp_sampler", None)
+            if sampler is None:
+                raise ValueError(f"{endpoint} is not decorated by `SpecTree.validate`")
+            sampler.set(rate, first)
+            sampler.inherit = False
+            return
+
+        self.resp_sampler.set(rate, first)
+        for sampler in self._resp_samplers:
+            if sampler.inherit:
+                sampler.set(rate, first)
+
+    def _add_model(
+        self, model: ModelClass, mode: SchemaMode = "validation", replace: bool = True
+    ) -> str:
         """
-        unified model processing
+        unified model processing, the schema is generated by :meth:`_build_models`
+        when the spec is needed
 
         :param model: model class to add to the schema
         :param mode: schema generation mode - 'validation' for input models
             and 'serialization' for output models
+        :param replace: whether the model added in the other mode is replaced
         """
         model_key = self.naming_strategy(model)
-        schema = json_compatible_deepcopy(
-            self.model_adapter.json_schema(
-                model=model,
-                ref_template="#/components/schemas/{model}",
-                mode=mode,
+        added = self._model_classes.get(model_key)
+        if not replace and added is not None and added[0] is model:
+            return model_key
+        if added != (model, mode):
+            self._model_classes[model_key] = (model, mode)
+            # the schema and its nested schemas are generated again
+            self.models.pop(model_key, None)
+            self._model_definitions.pop(model_key, None)
+        return model_key
+
+    def _build_models(self):
+        """
+        generate the schemas of the models added (again) since the last call, the
+        nested models are lifted from `$defs` to `_definitions`
+        """
+        for model_key, (model, mode) in self._model_classes.items():
+            if model_key in self.models:
+                continue
+            schema = self.model_adapter.json_schema(
+                model=model, ref_template=REF_TEMPLATE, mode=mode
             )
-        )
+            definitions = schema.get("$defs")
+            if not isinstance(definitions, dict):
+                self.models[model_key] = json_compatible_deepcopy(schema)
+                self._model_definitions[model_key] = {}
+                continue
+
+            names = self._nested_keys(model_key, definitions)
+            # The adapter emits refs with its own $defs keys. They're rewritten to
+            # the final component names while the schema is copied.
+            schema = json_compatible_deepcopy(
+                schema,
+                refs={
+                    REF_TEMPLATE.format(model=key): REF_TEMPLATE.format(model=name)
+                    for key, name in names.items()
+                },
+            )
+            self._model_definitions[model_key] = {
+                names[key]: value for key, value in schema.pop("$defs").items()
+            }
+            self.models[model_key] = schema
 
-        definitions = schema.get("$defs")
-        if isinstance(definitions, dict):
-            # The adapter emits refs with its own $defs keys. Rewrite them to the
-            # final component names before _get_model_definitions lifts $defs.
-            replacements = {
-                f"#/components/schemas/{key}": (
-                    f"#/components/schemas/{self.nested_naming_strategy(model_key, key)}"
-                )
-                for key in definitions
+        # merged again, so the nested schemas of the replaced models are dropped
+        self._definitions = {}
+        for definitions in self._model_definitions.values():
+            for name, value in definitions.items():
+                self._definitions.setdefault(name, value)
+
+    def _nested_keys(
+        self, model_key: str, definitions: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """
+        component names of the nested models in the `$defs` of a model
+        """
+        if not self.config.dedup_nested_schemas:
+            return {
+                key: self.nested_naming_strategy(model_key, key) for key in definitions
             }
-            schema_values: list[Any] = [schema]
-            while schema_values:
-                value = schema_values.pop()
-                if isinstance(value, dict):
-                    ref = value.get("$ref")
-                    if isinstance(ref, str) and ref in replacements:
-                        value["$ref"] = replacements[ref]
-                    schema_values.extend(value.values())
-                elif isinstance(value, list):
-                    schema_values.extend(value)
-
-        self.models[model_key] = schema
-        return model_key
 
-    def _generate_spec(self) -> Dict[str, Any]:
+        names = {}
+        for key, digest in get_definition_digests(definitions, REF_TEMPLATE).items():
+            name = self._digest_names.get(digest)
+            if name is None:
+                name = key
+                if name in self._dedup_names or name in self._model_classes:
+                    # a different schema or a model has taken the child name
+                    name = f"{key}.{digest[:12]}"
+                self._digest_names[digest] = name
+                self._dedup_names.add(name)
+            names[key] = name
+        return names
+
+    def _iter_routes(self) -> Iterator[Tuple[Callable, str, str, list]]:
         """
-        generate OpenAPI spec according to routes and decorators
+        iterate the (function, method, path, path parameters) of the routes
+        that are not bypassed
         """
-        routes: Dict[str, Dict] = defaultdict(dict)
-        tags = {}
         for route in self.backend.find_routes():
             for method, func in self.backend.parse_func(route):
                 if self.backend.bypass(func, method) or self.bypass(func):
@@ -361,40 +616,98 @@ class SpecTree:
                 path, parameters = self.backend.parse_path(
                     route, path_parameter_descriptions
                 )
+                yield func, method, path, parameters
 
-                name = parse_name(func)
-                summary, desc = parse_comments(func)
-                func_tags = getattr(func, "tags", ())
-                for tag in func_tags:
-                    if str(tag) not in tags:
-                        tags[str(tag)] = (
-                            tag.to_dict(exclude_none=True)
-                            if isinstance(tag, Tag)
-                            else {"name": tag}
-                        )
-
-                routes[path][method.lower()] = {
-                    "summary": summary or f"{name} <{method}>",
-                    "operationId": self.backend.get_func_operation_id(
-                        func, path, method
-                    ),
-                    "description": desc or "",
-                    "tags": [str(x) for x in getattr(func, "tags", ())],
-                    "parameters": parse_params(func, parameters[:], self.models),
-                    "responses": parse_resp(func, self.naming_strategy),
-                }
-
-                security = getattr(func, "security", None)
-                if security is not None:
-                    routes[path][method.lower()]["security"] = get_security(security)
-
-                deprecated = getattr(func, "deprecated", False)
-                if deprecated:
-                    routes[path][method.lower()]["deprecated"] = deprecated
-
-                request_body = parse_request(func)
-                if request_body:
-                    routes[path][method.lower()]["requestBody"] = request_body
+    def _spec_fingerprint(self) -> str:
+        """
+        fingerprint of the routes, models and configuration the spec is generated
+        from
+        """
+        fingerprint = Fingerprint(self.model_adapter)
+        fingerprint.add(self.config)
+        for strategy in (self.naming_strategy, self.nested_naming_strategy):
+            fingerprint.add(strategy)
+            fingerprint.add_source(strategy)
+        for func, method, path, parameters in self._iter_routes():
+            resp = getattr(func, "resp", None)
+            fingerprint.add(
+                method,
+                path,
+                parameters,
+                func.__module__,
+                func.__qualname__,
+                func.__doc__,
+                [getattr(func, name, None) for name in REQUEST_PARTS],
+                [
+                    tag.to_dict() if isinstance(tag, Tag) else tag
+                    for tag in getattr(func, "tags", ())
+                ],
+                getattr(func, "security", None),
+                getattr(func, "deprecated", False),
+                getattr(func, "operation_id", None),
+                getattr(func, "max_body_size", None),
+                getattr(func, "stream_format", None),
+                resp and (resp.codes, resp.code_descriptions, resp.status_models()),
+            )
+        for key, (model, mode) in sorted(
+            self._model_classes.items(), key=lambda item: item[0]
+        ):
+            fingerprint.add(key, mode)
+            fingerprint.add_type(model)
+        return fingerprint.hexdigest()
+
+    def _load_or_generate_spec(self) -> Dict[str, Any]:
+        """
+        load the spec generated by another process from the `spec_cache_dir`, or
+        generate the spec and store it there
+        """
+        assert self.config.spec_cache_dir  # make mypy happy
+        path = os.path.join(
+            self.config.spec_cache_dir, f"spectree-{self._spec_fingerprint()}.json"
+        )
+        spec = load_spec(path)
+        if spec is None:
+            spec = self._generate_spec()
+            store_spec(path, spec)
+        return spec
+
+    def _generate_spec(self) -> Dict[str, Any]:
+        """
+        generate OpenAPI spec according to routes and decorators
+        """
+        route_items = list(self._iter_routes())
+        for func, *_ in route_items:
+            resp = getattr(func, "resp", None)
+            # including the models added to the response after decorating, the
+            # models also used by the requests keep the mode they're decorated with
+            for model in resp.models if resp else ():
+                self._add_model(model=model, mode="serialization", replace=False)
+        self._build_models()
+
+        routes: Dict[str, Dict] = defaultdict(dict)
+        tags = {}
+        operations = {}
+        for func, method, path, parameters in route_items:
+            key = (func, method, path)
+            resp = getattr(func, "resp", None)
+            resp_key = resp.spec_key() if resp else None
+            cached = self._operations.get(key)
+            if cached is not None and cached[0] == resp_key:
+                operation = cached[1]
+            else:
+                operation = self._parse_operation(func, method, path, parameters)
+            operations[key] = (resp_key, operation)
+            routes[path][method.lower()] = operation
+
+            for tag in getattr(func, "tags", ()):
+                if str(tag) not in tags:
+                    tags[str(tag)] = (
+                        tag.to_dict(exclude_none=True)
+                        if isinstance(tag, Tag)
+                        else {"name": tag}
+                    )
+        # drop the operations of the removed routes
+        self._operations = operations
 
         spec: Dict[str, Any] = {
             "openapi": self.config.openapi_version,
@@ -402,7 +715,7 @@ class SpecTree:
             "tags": list(tags.values()),
             "paths": {**routes},
             "components": {
-                "schemas": {**self.models, **self._get_model_definitions()},
+                "schemas": {**self.models, **self._definitions},
             },
         }
 
@@ -420,18 +733,32 @@ class SpecTree:
         spec["security"] = get_security(self.config.security)
         return spec
 
-    def _get_model_definitions(self) -> Dict[str, Any]:
+    def _parse_operation(
+        self, func: Callable, method: str, path: str, parameters: list
+    ) -> Dict[str, Any]:
         """
-        handle nested models
+        generate the OpenAPI operation of a route function
         """
-        definitions = {}
-        def_key = "$defs"
-        for name, schema in self.models.items():
-            if def_key in schema:
-                for key, value in schema[def_key].items():
-                    composed_key = self.nested_naming_strategy(name, key)
-                    if composed_key not in definitions:
-                        definitions[composed_key] = value
-                del schema[def_key]
+        name = parse_name(func)
+        summary, desc = parse_comments(func)
+        operation = {
+            "summary": summary or f"{name} <{method}>",
+            "operationId": self.backend.get_func_operation_id(func, path, method),
+            "description": desc or "",
+            "tags": [str(x) for x in getattr(func, "tags", ())],
+            "parameters": parse_params(func, parameters[:], self.models),
+            "responses": parse_resp(func, self.naming_strategy),
+        }
+
+        security = getattr(func, "security", None)
+        if security is not None:
+            operation["security"] = get_security(security)
+
+        deprecated = getattr(func, "deprecated", False)
+        if deprecated:
+            operation["deprecated"] = deprecated
 
-        return definitions
+        request_body = parse_request(func)
+        if request_body:
+            operation["requestBody"] = request_body
+        return operation
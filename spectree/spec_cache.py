@@ -0,0 +1,128 @@
+import contextlib
+import hashlib
+import inspect
+import json
+import logging
+import os
+import platform
+import re
+import sys
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Optional, get_args, get_origin
+
+from spectree._types import ModelAdapterType
+
+logger = logging.getLogger(__name__)
+
+#: the packages that change the generated spec between their versions
+PACKAGES = ("spectree", "pydantic", "msgspec")
+# object addresses differ between the processes
+ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+class Fingerprint:
+    """
+    sha256 of everything the OpenAPI spec is generated from, the spec generated
+    by another process can be reused if the fingerprint is the same.
+
+    The model classes are followed through their fields without generating
+    their JSON schema, the source files of the modules that define them are
+    included to catch the changes not visible from the types, like the field
+    descriptions or the validators.
+    """
+
+    def __init__(self, model_adapter: ModelAdapterType):
+        self.model_adapter = model_adapter
+        self._hash = hashlib.sha256()
+        self._modules: set[str] = set()
+        self._types: set[int] = set()
+        self.add(platform.python_version(), type(model_adapter).__qualname__)
+        for package in PACKAGES:
+            with contextlib.suppress(PackageNotFoundError):
+                self.add(package, version(package))
+
+    def add(self, *values: Any):
+        for value in values:
+            self._hash.update(ADDRESS.sub("", repr(value)).encode())
+            self._hash.update(b"\0")
+
+    def add_source(self, obj: Any):
+        """
+        add the source file of the module that defines the `obj`
+        """
+        name = getattr(obj, "__module__", None)
+        if not name or name in self._modules:
+            return
+        self._modules.add(name)
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if not path:
+            return
+        try:
+            with open(path, "rb") as file:
+                self.add(name, hashlib.sha256(file.read()).hexdigest())
+        except OSError:
+            # the module is still identified by the types added with it
+            self.add(name)
+
+    def add_type(self, typ: Any):
+        """
+        add the type and all the types it's generated from
+        """
+        types = [typ]
+        while types:
+            typ = types.pop()
+            # the types are kept alive by the annotations they come from
+            if id(typ) in self._types:
+                continue
+            self._types.add(id(typ))
+            self.add(typ)
+            types.extend(get_args(typ))
+            origin = get_origin(typ)
+            if origin is not None:
+                types.append(origin)
+            elif inspect.isclass(typ) and typ.__module__ != "builtins":
+                self.add_source(typ)
+                for source in self.model_adapter.schema_sources(typ):
+                    if isinstance(source, str):
+                        self.add(source)
+                    else:
+                        types.append(source)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def load_spec(path: str) -> Optional[dict[str, Any]]:
+    """
+    load the cached spec, `None` if it's not there or cannot be read
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        logger.warning("failed to load the cached OpenAPI spec %s: %s", path, err)
+        return None
+
+
+def store_spec(path: str, spec: dict[str, Any]):
+    """
+    store the spec to the cache, the file is replaced atomically since other
+    processes may be loading it
+    """
+    directory = os.path.dirname(path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".spectree-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(spec, file, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+            raise
+    except (OSError, TypeError, ValueError) as err:
+        logger.warning("failed to store the OpenAPI spec to %s: %s", path, err)
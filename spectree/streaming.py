@@ -0,0 +1,106 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Callable, Literal, Optional
+
+StreamFormat = Literal["ndjson", "sse"]
+
+#: `Content-Type` of the streaming responses by the stream format
+STREAM_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def is_stream(value: Any) -> bool:
+    """whether an endpoint returned the (async) iterator of the items to stream"""
+    return isinstance(value, (Iterator, AsyncIterator))
+
+
+def frame(
+    stream_format: StreamFormat, data: bytes, event: Optional[str] = None
+) -> bytes:
+    """
+    :param stream_format: `ndjson` or `sse`
+    :param data: the serialized item, it doesn't contain line breaks
+    :param event: name of the server-sent event
+
+    wrap the serialized item for the stream format
+    """
+    if stream_format == "ndjson":
+        return data + b"\n"
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + data + b"\n\n"
+
+
+async def iterate_in_thread(iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """iterate a sync iterator in the default executor, not on the event loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, next, iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class ResponseStream:
+    """
+    The body of a streaming response, the items returned by the endpoint are
+    validated and serialized one by one while they're sent.
+
+    When an item fails the validation the stream ends, the `on_error` callback
+    returns the last frame, e.g. an `error` event of SSE. The status code has
+    been sent before that.
+
+    :param items: iterator or async iterator of the items
+    :param stream_format: `ndjson` or `sse`
+    :param encode: validate and serialize an item
+    :param validation_error: the error raised by `encode` when an item is invalid
+    :param on_error: handle the validation error and return the last frame
+    """
+
+    def __init__(
+        self,
+        items: Any,
+        stream_format: StreamFormat,
+        encode: Callable[[Any], bytes],
+        validation_error: type[Exception],
+        on_error: Callable[[Exception], Optional[bytes]],
+    ):
+        self.items = items
+        self.stream_format = stream_format
+        self.encode = encode
+        self.validation_error = validation_error
+        self.on_error = on_error
+
+    @property
+    def media_type(self) -> str:
+        return STREAM_MEDIA_TYPES[self.stream_format]
+
+    @property
+    def is_async(self) -> bool:
+        """whether the items are an async iterator, the others are iterated by `iter()`"""
+        return isinstance(self.items, AsyncIterator)
+
+    def _frame(self, item: Any) -> bytes:
+        return frame(self.stream_format, self.encode(item))
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            for item in self.items:
+                yield self._frame(item)
+        except self.validation_error as err:
+            last = self.on_error(err)
+            if last:
+                yield last
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        # the sync items would block the event loop, the async frameworks iterate
+        # them in a thread instead
+        assert self.is_async, "iterate the sync items by `iter()`"
+        try:
+            async for item in self.items:
+                yield self._frame(item)
+        except self.validation_error as err:
+            last = self.on_error(err)
+            if last:
+                yield last
@@ -1,16 +1,19 @@
-import functools
 import inspect
+import json
 import logging
 import re
+import warnings
 from enum import Enum
-from hashlib import sha1
+from hashlib import sha1, sha256
 from math import isinf, isnan
 from types import UnionType
 from typing import (
     Annotated,
     Any,
     Callable,
+    Iterable,
     Mapping,
+    NamedTuple,
     Optional,
     Sequence,
     Tuple,
@@ -23,15 +26,22 @@ from typing import (
 from spectree._types import (
     ModelAdapterType,
     MultiDict,
-    MultiDictStarlette,
     NamingStrategy,
+    _MultiDictStarlette,
 )
+from spectree.cache import Cache
 from spectree.model_adapter import ModelClass
+from spectree.streaming import STREAM_MEDIA_TYPES
 
 # parse HTTP status code to get the code
 HTTP_CODE = re.compile(r"^HTTP_(?P<code>\d{3})$")
 
-cached_type_hints = functools.cache(get_type_hints)
+#: the type hints of the models, shared by the :class:`spectree.SpecTree` instances
+TYPE_HINTS_CACHE: Cache[Any, dict[str, Any]] = Cache("type_hints")
+
+
+def cached_type_hints(model: Any) -> dict[str, Any]:
+    return TYPE_HINTS_CACHE.get(model, get_type_hints)
 
 
 logger = logging.getLogger(__name__)
@@ -86,10 +96,24 @@ def parse_request(func: Any) -> dict[str, Any]:
             "schema": {"$ref": f"#/components/schemas/{func.form}"}
         }
 
+    if hasattr(func, "ndjson"):
+        # the schema of each line
+        content_items["application/x-ndjson"] = {
+            "schema": {"$ref": f"#/components/schemas/{func.ndjson}"}
+        }
+
     if not content_items:
         return {}
 
-    return {"content": content_items, "required": True}
+    request_body: dict[str, Any] = {"content": content_items, "required": True}
+    max_body_size = getattr(func, "max_body_size", None)
+    if max_body_size is not None:
+        request_body["description"] = (
+            f"The request body is limited to {max_body_size} bytes, a larger body is "
+            "rejected with the validation error status."
+        )
+        request_body["x-max-body-size"] = max_body_size
+    return request_body
 
 
 def parse_params(
@@ -260,6 +284,47 @@ def get_nested_key(parent: str, child: str) -> str:
     return f"{parent}.{child}"
 
 
+def get_definition_digests(
+    definitions: Mapping[str, Any], ref_template: str
+) -> dict[str, str]:
+    """
+    sha256 of each schema in the `$defs` together with all the schemas it refers
+    to, the structurally identical schemas get the same digest
+
+    :param definitions: the `$defs` of a JSON schema
+    :param ref_template: the template of the refs in the schema, like
+        `#/components/schemas/{model}`
+    """
+    prefix = ref_template.format(model="")
+    contents = {
+        key: json.dumps(value, sort_keys=True, default=repr)
+        for key, value in definitions.items()
+    }
+    refs = {
+        key: {
+            ref.removeprefix(prefix)
+            for ref in re.findall(r'"\$ref": "([^"]*)"', content)
+            if ref.startswith(prefix)
+        }
+        & definitions.keys()
+        for key, content in contents.items()
+    }
+
+    digests = {}
+    for key in definitions:
+        reachable, keys = {key}, [key]
+        while keys:
+            for ref in refs[keys.pop()] - reachable:
+                reachable.add(ref)
+                keys.append(ref)
+        # the root is included since a cycle reaches the same schemas from each key
+        digest = sha256(key.encode())
+        for ref in sorted(reachable):
+            digest.update(f"\0{ref}\0{contents[ref]}".encode())
+        digests[key] = digest.hexdigest()
+    return digests
+
+
 def get_security(security: Union[None, Mapping, Sequence[Any]]) -> list[Any]:
     """
     return the correct format of security
@@ -275,32 +340,56 @@ def get_security(security: Union[None, Mapping, Sequence[Any]]) -> list[Any]:
 
 
 def get_multidict_items(
-    multidict: MultiDict, model: Optional[ModelClass] = None
+    multidict: MultiDict,
+    model: Optional[ModelClass] = None,
+    *,
+    keys: Optional[Iterable[str]] = None,
 ) -> dict[str, Union[None, str, list[str]]]:
     """
     return the items of a :class:`werkzeug.datastructures.ImmutableMultiDict`
+
+    :param model: deprecated, the list fields of the model are decoded by
+        :func:`get_multidict_plan`
+    :param keys: only pick these keys if provided
     """
+    if model is not None:
+        warnings.warn(
+            "the `model` of `get_multidict_items` is deprecated, "
+            "use `get_multidict_plan` instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
     res: dict[str, Union[None, str, list[str]]] = {}
-    for key in multidict:
+    for key in multidict if keys is None else keys:
         values = multidict.getlist(key)
-        if (model is not None and is_list_item(key, model)) or len(values) > 1:
-            res[key] = multidict.getlist(key)
+        if not values:
+            continue
+        if len(values) > 1 or _is_list_item(key, model):
+            res[key] = values
         else:
-            res[key] = multidict.get(key)
+            res[key] = values[0]
 
     return res
 
 
 def get_multidict_items_starlette(
-    multidict: MultiDictStarlette, model: Optional[ModelClass] = None
+    multidict: _MultiDictStarlette, model: Optional[ModelClass] = None
 ):
     """
     return the items of a :class:`starlette.datastructures.ImmutableMultiDict`
+
+    Deprecated, use :func:`get_multidict_items` instead.
     """
+    warnings.warn(
+        "`get_multidict_items_starlette` is deprecated, "
+        "use `get_multidict_items` instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     res = {}
     for key in multidict:
         values = multidict.getlist(key)
-        if (model is not None and is_list_item(key, model)) or len(values) > 1:
+        if len(values) > 1 or _is_list_item(key, model):
             res[key] = values
         else:
             res[key] = multidict[key]
@@ -308,8 +397,95 @@ def get_multidict_items_starlette(
     return res
 
 
+class MultiDictPlan(NamedTuple):
+    """
+    How the items of a query string or a form are decoded into the validation
+    input of a model, it's compiled once per model by :func:`get_multidict_plan`.
+    """
+
+    #: input keys (names and aliases) of the list fields, decoded as lists
+    list_keys: frozenset[str]
+    #: input keys read by the model, the other keys are skipped. `None` keeps all
+    #: of them, see :meth:`spectree.model_adapter.ModelAdapter.field_keys`
+    keys: Optional[frozenset[str]]
+
+    def decode(self, items: Iterable[Tuple[str, Any]]) -> dict[str, Any]:
+        """
+        :param items: the (key, value) pairs, like ``MultiDict.items(multi=True)``
+            of werkzeug or ``ImmutableMultiDict.multi_items()`` of starlette
+
+        the keys of the list fields, or with multiple values, get a list of the
+        values, the others get the value
+        """
+        grouped: dict[str, list[Any]] = {}
+        keys = self.keys
+        for key, value in items:
+            if keys is None or key in keys:
+                grouped.setdefault(key, []).append(value)
+        list_keys = self.list_keys
+        return {
+            key: values if len(values) > 1 or key in list_keys else values[0]
+            for key, values in grouped.items()
+        }
+
+
+#: the decoding plans by (model adapter, model)
+MULTIDICT_PLAN_CACHE: Cache[Any, MultiDictPlan] = Cache("multidict_plans")
+
+
+def get_multidict_plan(
+    model: ModelClass, model_adapter: ModelAdapterType
+) -> MultiDictPlan:
+    """get the decoding plan of the model, it's compiled at the first call"""
+    return MULTIDICT_PLAN_CACHE.get((model_adapter, model), _compile_multidict_plan)
+
+
+def _compile_multidict_plan(key: Tuple[ModelAdapterType, ModelClass]) -> MultiDictPlan:
+    model_adapter, model = key
+    aliases = model_adapter.field_aliases(model)
+    list_keys: set[str] = set()
+    for name, annotation in cached_type_hints(model).items():
+        if _annotation_is_list(annotation):
+            list_keys.update(aliases.get(name, (name,)))
+    return MultiDictPlan(frozenset(list_keys), model_adapter.field_keys(model))
+
+
+def get_projected_items(
+    getter: Callable[[str], Any], keys: Iterable[str]
+) -> dict[str, Any]:
+    """
+    pick the items of the given keys with the ``getter``, missing keys are skipped
+
+    The header getters of the web frameworks are case-insensitive, so the keys
+    declared by the header model are matched regardless of the case.
+
+    :param getter: a function like ``headers.get``
+    :param keys: keys declared by the model, see
+        :meth:`spectree.model_adapter.ModelAdapter.field_keys`
+    """
+    res = {}
+    for key in keys:
+        value = getter(key)
+        if value is not None:
+            res[key] = value
+    return res
+
+
 def is_list_item(key: str, model: Optional[ModelClass]) -> bool:
-    """Check if this key is a list item in the model."""
+    """
+    Check if this key is a list item in the model.
+
+    Deprecated, use the ``list_keys`` of :func:`get_multidict_plan` instead.
+    """
+    warnings.warn(
+        "`is_list_item` is deprecated, use `get_multidict_plan` instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return _is_list_item(key, model)
+
+
+def _is_list_item(key: str, model: Optional[ModelClass]) -> bool:
     if model is None:
         return False
 
@@ -345,10 +521,16 @@ def parse_resp(func: Any, naming_strategy: NamingStrategy = get_model_key):
     if hasattr(func, "resp"):
         responses = func.resp.generate_spec(naming_strategy)
 
+    stream_format = getattr(func, "stream_format", None)
+    if stream_format and "content" in responses.get("200", {}):
+        # the schema of each item in the stream
+        content = responses["200"]["content"]
+        content[STREAM_MEDIA_TYPES[stream_format]] = content.pop("application/json")
+
     return responses
 
 
-def json_compatible_deepcopy(obj: Any) -> Any:
+def json_compatible_deepcopy(obj: Any, refs: Optional[Mapping[str, str]] = None) -> Any:
     """
     A custom deepcopy implementation that modifies the behavior of:
 
@@ -362,6 +544,9 @@ def json_compatible_deepcopy(obj: Any) -> Any:
 
     - https://datatracker.ietf.org/doc/html/rfc7159.html
 
+    The `$ref` values found in `refs` are replaced by the mapped values in the
+    same pass.
+
     This only works for the generated schema. It does not handle the recursive objects.
     DO NOT use this for other purposes.
     """
@@ -374,16 +559,28 @@ def json_compatible_deepcopy(obj: Any) -> Any:
         return x
 
     _immutable_types = (int, float, bool, str, bytes, type(None))
+    # most of the nodes are returned as-is, without a call
+    _leaf_types = frozenset((int, bool, str, bytes, type(None)))
 
     def naive_deepcopy(obj):
         """This does not handle the recursive objects."""
         cls = type(obj)
         if cls is dict:
             res = {
-                naive_deepcopy(key): naive_deepcopy(value) for key, value in obj.items()
+                key if type(key) in _leaf_types else naive_deepcopy(key): value
+                if type(value) in _leaf_types
+                else naive_deepcopy(value)
+                for key, value in obj.items()
             }
+            if refs:
+                ref = res.get("$ref")
+                if isinstance(ref, str) and ref in refs:
+                    res["$ref"] = refs[ref]
         elif cls is list:
-            res = [naive_deepcopy(item) for item in obj]
+            res = [
+                item if type(item) in _leaf_types else naive_deepcopy(item)
+                for item in obj
+            ]
         elif cls is tuple:
             res = tuple(naive_deepcopy(item) for item in obj)
         elif cls is float:
@@ -1,4 +1,6 @@
+import gzip
 import io
+import json
 import random
 import re
 
@@ -106,10 +108,28 @@ def test_flask_doc(test_client_and_api, expected_doc_pages):
 
     resp = client.get("/apidoc/openapi.json")
     assert resp.json == api.spec
+    assert resp.headers["Cache-Control"] == "no-cache"
+
+    resp = client.get(
+        "/apidoc/openapi.json", headers={"If-None-Match": resp.headers["ETag"]}
+    )
+    assert resp.status_code == 304
+    assert not resp.data
+
+    resp = client.get("/apidoc/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(resp.data)) == api.spec
 
     for doc_page in expected_doc_pages:
         resp = client.get(f"/apidoc/{doc_page}/")
         assert resp.status_code == 200
+        assert resp.mimetype == "text/html"
+        assert (
+            client.get(
+                f"/apidoc/{doc_page}/", headers={"If-None-Match": resp.headers["ETag"]}
+            ).status_code
+            == 304
+        )
 
         resp = client.get(f"/apidoc/{doc_page}")
         assert resp.status_code == 308
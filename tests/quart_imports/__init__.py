@@ -2,6 +2,7 @@ from tests.quart_imports.dry_plugin_quart import (
     test_quart_custom_error,
     test_quart_doc,
     test_quart_forced_serializer,
+    test_quart_form,
     test_quart_list_json_request,
     test_quart_no_response,
     test_quart_return_list_request,
@@ -16,6 +17,7 @@ __all__ = [
     "test_quart_custom_error",
     "test_quart_doc",
     "test_quart_forced_serializer",
+    "test_quart_form",
     "test_quart_list_json_request",
     "test_quart_no_response",
     "test_quart_return_list_request",
@@ -1,3 +1,6 @@
+import gzip
+import json
+
 import pytest
 
 from tests.common import UserXmlData
@@ -111,6 +114,15 @@ async def test_quart_doc(test_client_and_api, expected_doc_pages):
     resp = await client.get("/apidoc/openapi.json")
     assert (await resp.json) == api.spec
 
+    resp = await client.get(
+        "/apidoc/openapi.json", headers={"If-None-Match": resp.headers["ETag"]}
+    )
+    assert resp.status_code == 304
+
+    resp = await client.get("/apidoc/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(await resp.get_data())) == api.spec
+
     for doc_page in expected_doc_pages:
         resp = await client.get(f"/apidoc/{doc_page}/")
         assert resp.status_code == 200
@@ -168,6 +180,15 @@ async def test_quart_no_response(client):
     assert resp.status_code == 200
 
 
+async def test_quart_form(client):
+    resp = await client.post("/api/form", form={"name": "quart", "limit": "3"})
+    assert resp.status_code == 200
+    assert await resp.json == {"name": "quart", "limit": "3"}
+
+    resp = await client.post("/api/form", form={"name": "quart"})
+    assert resp.status_code == 422
+
+
 async def test_quart_list_json_request(client):
     resp = await client.post("/api/list_json", json=[{"name": "foo", "limit": 1}])
     assert resp.status_code == 200
@@ -1,14 +1,22 @@
+import gzip
 import json
 import uuid
+import warnings
 from dataclasses import asdict, dataclass, is_dataclass
 from datetime import datetime
+from decimal import Decimal
 from typing import Union
 
 import pytest
 
+from spectree import SpecTree
 from spectree.plugins.base import (
+    EncodedSpec,
     RawResponsePayload,
+    ResponseSampler,
     ResponseValidationResult,
+    accepts_gzip,
+    serialize_response,
     validate_response,
 )
 from tests.common_dataclass import ComplexResp, Payload, Resp
@@ -156,3 +164,181 @@ def test_validate_response_rejects_invalid_payload(
             validation_model=validation_model,
             response_payload=response_payload,
         )
+
+
+def test_response_sampler():
+    assert all(ResponseSampler().sample() for _ in range(10))
+    assert not any(ResponseSampler(rate=0).sample() for _ in range(10))
+
+    sampler = ResponseSampler(rate=0, first=3)
+    assert [sampler.sample() for _ in range(5)] == [True, True, True, False, False]
+    # restart counting after the setting is changed
+    sampler.set(rate=0, first=1)
+    assert [sampler.sample() for _ in range(2)] == [True, False]
+
+    for rate, first in [(-0.1, 0), (1.1, 0), (0.5, -1)]:
+        with pytest.raises(ValueError):
+            ResponseSampler(rate=rate, first=first)
+
+
+@pytest.mark.parametrize(
+    "payload, expected",
+    [
+        # serialized by the web framework
+        ({"a": [1, 2]}, None),
+        ([1, 2], None),
+        ("text", None),
+        (b"bytes", None),
+        (None, None),
+        ({"a": object()}, None),
+    ],
+)
+def test_serialize_response(model_case, payload, expected):
+    serialized = serialize_response(model_case.adapter, payload)
+    if expected is None:
+        assert serialized is None
+    else:
+        assert json.loads(serialized) == expected
+
+
+def test_serialize_response_with_model_instances(model_case):
+    resp_model = model_case.get_model(Resp)
+    instance = model_case.validate_obj(resp_model, {"name": "user1", "score": [1]})
+
+    assert json.loads(serialize_response(model_case.adapter, instance)) == {
+        "name": "user1",
+        "score": [1],
+    }
+    assert json.loads(
+        serialize_response(model_case.adapter, {"data": [instance], "total": 1})
+    ) == {"data": [{"name": "user1", "score": [1]}], "total": 1}
+
+
+def test_serialize_response_by_framework_dumps(model_case, monkeypatch):
+    adapter = model_case.adapter
+    instance = model_case.validate_obj(
+        model_case.get_model(Resp), {"name": "user1", "score": [1]}
+    )
+    checked = []
+    is_partial_model_instance = adapter.is_partial_model_instance
+    monkeypatch.setattr(
+        adapter,
+        "is_partial_model_instance",
+        lambda value: checked.append(value) or is_partial_model_instance(value),
+    )
+
+    def dumps(payload, default):
+        return json.dumps(payload, default=default).encode()
+
+    # the plain payload is encoded in one pass, only the unknown values are checked
+    payload = [{"id": i} for i in range(1000)] + [Decimal(1)]
+    assert serialize_response(adapter, payload[:-1], dumps) == dumps(payload[:-1], None)
+    assert checked == []
+    # a value unknown to the framework, the payload without model instances is
+    # left to the framework
+    assert serialize_response(adapter, payload, dumps) is None
+
+    checked.clear()
+    serialized = serialize_response(adapter, [{"id": 1}, instance], dumps)
+    assert json.loads(serialized) == [{"id": 1}, {"name": "user1", "score": [1]}]
+    # the encoding stops at the model instance
+    assert checked[0] is instance
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, False),
+        ("", False),
+        ("identity", False),
+        ("gzip", True),
+        ("br, GZIP;q=0.5", True),
+        ("gzip;q=0", False),
+        ("*", True),
+        ("*, gzip;q=0", False),
+        ("gzip;q=bad", False),
+    ],
+)
+def test_accepts_gzip(accept_encoding, expected):
+    assert accepts_gzip(accept_encoding) is expected
+
+
+def test_encoded_spec():
+    spec = {"openapi": "3.1.0", "info": {"title": "título"}}
+    encoded = EncodedSpec(spec, "max-age=60")
+
+    status, headers, body = encoded.response()
+    assert status == 200
+    assert json.loads(body) == spec
+    assert headers["Content-Type"] == "application/json"
+    assert headers["Cache-Control"] == "max-age=60"
+    assert headers["ETag"] == encoded.etag
+    assert "Content-Encoding" not in headers
+
+    status, headers, body = encoded.response(accept_encoding="gzip, br")
+    assert status == 200
+    assert json.loads(gzip.decompress(body)) == spec
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["ETag"] == encoded.gzip_etag != encoded.etag
+    assert body is encoded.response(accept_encoding="gzip")[2]
+
+    for if_none_match in (
+        encoded.etag,
+        f"W/{encoded.gzip_etag}",
+        f'"other", {encoded.etag}',
+        "*",
+    ):
+        status, headers, body = encoded.response(if_none_match=if_none_match)
+        assert (status, body) == (304, b"")
+        assert headers["ETag"] == encoded.etag
+    assert encoded.response(if_none_match='"other"').status == 200
+
+
+def test_spec_response_encodes_the_spec_once():
+    api = SpecTree()
+    api._spec = {"openapi": "3.1.0"}
+    first = api.backend.spec_response(None, None)
+    assert api.backend.spec_response(None, None).body is first.body
+
+    api._spec = {"openapi": "3.0.3"}
+    second = api.backend.spec_response(first.headers["ETag"], None)
+    assert second.status == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+@pytest.mark.parametrize("compress", [False, True], ids=["json", "gzip"])
+def test_spec_response_serves_the_spec_file(tmp_path, compress):
+    body = b'{"openapi":"3.1.0"}'
+    path = tmp_path / "openapi.json"
+    path.write_bytes(gzip.compress(body) if compress else body)
+    api = SpecTree(spec_file=str(path))
+    api._generate_spec = None  # fails the test if the spec is generated
+
+    identity = api.backend.spec_response(None, None)
+    assert identity.body == body
+    compressed = api.backend.spec_response(None, "gzip")
+    assert gzip.decompress(compressed.body) == body
+    if compress:
+        assert compressed.body == path.read_bytes()
+    assert api.spec == {"openapi": "3.1.0"}
+
+
+def test_page_response_renders_once():
+    api = SpecTree(
+        page_templates={"page": "{spec_url} {client_id}"},
+        client_id="id",
+        client_secret="secret",
+    )
+    with pytest.warns(UserWarning, match="client_secret"):
+        first = api.backend.page_response("page", "/spec.json", None, None)
+    assert first.body == b"/spec.json id"
+    assert first.headers["Content-Type"] == "text/html; charset=utf-8"
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        again = api.backend.page_response("page", "/spec.json", None, None)
+        cached = api.backend.page_response(
+            "page", "/spec.json", first.headers["ETag"], None
+        )
+    assert again.body is first.body
+    assert cached.status == 304
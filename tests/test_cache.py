@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from spectree.cache import Cache, CacheStats
+
+
+def test_cache_get():
+    cache: Cache[str, str] = Cache("test")
+    assert cache.get("a", str.upper) == "A"
+    assert cache.get("a", lambda key: pytest.fail("built again")) == "A"
+    assert cache.get("b", str.upper) == "B"
+    assert cache.stats() == CacheStats(hits=1, misses=2, size=2, maxsize=None)
+    # reading the stats doesn't change them
+    assert cache.stats().hits == 1
+
+    cache.clear()
+    assert cache.stats() == CacheStats(hits=1, misses=2, size=0, maxsize=None)
+
+
+def test_cache_lru():
+    cache: Cache[str, str] = Cache("test", maxsize=2)
+    cache.get("a", str.upper)
+    cache.get("b", str.upper)
+    # "a" is used more recently than "b"
+    cache.get("a", str.upper)
+    cache.get("c", str.upper)
+    assert list(cache._data) == ["a", "c"]
+
+    cache.resize(1)
+    assert list(cache._data) == ["c"]
+    assert cache.stats() == CacheStats(hits=1, misses=3, size=1, maxsize=1)
+
+    with pytest.raises(ValueError):
+        cache.resize(0)
+
+
+def test_cache_builds_each_key_once():
+    cache: Cache[int, int] = Cache("test")
+    built = []
+
+    def build(key):
+        built.append(key)
+        time.sleep(0.01)
+        return key * 2
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(cache.get(i % 2, build)))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(built) == [0, 1]
+    assert sorted(results) == [0, 0, 0, 0, 2, 2, 2, 2]
+    assert cache.stats() == CacheStats(hits=6, misses=2, size=2, maxsize=None)
+
+
+def test_cache_build_error():
+    cache: Cache[str, str] = Cache("test")
+
+    def build(key):
+        raise RuntimeError(key)
+
+    with pytest.raises(RuntimeError):
+        cache.get("a", build)
+    assert cache.get("a", str.upper) == "A"
+    assert cache.stats().misses == 2
+    assert not cache._building
+
+
+class CountingLock:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquired = 0
+
+    def __enter__(self):
+        self.acquired += 1
+        return self.lock.__enter__()
+
+    def __exit__(self, *exc):
+        return self.lock.__exit__(*exc)
+
+
+@pytest.mark.parametrize(("maxsize", "acquired"), [(None, 0), (2, 3)])
+def test_cache_hit_lock(maxsize, acquired):
+    cache: Cache[str, str] = Cache("test", maxsize=maxsize)
+    cache.get("a", str.upper)
+    cache._lock = lock = CountingLock()  # type: ignore[assignment]
+    for _ in range(3):
+        assert cache.get("a", str.upper) == "A"
+    # only the LRU order of the bounded caches takes the lock
+    assert lock.acquired == acquired
+    assert cache.stats().hits == 3
+    assert cache.stats().hits == 3
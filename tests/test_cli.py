@@ -0,0 +1,90 @@
+import gzip
+import json
+import sys
+import textwrap
+
+import pytest
+
+from spectree.cli import find_spectree, main
+
+APP_MODULE = """
+from {backend} import {app_class}
+from pydantic import BaseModel
+
+from spectree import Response, SpecTree
+
+
+class Item(BaseModel):
+    name: str
+
+
+app = {app_class}(__name__)
+api = SpecTree("{backend}")
+other_api = SpecTree("{backend}")
+
+
+@app.route("/items", methods=["POST"])
+@api.validate(json=Item, resp=Response(HTTP_200=Item))
+{async_}def create_item():
+    pass
+
+
+api.register(app)
+"""
+
+
+@pytest.fixture(
+    params=[("flask", "Flask", ""), ("quart", "Quart", "async ")],
+    ids=["flask", "quart"],
+)
+def app_module(request, tmp_path, monkeypatch):
+    backend, app_class, async_ = request.param
+    name = f"cli_{backend}_app"
+    (tmp_path / f"{name}.py").write_text(
+        textwrap.dedent(
+            APP_MODULE.format(backend=backend, app_class=app_class, async_=async_)
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    return name
+
+
+@pytest.mark.parametrize("attribute", ["app", "api"])
+def test_export(app_module, tmp_path, attribute):
+    output = tmp_path / "openapi.json"
+    assert main(["export", f"{app_module}:{attribute}", "-o", str(output)]) == 0
+
+    spec = json.loads(output.read_bytes())
+    assert list(spec["paths"]) == ["/items"]
+    # minified
+    assert b'": ' not in output.read_bytes()
+
+
+def test_export_gzip(app_module, tmp_path):
+    output = tmp_path / "openapi.json.gz"
+    main(["export", f"{app_module}:api", "-o", str(output), "--gzip"])
+
+    spec = json.loads(gzip.decompress(output.read_bytes()))
+    assert list(spec["paths"]) == ["/items"]
+
+
+def test_export_to_stdout(app_module, capsysbinary):
+    main(["export", f"{app_module}:api", "-o", "-"])
+    assert json.loads(capsysbinary.readouterr().out)["paths"]
+
+
+@pytest.mark.parametrize(
+    "target", ["no_colon", "missing_module:app", "{module}:missing", "{module}:Item"]
+)
+def test_export_invalid_target(app_module, target, capsys):
+    with pytest.raises(SystemExit):
+        main(["export", target.format(module=app_module)])
+    assert "cannot export" in capsys.readouterr().err
+
+
+def test_find_spectree(app_module):
+    api = find_spectree(f"{app_module}:api")
+    assert find_spectree(f"{app_module}:app") is api
+    assert find_spectree(f"{app_module}:other_api") is not api
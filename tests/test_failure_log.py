@@ -0,0 +1,74 @@
+import logging
+
+from flask import Flask, jsonify
+from pydantic import BaseModel
+
+from spectree import Response, SpecTree
+from spectree.failure_log import FailureLog, get_endpoint
+from spectree.model_adapter import get_pydantic_model_adapter
+
+
+class Item(BaseModel):
+    id: int
+
+
+def create_app(failures: FailureLog) -> Flask:
+    app = Flask(__name__)
+    api = SpecTree("flask", before=failures.before, after=failures.after)
+
+    @app.route("/items/<int:item_id>", methods=["POST"])
+    @api.validate(json=Item, resp=Response(HTTP_200=Item))
+    def update_item(item_id: int):
+        return jsonify(id="not an int")
+
+    api.register(app)
+    return app
+
+
+def test_failure_log_aggregates(caplog):
+    failures = FailureLog(interval=3600, samples=2)
+    client = create_app(failures).test_client()
+    with caplog.at_level(logging.ERROR, logger="spectree.failure_log"):
+        for item_id in range(3):
+            assert client.post(f"/items/{item_id}", json={}).status_code == 422
+        assert client.post("/items/1", json={"id": 1}).status_code == 500
+
+    endpoint = "POST /items/<int:item_id>"
+    assert failures.counts == {
+        ("request", endpoint, "missing"): 3,
+        ("response", endpoint, "int_parsing"): 1,
+    }
+    # only the first failure of each key is logged
+    assert len(caplog.records) == 2
+    assert "request validation error" in caplog.records[0].getMessage()
+
+    samples = failures.samples
+    assert [sample.phase for sample in samples] == ["request", "response"]
+    assert samples[0].errors[0]["loc"] == ("id",)
+
+    caplog.clear()
+    with caplog.at_level(logging.ERROR, logger="spectree.failure_log"):
+        failures.flush()
+    assert failures.counts == {}
+    assert caplog.records[0].getMessage() == (
+        f"2 more validation errors in 0s: {endpoint} request missing x2"
+    )
+
+
+def test_failure_log_interval(caplog):
+    failures = FailureLog(interval=0)
+    adapter = get_pydantic_model_adapter()
+    error = adapter.validation_error.from_exception_data("Item", [])
+
+    class Request:
+        method = "GET"
+        path = "/ping"
+
+    assert get_endpoint(Request()) == "GET /ping"
+    with caplog.at_level(logging.ERROR, logger="spectree.failure_log"):
+        failures.before(Request(), None, error, None, adapter)
+        failures.before(Request(), None, None, None, adapter)
+    # the interval has passed on each failure, the counts are reset
+    assert failures.counts == {}
+    assert len(failures.samples) == 1
+    assert len(caplog.records) == 1
@@ -141,3 +141,62 @@ def test_validation_errors(model_case):
     assert list(errors[0]["loc"]) == ["user_id"]
     assert errors[0]["msg"]
     assert errors[0]["type"]
+
+
+def test_validate_json_malformed_body(model_case):
+    with pytest.raises(model_case.adapter.validation_error):
+        model_case.validate_json(model_case.get_model(SimpleModel), b'{"user_id": 1')
+
+
+def test_field_keys(model_case):
+    adapter = model_case.adapter
+
+    assert adapter.field_keys(model_case.get_model(SimpleModel)) == {"user_id"}
+    assert adapter.field_keys(model_case.get_model(dict[str, str], name="Any")) is None
+
+
+def test_field_aliases(model_case):
+    adapter = model_case.adapter
+
+    assert adapter.field_aliases(model_case.get_model(SimpleModel)) == {
+        "user_id": {"user_id"}
+    }
+    assert adapter.field_aliases(model_case.get_model(dict[str, str], name="Any")) == {}
+
+
+def test_schema_sources(model_case):
+    adapter = model_case.adapter
+    sources = adapter.schema_sources(model_case.get_model(SimpleModel))
+
+    assert int in sources
+    assert any(isinstance(source, str) and "user_id" in source for source in sources)
+    assert adapter.schema_sources(int) == []
+
+
+def test_warmup(model_case):
+    adapter = model_case.adapter
+    simple_model = model_case.get_model(SimpleModel)
+
+    for model in (simple_model, adapter.make_list_model(simple_model)):
+        adapter.warmup(model)
+    # the validation error model is only used by the OpenAPI spec
+    adapter.warmup(adapter.validation_error)
+
+
+def test_make_validation_error(model_case):
+    adapter = model_case.adapter
+    err = adapter.make_validation_error(["body"], "too large", "body_too_large")
+
+    assert isinstance(err, adapter.validation_error)
+    (error,) = adapter.validation_errors(err)
+    assert list(error["loc"]) == ["body"]
+    assert error["msg"] == "too large"
+
+
+def test_error_type(model_case):
+    adapter = model_case.adapter
+    err = adapter.make_validation_error(["body"], "too large", "body_too_large")
+    assert adapter.error_type(err) in ("body_too_large", "too large")
+    # the location isn't a part of the type
+    other = adapter.make_validation_error(["query"], "too large", "body_too_large")
+    assert adapter.error_type(other) == adapter.error_type(err)
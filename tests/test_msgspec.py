@@ -65,6 +65,47 @@ def test_validation_errors_shape():
     ]
 
 
+def test_validate_json_reuses_the_decoder():
+    adapter = MsgspecModelAdapter()
+    assert adapter.validate_json(SimpleModel, b'{"user_id": "1"}') == SimpleModel(1)
+    decoder = adapter._decoder(SimpleModel)
+    assert adapter.validate_json(SimpleModel, b'{"user_id": 2}') == SimpleModel(2)
+    assert adapter._decoder(SimpleModel) is decoder
+    assert adapter._decoders.stats().misses == 1
+
+    with pytest.raises(msgspec.ValidationError):
+        adapter.validate_json(SimpleModel, b"{")
+
+
+def test_encode_into_and_encode_buffer():
+    adapter = MsgspecModelAdapter()
+    buffer = bytearray(b"[")
+    adapter.encode_into(SimpleModel(1), buffer, offset=1)
+    assert buffer == b'[{"user_id":1}'
+
+    with adapter.encode_buffer(SimpleModel(2)) as view:
+        assert view == b'{"user_id":2}'
+        pooled = view.obj
+    assert list(adapter._buffers) == [pooled]
+    with adapter.encode_buffer([1]) as view:
+        assert view.obj is pooled
+        assert view == b"[1]"
+        # a view kept after the block
+        kept = view[:]
+    assert not adapter._buffers
+    assert kept == b"[1]"
+
+    # the error raised in the block isn't swallowed by keeping a slice
+    with (
+        pytest.raises(RuntimeError, match="write failed"),
+        adapter.encode_buffer([2]) as view,
+    ):
+        kept = view[:]
+        raise RuntimeError("write failed")
+    assert not adapter._buffers
+    assert kept == b"[2]"
+
+
 def test_get_msgspec_model_adapter_is_lazy(monkeypatch):
     model_adapter_module.get_msgspec_model_adapter.cache_clear()
     model_adapter_module.get_pydantic_model_adapter.cache_clear()
@@ -133,10 +174,15 @@ def test_msgspec_adapter_dump_python_supports_alias_and_exclude_none():
         "termsOfService": "https://example.com/terms",
         "path": "apidoc",
         "filename": "openapi.json",
+        "spec_cache_control": "no-cache",
+        "dedup_nested_schemas": False,
         "openapi_version": "3.1.0",
         "mode": "normal",
         "page_templates": config.page_templates,
         "annotations": True,
+        "raw_json_body": True,
+        "ndjson_max_errors": 0,
+        "lazy_form_files": False,
         "servers": [],
         "security": {},
         "client_id": "",
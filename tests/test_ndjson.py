@@ -0,0 +1,178 @@
+import asyncio
+import io
+
+import falcon
+import pytest
+from falcon import testing as falcon_testing
+from falcon.asgi import App as FalconASGIApp
+from flask import Flask, jsonify, request
+from quart import Quart, jsonify as quart_jsonify, request as quart_request
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from spectree import SpecTree
+from spectree.ndjson import AsyncNDJSONRecords, NDJSONRecords, NDJSONValidationError
+from tests.common_dataclass import Payload
+
+BODY = b'{"name": "a", "limit": 1}\n\n{"name": "b", "limit": "x"}\n{"name": "c", "limit": 3}'
+
+
+def split(body: bytes, size: int) -> list[bytes]:
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+async def aiter_chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, len(BODY)])
+def test_ndjson_records(model_case, chunk_size):
+    model = model_case.get_model(Payload)
+    records = NDJSONRecords(
+        split(BODY, chunk_size), model, model_case.adapter, max_errors=1
+    )
+    assert [record.name for record in records] == ["a", "c"]
+    (error,) = records.errors
+    assert error["loc"] == [3, "limit"]
+
+    records = NDJSONRecords(split(BODY, chunk_size), model, model_case.adapter)
+    with pytest.raises(NDJSONValidationError) as exc_info:
+        list(records)
+    assert exc_info.value.errors == records.errors
+
+
+def test_async_ndjson_records(model_case):
+    model = model_case.get_model(Payload)
+
+    async def collect(records):
+        return [record.name async for record in records]
+
+    records = AsyncNDJSONRecords(
+        aiter_chunks(split(BODY, 5)), model, model_case.adapter, max_errors=1
+    )
+    assert asyncio.run(collect(records)) == ["a", "c"]
+
+    records = AsyncNDJSONRecords(
+        aiter_chunks(split(BODY, 5)),
+        model,
+        model_case.adapter,
+        max_errors=1,
+        max_body_size=16,
+        body_too_large=lambda: model_case.adapter.make_validation_error(
+            ["body"], "too large", "body_too_large"
+        ),
+    )
+    with pytest.raises(NDJSONValidationError) as exc_info:
+        asyncio.run(collect(records))
+    assert list(exc_info.value.errors[0]["loc"]) == ["body"]
+
+
+def test_flask_ndjson():
+    app = Flask(__name__)
+    api = SpecTree("flask", ndjson_max_errors=1)
+
+    @app.route("/items", methods=["POST"])
+    @api.validate(ndjson=Payload)
+    def create_items():
+        return jsonify([record.name for record in request.context.ndjson])
+
+    @app.route("/limited_items", methods=["POST"])
+    @api.validate(ndjson=Payload, max_body_size=16)
+    def create_limited_items():
+        return jsonify([record.name for record in request.context.ndjson])
+
+    api.register(app)
+    client = app.test_client()
+    resp = client.post("/items", data=BODY, content_type="application/x-ndjson")
+    assert resp.status_code == 200
+    assert resp.json == ["a", "c"]
+
+    resp = client.post(
+        "/items", data=BODY + b"\n{}", content_type="application/x-ndjson"
+    )
+    assert resp.status_code == 422
+    assert [error["loc"][0] for error in resp.json] == [3, 5, 5]
+
+    # the length is unknown, the records check the size while they're read
+    resp = client.post(
+        "/limited_items",
+        input_stream=io.BytesIO(BODY),
+        content_type="application/x-ndjson",
+        headers={"Transfer-Encoding": "chunked"},
+        environ_overrides={"wsgi.input_terminated": True},
+    )
+    assert resp.status_code == 422
+    assert resp.json[0]["loc"] == ["body"]
+
+    with app.app_context():
+        request_body = api.spec["paths"]["/items"]["post"]["requestBody"]
+    assert request_body["content"]["application/x-ndjson"]["schema"] == {
+        "$ref": f"#/components/schemas/{create_items.ndjson}"
+    }
+
+
+def test_starlette_ndjson():
+    api = SpecTree("starlette")
+
+    @api.validate(ndjson=Payload)
+    async def create_items(request):
+        return JSONResponse([record.name async for record in request.context.ndjson])
+
+    app = Starlette(routes=[Route("/items", create_items, methods=["POST"])])
+    api.register(app)
+    with TestClient(app) as client:
+        resp = client.post("/items", content=iter(split(BODY, 4)))
+        assert resp.status_code == 422
+        assert resp.json()[0]["loc"] == [3, "limit"]
+
+        resp = client.post("/items", content=b'{"name": "a", "limit": 1}\n')
+        assert resp.status_code == 200
+        assert resp.json() == ["a"]
+
+
+def test_quart_ndjson():
+    api = SpecTree("quart", ndjson_max_errors=1)
+    app = Quart(__name__)
+
+    @app.route("/items", methods=["POST"])
+    @api.validate(ndjson=Payload)
+    async def create_items():
+        records = quart_request.context.ndjson
+        return quart_jsonify([record.name async for record in records])
+
+    api.register(app)
+
+    async def post():
+        resp = await app.test_client().post("/items", data=BODY)
+        return resp.status_code, await resp.get_json()
+
+    assert asyncio.run(post()) == (200, ["a", "c"])
+
+
+@pytest.mark.parametrize("asgi", [False, True])
+def test_falcon_ndjson(asgi):
+    api = SpecTree("falcon-asgi" if asgi else "falcon", ndjson_max_errors=1)
+
+    class Items:
+        @api.validate(ndjson=Payload)
+        def on_post(self, req, resp):
+            resp.media = [record.name for record in req.context.ndjson]
+
+    class AsyncItems:
+        @api.validate(ndjson=Payload)
+        async def on_post(self, req, resp):
+            resp.media = [record.name async for record in req.context.ndjson]
+
+    app = FalconASGIApp() if asgi else falcon.App()
+    app.add_route("/items", AsyncItems() if asgi else Items())
+    api.register(app)
+    client = falcon_testing.TestClient(app)
+
+    resp = client.simulate_post("/items", body=BODY)
+    assert resp.status_code == 200
+    assert resp.json == ["a", "c"]
+    resp = client.simulate_post("/items", body=BODY + b"\n{}")
+    assert resp.status_code == 422
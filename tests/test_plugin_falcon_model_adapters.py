@@ -1,7 +1,12 @@
+import asyncio
+import gzip
 import importlib
+import io
+import json
 from dataclasses import dataclass
+from datetime import datetime
 from enum import Enum
-from functools import wraps
+from functools import partial, wraps
 from http import HTTPStatus
 from typing import Any, Union
 
@@ -11,6 +16,8 @@ from falcon import testing as falcon_testing
 from falcon.asgi import App as FalconASGIApp
 
 from spectree import Response, SpecTree
+from spectree.plugins import falcon_plugin
+from spectree.plugins.falcon_plugin import AsyncStreamWrapper, StreamWrapper
 from spectree.utils import get_model_key
 from tests.common import (
     UserXmlData,
@@ -22,6 +29,7 @@ from tests.common_dataclass import (
     Cookies,
     FormPayload,
     Item,
+    NamePayload,
     OptionalPayload,
     Payload,
     Query,
@@ -916,6 +924,241 @@ def test_falcon_model_adapter_asgi_file_iter(falcon_adapter_app):
     assert response.json == {"length": len(file_content), "other": "test"}
 
 
+@pytest.mark.parametrize("max_memory_size", [1 << 20, 100])
+def test_falcon_asgi_stream_wrapper_spooling(monkeypatch, max_memory_size):
+    monkeypatch.setattr(falcon_plugin, "SPOOL_BATCH_SIZE", 1000)
+    chunks = [bytes([i]) * 300 for i in range(10)]
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def spool():
+        loop = asyncio.get_running_loop()
+        calls = []
+        run_in_executor = loop.run_in_executor
+
+        def counted(executor, func, *args):
+            calls.append(func)
+            return run_in_executor(executor, func, *args)
+
+        monkeypatch.setattr(loop, "run_in_executor", counted)
+        wrapper = await AsyncStreamWrapper.from_stream(stream(), max_memory_size)
+        executor_calls = len(calls)
+        data = b"".join([chunk async for chunk in wrapper])
+        return wrapper, data, executor_calls
+
+    wrapper, data, executor_calls = asyncio.run(spool())
+    assert data == b"".join(chunks)
+    assert wrapper.size == 3000
+    if max_memory_size > 3000:
+        assert not wrapper.on_disk
+        assert executor_calls == 0
+    else:
+        assert wrapper.on_disk
+        # two full batches and the rest
+        assert executor_calls == 3
+
+
+@pytest.mark.parametrize("backend", [FALCON_BACKEND, FALCON_ASGI_BACKEND])
+def test_falcon_projected_headers_and_cookies(backend):
+    spec = SpecTree(backend)
+
+    class ItemView:
+        @spec.validate(headers=NamePayload, cookies=Cookies)
+        def on_get(self, req, resp):
+            resp.media = [req.context.headers.name, req.context.cookies.pub]
+
+    class AsyncItemView:
+        @spec.validate(headers=NamePayload, cookies=Cookies)
+        async def on_get(self, req, resp):
+            resp.media = [req.context.headers.name, req.context.cookies.pub]
+
+    for plan in spec._plans:
+        assert plan.header_keys == {"name"}
+        assert plan.cookie_keys == {"pub"}
+
+    app = backend_app(backend)
+    app.add_route(
+        "/items", AsyncItemView() if backend == FALCON_ASGI_BACKEND else ItemView()
+    )
+    client = falcon_testing.TestClient(app)
+    # falcon header names are upper case, the lower case field still matches
+    response = client.simulate_get(
+        "/items",
+        headers={"Name": "demo", "X-Other": "ignored"},
+        cookies={"pub": "abc", "other": "ignored"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == ["demo", "abc"]
+
+
+@pytest.mark.parametrize("backend", [FALCON_BACKEND, FALCON_ASGI_BACKEND])
+def test_falcon_lazy_form_files(backend):
+    spec = SpecTree(backend, lazy_form_files=True)
+
+    class FileUploadView:
+        @spec.validate(form=FormPayload)
+        def on_post(self, req, resp):
+            form = req.context.form
+            resp.media = {
+                "file": form.file.stream.read().decode(),
+                "other": form.other.decode(),
+                "rest": {
+                    part.name: part.get_data().decode()
+                    for part in req.context.form_parts
+                },
+            }
+
+    class AsyncFileUploadView:
+        @spec.validate(form=FormPayload)
+        async def on_post(self, req, resp):
+            form = req.context.form
+            file_content = b""
+            async for chunk in form.file.stream:
+                file_content += chunk
+            rest = {}
+            async for part in req.context.form_parts:
+                rest[part.name] = (await part.get_data()).decode()
+            resp.media = {
+                "file": file_content.decode(),
+                "other": form.other.decode(),
+                "rest": rest,
+            }
+
+    app = backend_app(backend)
+    app.add_route(
+        "/file_upload",
+        AsyncFileUploadView() if backend == FALCON_ASGI_BACKEND else FileUploadView(),
+    )
+    client = falcon_testing.TestClient(app)
+    boundary = "xxx"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="other"\r\n\r\n'
+        "test\r\n"
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="test.txt"\r\n'
+        "Content-Type: text/plain\r\n\r\n"
+        "abcdef\r\n"
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="note"\r\n\r\n'
+        "after the file\r\n"
+        f"--{boundary}--\r\n"
+    )
+    response = client.simulate_post(
+        "/file_upload",
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        body=body.encode(),
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {
+        "file": "abcdef",
+        "other": "test",
+        "rest": {"note": "after the file"},
+    }
+
+
+@dataclass
+class TwoFilesForm:
+    first: Any
+    second: Any
+    note: Any
+
+
+def multipart_body(boundary: str, *parts: tuple[str, bool]) -> bytes:
+    """the (name, is_file) parts, the value of each is its name"""
+    body = ""
+    for name, is_file in parts:
+        filename = f'; filename="{name}.txt"' if is_file else ""
+        body += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"{filename}\r\n\r\n'
+            f"{name}\r\n"
+        )
+    return f"{body}--{boundary}--\r\n".encode()
+
+
+@pytest.mark.parametrize("backend", [FALCON_BACKEND, FALCON_ASGI_BACKEND])
+def test_falcon_lazy_form_files_before_other_fields(backend):
+    spec = SpecTree(backend, lazy_form_files=True)
+
+    def spooled(form) -> list[str]:
+        return [
+            name
+            for name in ("first", "second")
+            if isinstance(getattr(form, name).stream, StreamWrapper)
+        ]
+
+    class FileUploadView:
+        @spec.validate(form=TwoFilesForm)
+        def on_post(self, req, resp):
+            form = req.context.form
+            resp.media = {
+                "files": [
+                    form.first.stream.read().decode(),
+                    form.second.stream.read().decode(),
+                ],
+                "note": form.note.decode(),
+                "spooled": spooled(form),
+            }
+
+    class AsyncFileUploadView:
+        @spec.validate(form=TwoFilesForm)
+        async def on_post(self, req, resp):
+            form = req.context.form
+            files = []
+            for part in (form.first, form.second):
+                content = b""
+                async for chunk in part.stream:
+                    content += chunk
+                files.append(content.decode())
+            resp.media = {
+                "files": files,
+                "note": form.note.decode(),
+                "spooled": spooled(form),
+            }
+
+    app = backend_app(backend)
+    app.add_route(
+        "/file_upload",
+        AsyncFileUploadView() if backend == FALCON_ASGI_BACKEND else FileUploadView(),
+    )
+    client = falcon_testing.TestClient(app)
+    headers = {"Content-Type": "multipart/form-data; boundary=xxx"}
+
+    # the files are followed by a required field, both of them are spooled
+    body = multipart_body("xxx", ("first", True), ("second", True), ("note", False))
+    response = client.simulate_post("/file_upload", headers=headers, body=body)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {
+        "files": ["first", "second"],
+        "note": "note",
+        "spooled": ["first", "second"],
+    }
+
+    # only the last field of the form is left unread
+    body = multipart_body("xxx", ("note", False), ("first", True), ("second", True))
+    response = client.simulate_post("/file_upload", headers=headers, body=body)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["files"] == ["first", "second"]
+    assert response.json["spooled"] == ["first"]
+
+
+@pytest.mark.parametrize("size", [0, 10, (1 << 20) + 1])
+def test_falcon_stream_wrapper_getbuffer(size):
+    data = b"x" * size
+    wrapper = StreamWrapper(falcon.util.BufferedReader(io.BytesIO(data).read, size))
+    view = wrapper.getbuffer()
+    assert view == data
+    assert wrapper.getbuffer() == data
+    view.release()
+    wrapper.exhaust()
+    # the file is unmapped
+    assert wrapper._mmap is None
+    wrapper.close()
+
+
 @pytest.mark.parametrize("method", ["GET", "POST"])
 def test_falcon_model_adapter_custom_serializer(falcon_adapter_app, method):
     response = falcon_adapter_app.client.simulate_request(
@@ -1053,6 +1296,67 @@ def test_falcon_model_adapter_doc_pages(
     spec.register(app)
     client = falcon_testing.TestClient(app)
 
-    assert client.simulate_get("/apidoc/openapi.json").json == spec.spec
+    resp = client.simulate_get("/apidoc/openapi.json")
+    assert resp.json == spec.spec
+    assert (
+        client.simulate_get(
+            "/apidoc/openapi.json", headers={"If-None-Match": resp.headers["ETag"]}
+        ).status_code
+        == HTTPStatus.NOT_MODIFIED
+    )
+    resp = client.simulate_get(
+        "/apidoc/openapi.json", headers={"Accept-Encoding": "gzip"}
+    )
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(resp.content)) == spec.spec
     for doc_page in expected_doc_pages:
         assert client.simulate_get(f"/apidoc/{doc_page}").status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize("backend", FALCON_BACKEND_PARAMS)
+def test_falcon_max_body_size(model_case, backend):
+    view = backend_view(backend)
+    spec = SpecTree(backend, model_adapter=model_case.adapter, max_body_size=32)
+
+    class Items:
+        @spec.validate(json=model_case.get_model(Payload))
+        @view
+        def on_post(self, req, resp):
+            resp.media = {}
+
+    app = backend_app(backend)
+    app.add_route("/items", Items())
+    spec.register(app)
+    client = falcon_testing.TestClient(app)
+
+    response = client.simulate_post("/items", json={"name": "a" * 20, "limit": 1})
+    assert response.status_code == 422
+    assert response.json[0]["loc"] == ["body"]
+    response = client.simulate_post("/items", json={"name": "a", "limit": 1})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("backend", [FALCON_BACKEND, FALCON_ASGI_BACKEND])
+def test_falcon_plain_payload_uses_json_handler(backend):
+    spec = SpecTree(backend)
+
+    class ItemsView:
+        @spec.validate()
+        def on_get(self, req, resp):
+            resp.media = {"date": datetime(2025, 1, 1)}
+
+    class AsyncItemsView:
+        @spec.validate()
+        async def on_get(self, req, resp):
+            resp.media = {"date": datetime(2025, 1, 1)}
+
+    app = backend_app(backend)
+    json_handler = falcon.media.JSONHandler(dumps=partial(json.dumps, default=str))
+    app.resp_options.media_handlers[falcon.MEDIA_JSON] = json_handler
+    app.add_route(
+        "/items", AsyncItemsView() if backend == FALCON_ASGI_BACKEND else ItemsView()
+    )
+    response = falcon_testing.TestClient(app).simulate_get("/items")
+    assert response.status_code == HTTPStatus.OK
+    # the `default` of the media handler is kept
+    assert response.json == {"date": "2025-01-01 00:00:00"}
@@ -1,7 +1,9 @@
+import io
 from random import randint
 
 import pytest
 from flask import Flask, jsonify, make_response, request
+from pydantic import BaseModel
 
 from spectree import Response, SpecTree
 from tests.common import (
@@ -507,3 +509,44 @@ with app_global_secure.app_context():
     _ = api_global_secure.spec
 
 api_global_secure.register(app_global_secure)
+
+
+def test_flask_max_body_size():
+    app = Flask(__name__)
+    api = SpecTree("flask", max_body_size=16)
+
+    class Item(BaseModel):
+        name: str
+
+    @app.route("/items", methods=["POST"])
+    @api.validate(json=Item, resp=Response(HTTP_200=None))
+    def create_item():
+        return make_response("", 200)
+
+    @app.route("/large_items", methods=["POST"])
+    @api.validate(json=Item, max_body_size=1024, validation_error_status=400)
+    def create_large_item():
+        return make_response("", 200)
+
+    api.register(app)
+    client = app.test_client()
+    body = b'{"name": "' + b"a" * 20 + b'"}'
+    resp = client.post("/items", data=body, content_type="application/json")
+    assert resp.status_code == 422
+    assert resp.json[0]["loc"] == ["body"]
+    assert client.post("/large_items", json={"name": "a" * 20}).status_code == 200
+    assert client.post("/items", json={"name": "a"}).status_code == 200
+
+    # the length is unknown, the body is limited while it's read
+    resp = client.post(
+        "/items",
+        input_stream=io.BytesIO(body),
+        content_type="application/json",
+        environ_overrides={"wsgi.input_terminated": True},
+    )
+    assert resp.status_code == 422
+
+    with app.app_context():
+        paths = api.spec["paths"]
+    assert paths["/items"]["post"]["requestBody"]["x-max-body-size"] == 16
+    assert paths["/large_items"]["post"]["requestBody"]["x-max-body-size"] == 1024
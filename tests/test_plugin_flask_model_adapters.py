@@ -1,15 +1,16 @@
 from dataclasses import dataclass
+from datetime import datetime
 from http import HTTPStatus
 from typing import Any
 
 import pytest
-from flask import Blueprint, Flask
+from flask import Blueprint, Flask, request
 from flask.testing import FlaskClient
 from flask.views import MethodView
 
 from spectree import Response, SpecTree
 from spectree.utils import get_model_key
-from tests.common_dataclass import Item, LimitQuery, NamePayload
+from tests.common_dataclass import Cookies, Item, LimitQuery, NamePayload
 
 
 @dataclass(frozen=True)
@@ -141,3 +142,102 @@ def test_flask_model_adapter_response_models_and_spec(model_case, flask_adapter_
 
         assert ok_schema["$ref"] == expected_response_ref
         assert validation_schema["$ref"] == validation_ref
+
+
+@pytest.mark.parametrize("raw_json_body", [True, False])
+def test_flask_model_adapter_json_body(model_case, raw_json_body):
+    spec = SpecTree(
+        "flask", model_adapter=model_case.adapter, raw_json_body=raw_json_body
+    )
+    app = Flask(__name__)
+
+    @app.route("/items", methods=["POST"])
+    @spec.validate(json=model_case.get_model(NamePayload))
+    def create_item():
+        return {"name": request.context.json.name}
+
+    spec.register(app)
+    client = app.test_client()
+
+    response = client.post("/items", json={"name": "demo"})
+    assert response.status_code == HTTPStatus.OK
+    assert response.get_json() == {"name": "demo"}
+
+    response = client.post("/items", data='{"name": ', content_type="application/json")
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_flask_model_adapter_headers_and_cookies(model_case):
+    spec = SpecTree("flask", model_adapter=model_case.adapter)
+    app = Flask(__name__)
+
+    @app.route("/items")
+    @spec.validate(
+        headers=model_case.get_model(NamePayload),
+        cookies=model_case.get_model(Cookies),
+    )
+    def get_item():
+        return {
+            "name": request.context.headers.name,
+            "pub": request.context.cookies.pub,
+        }
+
+    spec.register(app)
+    client = app.test_client()
+    client.set_cookie("pub", "abc")
+    client.set_cookie("other", "ignored")
+
+    # header names declared by the model are matched case-insensitively
+    response = client.get("/items", headers={"Name": "demo", "X-Other": "ignored"})
+    assert response.status_code == HTTPStatus.OK
+    assert response.get_json() == {"name": "demo", "pub": "abc"}
+
+
+def test_flask_model_adapter_response_validation_rate(model_case):
+    spec = SpecTree("flask", model_adapter=model_case.adapter)
+    app = Flask(__name__)
+
+    @app.route("/items")
+    @spec.validate(
+        resp=Response(HTTP_200=model_case.get_model(Item)),
+        response_validation_rate=0,
+    )
+    def get_item():
+        return {"name": "demo"}
+
+    @app.route("/other-items")
+    @spec.validate(resp=Response(HTTP_200=model_case.get_model(Item)))
+    def get_other_item():
+        return {"name": "demo"}
+
+    spec.register(app)
+    client = app.test_client()
+
+    assert client.get("/items").status_code == HTTPStatus.OK
+    assert client.get("/other-items").status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+
+    # the global setting doesn't override the endpoint setting
+    spec.set_response_validation_rate(0)
+    assert client.get("/other-items").status_code == HTTPStatus.OK
+
+    spec.set_response_validation_rate(1, endpoint=get_item)
+    assert client.get("/items").status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+
+    with pytest.raises(ValueError):
+        spec.set_response_validation_rate(2)
+
+
+def test_flask_plain_payload_uses_json_provider(model_case):
+    spec = SpecTree("flask", model_adapter=model_case.adapter)
+    app = Flask(__name__)
+
+    @app.route("/items")
+    @spec.validate(query=model_case.get_model(LimitQuery))
+    def get_items():
+        return {"date": datetime(2025, 1, 1), "limit": request.context.query.limit}
+
+    spec.register(app)
+    response = app.test_client().get("/items?limit=1")
+    assert response.status_code == HTTPStatus.OK
+    # Flask's JSON provider formats datetime as an HTTP date
+    assert response.get_json() == {"date": "Wed, 01 Jan 2025 00:00:00 GMT", "limit": 1}
@@ -1,7 +1,9 @@
 # mypy: disable-error-code=valid-type
+import asyncio
 from random import randint
 
 import pytest
+from pydantic import BaseModel, Field
 from quart import Quart, jsonify, request
 
 from spectree import Response, SpecTree
@@ -13,7 +15,15 @@ from tests.common import (
     validation_error_handler as before_handler,
     validation_pass_handler as after_handler,
 )
-from tests.common_dataclass import Cookies, Order, Payload, Query, Resp, RespObject
+from tests.common_dataclass import (
+    Cookies,
+    Form,
+    Order,
+    Payload,
+    Query,
+    Resp,
+    RespObject,
+)
 from tests.common_pydantic import (
     CustomError,
     Headers,
@@ -158,6 +168,12 @@ async def no_response():
     return {}
 
 
+@app.route("/api/form", methods=["POST"])
+@api.validate(form=pydantic_case.get_model(Form))
+async def form():
+    return {"name": request.context.form.name, "limit": request.context.form.limit}
+
+
 @app.route("/api/list_json", methods=["POST"])
 @api.validate(
     json=ListPayload,
@@ -406,3 +422,90 @@ async def global_security_or():
 #     api_global_secure.spec
 
 api_global_secure.register(app_global_secure)
+
+
+async def test_quart_max_body_size():
+    limited_api = SpecTree("quart", max_body_size=32)
+    limited_app = Quart(__name__)
+
+    @limited_app.route("/items", methods=["POST"])
+    @limited_api.validate(json=pydantic_case.get_model(Payload))
+    async def create_item():
+        return jsonify(request.context.json.model_dump())
+
+    limited_api.register(limited_app)
+    client = limited_app.test_client()
+    resp = await client.post("/items", json={"name": "a", "limit": 1})
+    assert resp.status_code == 200
+    resp = await client.post("/items", json={"name": "a" * 32, "limit": 1})
+    assert resp.status_code == 422
+    assert (await resp.get_json())[0]["loc"] == ["body"]
+
+
+async def test_quart_aliased_list_query():
+    class TagQuery(BaseModel):
+        tags: list[str] = Field(alias="tag")
+
+    tag_api = SpecTree("quart")
+    tag_app = Quart(__name__)
+
+    @tag_app.route("/items", methods=["GET"])
+    @tag_api.validate(query=TagQuery)
+    async def list_items():
+        return jsonify(request.context.query.tags)
+
+    tag_api.register(tag_app)
+    resp = await tag_app.test_client().get("/items?tag=a&other=b")
+    assert resp.status_code == 200
+    assert await resp.get_json() == ["a"]
+
+
+async def test_quart_projected_headers_and_cookies():
+    class NameHeaders(BaseModel):
+        name: str
+
+    projected_api = SpecTree("quart")
+    projected_app = Quart(__name__)
+
+    @projected_app.route("/items", methods=["GET"])
+    @projected_api.validate(headers=NameHeaders, cookies=Cookies)
+    async def get_item():
+        return jsonify([request.context.headers.name, request.context.cookies.pub])
+
+    (plan,) = projected_api._plans
+    assert plan.header_keys == {"name"}
+    assert plan.cookie_keys == {"pub"}
+
+    projected_api.register(projected_app)
+    # the header names are matched case-insensitively
+    resp = await projected_app.test_client().get(
+        "/items",
+        headers={"NAME": "demo", "X-Other": "ignored", "Cookie": "pub=abc; other=1"},
+    )
+    assert resp.status_code == 200
+    assert await resp.get_json() == ["demo", "abc"]
+
+
+def test_quart_warmup_in_running_loop():
+    api = SpecTree("quart")
+    warm_app = Quart(__name__)
+
+    @warm_app.route("/ping")
+    @api.validate(resp=Response(HTTP_200=StrDict))
+    async def ping():
+        return jsonify(msg="pong")
+
+    api.register(warm_app)
+
+    @warm_app.before_serving
+    async def warmup():
+        api.warmup()
+
+    async def serve():
+        async with warm_app.test_app():
+            pass
+        return api.backend.export_spec()
+
+    spec = asyncio.run(serve())
+    assert "/ping" in spec["paths"]
+    assert api.backend._encoded_spec is not None
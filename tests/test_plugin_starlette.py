@@ -2,6 +2,7 @@ import io
 from random import randint
 
 import pytest
+from pydantic import BaseModel, Field
 from starlette.applications import Starlette
 from starlette.endpoints import HTTPEndpoint
 from starlette.responses import JSONResponse, Response as StarletteResponse
@@ -440,8 +441,14 @@ def test_validation_error_response_status_code(
 def test_starlette_doc(test_client_and_api, expected_doc_pages):
     client, api = test_client_and_api
 
-    resp = client.get("/apidoc/openapi.json")
+    resp = client.get("/apidoc/openapi.json", headers={"Accept-Encoding": "gzip"})
     assert resp.json() == api.spec
+    assert resp.headers["Content-Encoding"] == "gzip"
+
+    resp = client.get(
+        "/apidoc/openapi.json", headers={"If-None-Match": resp.headers["ETag"]}
+    )
+    assert resp.status_code == 304
 
     for doc_page in expected_doc_pages:
         resp = client.get(f"/apidoc/{doc_page}")
@@ -516,3 +523,85 @@ def test_starlette_forced_serializer(client):
     resp = client.get("/api/force_serialize")
     assert resp.status_code == 200
     assert resp.json() == {"name": "starlette", "score": [1, 2, 3]}
+
+
+def test_starlette_max_body_size():
+    limited_api = SpecTree("starlette", max_body_size=32)
+
+    @limited_api.validate(json=pydantic_case.get_model(Payload))
+    async def create_item(request):
+        return JSONResponse(request.context.json.model_dump())
+
+    limited_app = Starlette(routes=[Route("/items", create_item, methods=["POST"])])
+    limited_api.register(limited_app)
+    body = b'{"name": "' + b"a" * 32 + b'", "limit": 1}'
+
+    with TestClient(limited_app) as limited_client:
+        resp = limited_client.post("/items", json={"name": "a", "limit": 1})
+        assert resp.status_code == 200
+        resp = limited_client.post(
+            "/items", content=body, headers={"Content-Type": "application/json"}
+        )
+        assert resp.status_code == 422
+        assert resp.json()[0]["loc"] == ["body"]
+
+        # the length is unknown, the body is limited while it's read
+        resp = limited_client.post(
+            "/items",
+            content=iter([body[:16], body[16:]]),
+            headers={"Content-Type": "application/json"},
+        )
+        assert resp.status_code == 422
+        resp = limited_client.post(
+            "/items",
+            content=iter([b'{"name": "a", ', b'"limit": 1}']),
+            headers={"Content-Type": "application/json"},
+        )
+        assert resp.status_code == 200
+        assert resp.json() == {"name": "a", "limit": 1}
+
+
+def test_starlette_aliased_list_query_and_form():
+    class TagQuery(BaseModel):
+        tags: list[str] = Field(alias="tag")
+
+    tag_api = SpecTree("starlette")
+
+    @tag_api.validate(query=TagQuery, form=TagQuery)
+    async def create_item(request):
+        return JSONResponse([request.context.query.tags, request.context.form.tags])
+
+    tag_app = Starlette(routes=[Route("/items", create_item, methods=["POST"])])
+    tag_api.register(tag_app)
+    with TestClient(tag_app) as tag_client:
+        resp = tag_client.post("/items?tag=a", data={"tag": "b"})
+        assert resp.status_code == 200
+        assert resp.json() == [["a"], ["b"]]
+
+
+def test_starlette_projected_headers_and_cookies():
+    class NameHeaders(BaseModel):
+        name: str
+
+    projected_api = SpecTree("starlette")
+
+    @projected_api.validate(headers=NameHeaders, cookies=Cookies)
+    async def get_item(request):
+        return JSONResponse([request.context.headers.name, request.context.cookies.pub])
+
+    (plan,) = projected_api._plans
+    assert plan.header_keys == {"name"}
+    assert plan.cookie_keys == {"pub"}
+
+    projected_app = Starlette(routes=[Route("/items", get_item)])
+    projected_api.register(projected_app)
+    with TestClient(
+        projected_app, cookies={"pub": "abc", "other": "ignored"}
+    ) as projected_client:
+        # the header names are matched case-insensitively
+        resp = projected_client.get(
+            "/items",
+            headers={"NAME": "demo", "X-Other": "ignored"},
+        )
+        assert resp.status_code == 200
+        assert resp.json() == ["demo", "abc"]
@@ -5,6 +5,7 @@ import pytest
 from pydantic import BaseModel
 
 from spectree.model_adapter import get_pydantic_model_adapter
+from spectree.model_adapter.pydantic_adapter import PydanticModelAdapter
 
 ADAPTER = get_pydantic_model_adapter()
 
@@ -46,3 +47,18 @@ class RootModelLookalike:
 )
 def test_is_base_model_instance(value, expected):
     assert ADAPTER.is_model_instance(value, BaseModel) is expected
+
+
+def test_dump_json_does_not_validate(monkeypatch):
+    adapter = PydanticModelAdapter()
+
+    def validate_obj(*_args):
+        raise AssertionError("serialization should not validate the value")
+
+    monkeypatch.setattr(adapter, "validate_obj", validate_obj)
+
+    assert (
+        adapter.dump_json(RootModelLookalike(__root__=["a"])) == b'{"__root__":["a"]}'
+    )
+    assert adapter.dump_json([SimpleModel(user_id=1)]) == b'[{"user_id":1}]'
+    assert adapter.dump_json(SimpleModel(user_id=1)) == b'{"user_id":1}'
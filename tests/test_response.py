@@ -74,6 +74,18 @@ def test_init_response(model_case):
     assert not Response().has_model()
 
 
+def test_response_status_models(model_case):
+    simple_model = model_case.get_model(SimpleModel)
+    resp = Response("HTTP_200", HTTP_201=simple_model)
+    resp.bind_model_adapter(model_case.adapter)
+    resp.add_model(422, model_case.adapter.validation_error)
+
+    assert resp.status_models() == {
+        201: simple_model,
+        422: model_case.adapter.validation_error,
+    }
+
+
 def test_response_add_model(model_case):
     resp = Response()
     resp.bind_model_adapter(model_case.adapter)
@@ -1,16 +1,17 @@
 import pytest
 from falcon import App as FalconApp
 from flask import Flask
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field, create_model
 from starlette.applications import Starlette
 
-from spectree import Response
+from spectree import Response, get_msgspec_model_adapter, set_cache_maxsize
 from spectree.config import Configuration
 from spectree.models import Server
 from spectree.plugins.flask_plugin import FlaskPlugin
 from spectree.spec import SpecTree
-from spectree.utils import get_model_key
+from spectree.utils import cached_type_hints, get_model_key
 from tests.common import get_paths
+from tests.common_dataclass import Payload, QueryList, Resp
 
 
 def backend_app():
@@ -306,3 +307,357 @@ def test_custom_model_naming_strategies_are_used_in_refs_and_components():
     }
     assert "Child" not in schemas
     assert "child" in schemas
+
+
+def test_spec_is_generated_again_after_invalidation():
+    class Child(BaseModel):
+        value: int
+
+    class Payload(BaseModel):
+        child: Child
+
+    api = SpecTree("flask")
+    app = Flask(__name__)
+
+    @app.route("/foo", methods=["POST"])
+    @api.validate(json=Payload)
+    def foo():
+        pass
+
+    api.register(app)
+    with app.app_context():
+        spec = api.spec
+        assert api.spec is spec
+        foo_operation = spec["paths"]["/foo"]["post"]
+
+        @app.route("/bar")
+        @api.validate(resp=Response(HTTP_200=Child))
+        def bar():
+            pass
+
+        spec = api.spec
+        assert get_paths(spec) == ["/bar", "/foo"]
+        # the operations of the unchanged routes are reused
+        assert spec["paths"]["/foo"]["post"] is foo_operation
+        # the nested models lifted from `$defs` are still there
+        assert get_model_key(Child) in spec["components"]["schemas"]
+
+        foo.tags = ["changed"]
+        api.invalidate_spec(foo)
+        spec = api.spec
+        assert spec["paths"]["/foo"]["post"] is not foo_operation
+        assert spec["paths"]["/foo"]["post"]["tags"] == ["changed"]
+        assert spec["tags"] == [{"name": "changed"}]
+
+
+def test_spec_follows_response_and_model_changes():
+    class ChildA(BaseModel):
+        value: int
+
+    class ChildB(BaseModel):
+        value: str
+
+    def make_payload(child):
+        return create_model("Payload", child=(child, ...))
+
+    api = SpecTree("flask", naming_strategy=lambda model: model.__name__)
+    app = Flask(__name__)
+    resp = Response(HTTP_200=ChildA)
+
+    @app.route("/foo", methods=["POST"])
+    @api.validate(json=make_payload(ChildA), resp=resp)
+    def foo():
+        pass
+
+    api.register(app)
+    with app.app_context():
+        spec = api.spec
+        assert "Payload.ChildA" in spec["components"]["schemas"]
+        foo_operation = spec["paths"]["/foo"]["post"]
+
+        # the spec is invalidated and the operation is parsed again
+        resp.add_model(201, ChildB)
+        spec = api.spec
+        assert spec["paths"]["/foo"]["post"] is not foo_operation
+        assert "201" in spec["paths"]["/foo"]["post"]["responses"]
+        assert "ChildB" in spec["components"]["schemas"]
+
+        # the model of the same name is replaced with its nested schemas
+        @app.route("/bar", methods=["POST"])
+        @api.validate(json=make_payload(ChildB))
+        def bar():
+            pass
+
+        schemas = api.spec["components"]["schemas"]
+        assert "Payload.ChildB" in schemas
+        assert "Payload.ChildA" not in schemas
+
+
+def test_spec_keeps_request_schema_of_response_model(monkeypatch):
+    class Item(BaseModel):
+        a: int
+
+        @computed_field  # type: ignore[prop-decorator]
+        @property
+        def b(self) -> int:
+            return self.a
+
+    api = SpecTree("flask", naming_strategy=lambda model: model.__name__)
+    app = Flask(__name__)
+
+    @app.route("/items/<int:item_id>")
+    @api.validate(resp=Response(HTTP_200=Item))
+    def get_item(item_id: int):
+        pass
+
+    @app.route("/items", methods=["POST"])
+    @api.validate(json=Item)
+    def create_item():
+        pass
+
+    api.register(app)
+    built = []
+    json_schema = api.model_adapter.json_schema
+    monkeypatch.setattr(
+        api.model_adapter,
+        "json_schema",
+        lambda model, **kwargs: built.append(model) or json_schema(model, **kwargs),
+    )
+    with app.app_context():
+        # the validation schema of the request body, the computed field isn't read
+        assert api.spec["components"]["schemas"]["Item"]["required"] == ["a"]
+        assert built.count(Item) == 1
+
+        # the schema isn't built again
+        api.invalidate_spec()
+        assert api.spec["components"]["schemas"]["Item"]["required"] == ["a"]
+    assert built.count(Item) == 1
+
+
+def test_register_another_app_invalidates_spec():
+    api = SpecTree("flask")
+    first, second = Flask("first"), Flask("second")
+
+    @first.route("/foo")
+    def foo():
+        pass
+
+    @second.route("/bar")
+    def bar():
+        pass
+
+    api.register(first)
+    with first.app_context():
+        assert get_paths(api.spec) == ["/foo"]
+
+    api.register(second)
+    with second.app_context():
+        assert get_paths(api.spec) == ["/bar"]
+
+
+def test_model_schemas_are_generated_with_the_spec(monkeypatch):
+    class Child(BaseModel):
+        value: int
+
+    class Payload(BaseModel):
+        child: Child
+
+    api = SpecTree("flask")
+    app = Flask(__name__)
+    json_schema = api.model_adapter.json_schema
+    generated = []
+
+    def record_json_schema(model, **kwargs):
+        generated.append(model)
+        return json_schema(model, **kwargs)
+
+    monkeypatch.setattr(api.model_adapter, "json_schema", record_json_schema)
+
+    @app.route("/foo", methods=["POST"])
+    @api.validate(json=Payload, resp=Response(HTTP_200=Child))
+    def foo():
+        pass
+
+    api.register(app)
+    assert generated == []
+
+    with app.app_context():
+        spec = api.spec
+    assert set(generated) == {Payload, Child, api.model_adapter.validation_error}
+    assert spec["paths"]["/foo"]["post"]["requestBody"]["content"]["application/json"][
+        "schema"
+    ] == {"$ref": f"#/components/schemas/{get_model_key(Payload)}"}
+
+    @app.route("/bar")
+    @api.validate(resp=Response(HTTP_200=Child))
+    def bar():
+        pass
+
+    generated.clear()
+    with app.app_context():
+        assert get_paths(api.spec) == ["/bar", "/foo"]
+    # the schemas generated before are reused
+    assert generated == []
+
+
+def test_dedup_nested_schemas():
+    class Country(BaseModel):
+        code: str
+
+    class Address(BaseModel):
+        country: Country
+
+    class Node(BaseModel):
+        children: list["Node"]
+
+    class User(BaseModel):
+        address: Address
+        node: Node
+
+    class Shop(BaseModel):
+        address: Address
+
+    def other_address():
+        class Address(BaseModel):
+            street: str
+
+        class Order(BaseModel):
+            address: Address
+
+        return Order
+
+    api = SpecTree("flask", dedup_nested_schemas=True)
+    app = Flask(__name__)
+
+    @app.route("/users", methods=["POST"])
+    @api.validate(json=User, resp=Response(HTTP_200=Shop))
+    def users():
+        pass
+
+    @app.route("/orders", methods=["POST"])
+    @api.validate(json=other_address())
+    def orders():
+        pass
+
+    api.register(app)
+    with app.app_context():
+        schemas = api.spec["components"]["schemas"]
+
+    assert schemas["Address"] == {
+        "properties": {"country": {"$ref": "#/components/schemas/Country"}},
+        "required": ["country"],
+        "title": "Address",
+        "type": "object",
+    }
+    assert schemas["Node"]["properties"]["children"]["items"] == {
+        "$ref": "#/components/schemas/Node"
+    }
+    assert schemas[get_model_key(User)]["properties"]["address"] == {
+        "$ref": "#/components/schemas/Address"
+    }
+    assert schemas[get_model_key(Shop)]["properties"]["address"] == {
+        "$ref": "#/components/schemas/Address"
+    }
+    # a different schema with the same name
+    other_ref = schemas[get_model_key(other_address())]["properties"]["address"]
+    other_name = other_ref["$ref"].removeprefix("#/components/schemas/")
+    assert other_name.startswith("Address.")
+    assert schemas[other_name]["properties"] == {
+        "street": {"title": "Street", "type": "string"}
+    }
+    # no copies prefixed by the parent names
+    assert sorted(schemas) == sorted(
+        [
+            get_model_key(model)
+            for model in (
+                User,
+                Shop,
+                other_address(),
+                api.model_adapter.validation_error,
+            )
+        ]
+        + ["Address", "Country", "Node", other_name, "ValidationErrorElement"]
+    )
+
+
+def test_warmup(model_case, monkeypatch):
+    api = SpecTree("flask", model_adapter=model_case.adapter)
+    app = Flask(__name__)
+    query = model_case.get_model(QueryList)
+    payload = model_case.get_model(Payload)
+    resp = model_case.get_model(Resp)
+    warmed = []
+    warmup = api.model_adapter.warmup
+    monkeypatch.setattr(
+        api.model_adapter, "warmup", lambda model: warmed.append(model) or warmup(model)
+    )
+
+    @app.route("/foo", methods=["POST"])
+    @api.validate(query=query, json=payload, resp=Response(HTTP_200=resp))
+    def foo():
+        pass
+
+    api.warmup()
+    assert warmed == [query, payload, resp, api.model_adapter.validation_error]
+    # not registered yet
+    assert api._spec is None
+
+    api.register(app)
+    api.warmup()
+    assert api._spec is not None
+    encoded = api.backend._encoded_spec
+    assert encoded._gzip is not None
+
+    with app.test_client() as client:
+        response = client.get(
+            "/apidoc/openapi.json", headers={"Accept-Encoding": "gzip"}
+        )
+    assert response.data == encoded.gzip
+
+
+def test_cache_stats(model_case):
+    api = SpecTree("starlette", model_adapter=model_case.adapter)
+    stats = api.cache_stats()
+    assert "type_hints" in stats
+    assert "multidict_plans" in stats
+    assert "starlette_pydantic_response_model" in stats
+    if model_case.name == "pydantic":
+        assert "pydantic_type_adapters" in stats
+
+    hits = stats["type_hints"].hits
+    cached_type_hints(QueryList)
+    cached_type_hints(QueryList)
+    assert api.cache_stats()["type_hints"].hits >= hits + 1
+
+
+def test_cache_maxsize():
+    api = SpecTree("starlette")
+    set_cache_maxsize(4)
+    try:
+        assert all(stats.maxsize == 4 for stats in api.cache_stats().values())
+        assert all(stats.size <= 4 for stats in api.cache_stats().values())
+        # the caches created later take the bound
+        other = SpecTree("flask", model_adapter=get_msgspec_model_adapter())
+        assert all(stats.maxsize == 4 for stats in other.cache_stats().values())
+    finally:
+        set_cache_maxsize(None)
+    assert all(stats.maxsize is None for stats in api.cache_stats().values())
+
+
+def test_plan_reads_models_added_to_response(model_case):
+    api = SpecTree("flask", model_adapter=model_case.adapter)
+    resp = Response(HTTP_200=model_case.get_model(Resp))
+
+    @api.validate(resp=resp)
+    def create():
+        pass
+
+    @api.validate(resp=resp)
+    def update():
+        pass
+
+    payload = model_case.get_model(Payload)
+    resp.add_model(201, payload)
+    for plan in api._plans:
+        assert plan.find_resp_model(201) is payload
+        assert plan.find_resp_model(201) is resp.find_model(201)
@@ -0,0 +1,83 @@
+import pytest
+from pydantic import BaseModel, Field, create_model
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from spectree import Response, SpecTree
+from spectree.spec_cache import Fingerprint, load_spec, store_spec
+
+
+class Child(BaseModel):
+    value: int
+
+
+def create_api(cache_dir, payload=None, doc="create an item", child=Child):
+    api = SpecTree("starlette", spec_cache_dir=str(cache_dir))
+    payload = payload or create_model("Payload", child=(child, ...))
+
+    @api.validate(json=payload, resp=Response(HTTP_200=child))
+    async def create_item(request):
+        pass
+
+    create_item.__doc__ = doc
+    api.register(Starlette(routes=[Route("/items", create_item, methods=["POST"])]))
+    return api
+
+
+def not_generated():
+    raise AssertionError("the spec should be loaded from the cache")
+
+
+def test_spec_is_loaded_from_the_cache(tmp_path, monkeypatch):
+    spec = create_api(tmp_path).spec
+    assert len(list(tmp_path.glob("spectree-*.json"))) == 1
+
+    api = create_api(tmp_path)
+    monkeypatch.setattr(api, "_generate_spec", not_generated)
+    assert api.spec == spec
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"doc": "create another item"},
+        {"payload": create_model("Payload", child=(Child, Field(description="x")))},
+        {"child": create_model("Child", value=(str, ...))},
+        {"child": create_model("Child", value=(int, Field(gt=0)))},
+    ],
+    ids=["docstring", "field", "nested-type", "nested-constraint"],
+)
+def test_spec_is_generated_again_if_anything_changed(tmp_path, changes):
+    spec = create_api(tmp_path).spec
+    api = create_api(tmp_path, **changes)
+
+    assert api._spec_fingerprint() != create_api(tmp_path)._spec_fingerprint()
+    assert api.spec != spec
+    assert len(list(tmp_path.glob("spectree-*.json"))) == 2
+
+
+def test_fingerprint_ignores_object_addresses():
+    first, second = (
+        Fingerprint(SpecTree().model_adapter),
+        Fingerprint(SpecTree().model_adapter),
+    )
+    first.add(object())
+    second.add(object())
+    assert first.hexdigest() == second.hexdigest()
+
+
+def test_load_and_store_spec(tmp_path, caplog):
+    path = tmp_path / "cache" / "spec.json"
+    assert load_spec(str(path)) is None
+
+    store_spec(str(path), {"openapi": "3.1.0"})
+    assert load_spec(str(path)) == {"openapi": "3.1.0"}
+    assert [file.name for file in path.parent.iterdir()] == ["spec.json"]
+
+    path.write_text("{", encoding="utf-8")
+    assert load_spec(str(path)) is None
+    assert "failed to load the cached OpenAPI spec" in caplog.text
+
+    store_spec(str(path), {"invalid": object()})
+    assert "failed to store the OpenAPI spec" in caplog.text
+    assert list(path.parent.iterdir()) == [path]
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import threading
+
+import falcon
+import pytest
+from falcon import testing as falcon_testing
+from falcon.asgi import App as FalconASGIApp
+from flask import Flask
+from quart import Quart
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from spectree import Response, SpecTree
+from spectree.streaming import ResponseStream, frame, is_stream
+from tests.common_dataclass import Payload
+
+ITEMS = [{"name": "a", "limit": 1}, {"name": "b", "limit": 2}]
+INVALID_ITEMS = [{"name": "a", "limit": 1}, {"name": "b", "limit": "x"}, ITEMS[1]]
+
+
+def sync_items(threads: list) -> list:
+    """the items of a sync generator, `threads` gets the threads that iterate it"""
+
+    def items():
+        for item in ITEMS:
+            threads.append(threading.get_ident())
+            yield item
+
+    threads.append(threading.get_ident())
+    return items()
+
+
+def parse_ndjson(body: bytes) -> list:
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def parse_sse(body: bytes) -> list:
+    events = []
+    for message in body.decode().strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((fields.get("event"), json.loads(fields["data"])))
+    return events
+
+
+def test_frame():
+    assert frame("ndjson", b"{}") == b"{}\n"
+    assert frame("sse", b"{}") == b"data: {}\n\n"
+    assert frame("sse", b"[]", event="error") == b"event: error\ndata: []\n\n"
+
+
+def test_response_stream():
+    def encode(item):
+        if item < 0:
+            raise ValueError(item)
+        return str(item).encode()
+
+    stream = ResponseStream(
+        iter([1, 2, -1, 3]), "sse", encode, ValueError, lambda err: b"end"
+    )
+    assert stream.media_type == "text/event-stream"
+    assert list(stream) == [b"data: 1\n\n", b"data: 2\n\n", b"end"]
+
+    async def items():
+        for item in [1, -1]:
+            yield item
+
+    async def collect():
+        stream = ResponseStream(items(), "ndjson", encode, ValueError, lambda _: None)
+        assert is_stream(stream.__aiter__())
+        return [chunk async for chunk in stream]
+
+    assert asyncio.run(collect()) == [b"1\n"]
+
+
+def test_flask_stream():
+    app = Flask(__name__)
+    api = SpecTree("flask")
+
+    @app.route("/items")
+    @api.validate(resp=Response(HTTP_200=Payload), stream_format="ndjson")
+    def list_items():
+        return iter(ITEMS)
+
+    @app.route("/events")
+    @api.validate(resp=Response(HTTP_200=Payload), stream_format="sse")
+    def list_events():
+        return (item for item in INVALID_ITEMS)
+
+    api.register(app)
+    client = app.test_client()
+    resp = client.get("/items")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    assert parse_ndjson(resp.data) == ITEMS
+
+    resp = client.get("/events")
+    assert resp.mimetype == "text/event-stream"
+    events = parse_sse(resp.data)
+    assert events[0] == (None, ITEMS[0])
+    event, errors = events[1]
+    assert event == "error"
+    assert errors[0]["loc"] == ["limit"]
+    assert len(events) == 2
+
+    with app.app_context():
+        content = api.spec["paths"]["/items"]["get"]["responses"]["200"]["content"]
+    assert list(content) == ["application/x-ndjson"]
+
+
+def test_starlette_stream():
+    api = SpecTree("starlette")
+
+    @api.validate(resp=Response(HTTP_200=Payload), stream_format="ndjson")
+    async def list_items(request):
+        for item in INVALID_ITEMS:
+            yield item
+
+    threads: list = []
+
+    @api.validate(resp=Response(HTTP_200=Payload), stream_format="ndjson")
+    async def list_sync_items(request):
+        return sync_items(threads)
+
+    app = Starlette(
+        routes=[Route("/items", list_items), Route("/sync_items", list_sync_items)]
+    )
+    api.register(app)
+    with TestClient(app) as client:
+        resp = client.get("/items")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        # the stream stops at the invalid item
+        assert parse_ndjson(resp.content) == ITEMS[:1]
+
+        resp = client.get("/sync_items")
+        assert parse_ndjson(resp.content) == ITEMS
+    # the sync items aren't iterated on the event loop
+    loop_thread, *item_threads = threads
+    assert loop_thread not in item_threads
+
+
+def test_quart_stream():
+    api = SpecTree("quart")
+    app = Quart(__name__)
+
+    @app.route("/events")
+    @api.validate(resp=Response(HTTP_200=Payload), stream_format="sse")
+    async def list_events():
+        async def events():
+            for item in ITEMS:
+                yield item
+
+        return events()
+
+    threads: list = []
+
+    @app.route("/sync_events")
+    @api.validate(resp=Response(HTTP_200=Payload), stream_format="sse")
+    async def list_sync_events():
+        return sync_items(threads)
+
+    api.register(app)
+
+    async def get(path):
+        resp = await app.test_client().get(path)
+        return resp.mimetype, await resp.get_data()
+
+    mimetype, body = asyncio.run(get("/events"))
+    assert mimetype == "text/event-stream"
+    assert parse_sse(body) == [(None, item) for item in ITEMS]
+
+    _, body = asyncio.run(get("/sync_events"))
+    assert parse_sse(body) == [(None, item) for item in ITEMS]
+    loop_thread, *item_threads = threads
+    assert loop_thread not in item_threads
+
+
+@pytest.mark.parametrize("asgi", [False, True])
+def test_falcon_stream(asgi):
+    api = SpecTree("falcon-asgi" if asgi else "falcon")
+
+    class Items:
+        @api.validate(resp=Response(HTTP_200=Payload), stream_format="ndjson")
+        def on_get(self, req, resp):
+            resp.media = iter(ITEMS)
+
+    class AsyncItems:
+        @api.validate(resp=Response(HTTP_200=Payload), stream_format="ndjson")
+        async def on_get(self, req, resp):
+            async def items():
+                for item in INVALID_ITEMS:
+                    yield item
+
+            resp.media = items()
+
+    app = FalconASGIApp() if asgi else falcon.App()
+    app.add_route("/items", AsyncItems() if asgi else Items())
+    api.register(app)
+    client = falcon_testing.TestClient(app)
+
+    resp = client.simulate_get("/items")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert parse_ndjson(resp.content) == (ITEMS[:1] if asgi else ITEMS)
+
+
+def test_falcon_asgi_sync_stream():
+    api = SpecTree("falcon-asgi")
+    threads: list = []
+
+    class SyncItems:
+        @api.validate(resp=Response(HTTP_200=Payload), stream_format="ndjson")
+        async def on_get(self, req, resp):
+            resp.media = sync_items(threads)
+
+    app = FalconASGIApp()
+    app.add_route("/items", SyncItems())
+    api.register(app)
+
+    resp = falcon_testing.TestClient(app).simulate_get("/items")
+    assert parse_ndjson(resp.content) == ITEMS
+    loop_thread, *item_threads = threads
+    assert loop_thread not in item_threads
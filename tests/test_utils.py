@@ -1,13 +1,25 @@
 import json
 from typing import Optional
 
+import msgspec
 import pytest
-from pydantic import BaseModel, computed_field
-
-from spectree.model_adapter import get_pydantic_model_adapter
+from pydantic import AliasChoices, AliasPath, BaseModel, Field, computed_field
+from starlette.datastructures import ImmutableMultiDict
+from werkzeug.datastructures import Headers, MultiDict
+
+from spectree import _types
+from spectree.model_adapter import (
+    get_msgspec_model_adapter,
+    get_pydantic_model_adapter,
+)
 from spectree.response import DEFAULT_CODE_DESC, Response
 from spectree.spec import SpecTree
 from spectree.utils import (
+    get_definition_digests,
+    get_multidict_items,
+    get_multidict_items_starlette,
+    get_multidict_plan,
+    get_projected_items,
     has_model,
     is_list_item,
     json_compatible_deepcopy,
@@ -293,18 +305,102 @@ def test_parse_params_with_route_param_keywords():
     ]
 
 
+def test_multidict_plan_list_keys():
+    class OptionalListQuery(BaseModel):
+        names: Optional[list[str]] = None
+        title: Optional[str] = None
+
+    assert {"names1", "names2"} <= get_multidict_plan(
+        DemoQuery, model_adapter
+    ).list_keys
+    assert get_multidict_plan(OptionalListQuery, model_adapter).list_keys == {"names"}
+    assert "uid" not in get_multidict_plan(DemoModel, model_adapter).list_keys
+
+
+def test_get_multidict_items_with_keys():
+    multidict = MultiDict([("a", "1"), ("b", "2"), ("b", "3"), ("c", "4")])
+
+    assert get_multidict_items(multidict) == {"a": "1", "b": ["2", "3"], "c": "4"}
+    assert get_multidict_items(multidict, keys=("a", "b", "missing")) == {
+        "a": "1",
+        "b": ["2", "3"],
+    }
+
+
+def test_deprecated_multidict_helpers():
+    class ListQuery(BaseModel):
+        names: list[str]
+        title: str = ""
+
+    multidict = MultiDict([("names", "a"), ("title", "b")])
+    with pytest.deprecated_call():
+        assert get_multidict_items(multidict, ListQuery) == {
+            "names": ["a"],
+            "title": "b",
+        }
+    with pytest.deprecated_call():
+        assert get_multidict_items_starlette(
+            ImmutableMultiDict([("names", "a"), ("title", "b")]), ListQuery
+        ) == {"names": ["a"], "title": "b"}
+    with pytest.deprecated_call():
+        assert _types.MultiDictStarlette is _types._MultiDictStarlette
+
+    with pytest.raises(TypeError):
+        get_multidict_items(multidict, ListQuery, ("names",))  # type: ignore[misc]
+
+
 def test_is_list_item():
     class OptionalListQuery(BaseModel):
         names: Optional[list[str]] = None
         title: Optional[str] = None
 
-    assert is_list_item("names1", DemoQuery)
-    assert is_list_item("names2", DemoQuery)
-    assert is_list_item("names", OptionalListQuery)
-    assert not is_list_item("uid", DemoModel)
-    assert not is_list_item("title", OptionalListQuery)
-    assert not is_list_item("missing", DemoQuery)
-    assert not is_list_item("names", None)
+    with pytest.deprecated_call():
+        assert is_list_item("names1", DemoQuery)
+        assert is_list_item("names2", DemoQuery)
+        assert is_list_item("names", OptionalListQuery)
+        assert not is_list_item("uid", DemoModel)
+        assert not is_list_item("title", OptionalListQuery)
+        assert not is_list_item("missing", DemoQuery)
+        assert not is_list_item("names", None)
+
+
+def test_multidict_plan():
+    class AliasQuery(BaseModel):
+        tags: list[str] = Field(alias="tag")
+        ids: Optional[list[int]] = Field(
+            None, validation_alias=AliasChoices("id", AliasPath("ids", 0))
+        )
+        title: str = ""
+
+    class RenamedQuery(msgspec.Struct, rename="camel"):
+        user_names: list[str]
+        title: str = ""
+
+    plan = get_multidict_plan(AliasQuery, get_pydantic_model_adapter())
+    assert plan.list_keys == {"tags", "tag", "ids", "id"}
+    assert plan.keys == {"tags", "tag", "ids", "id", "title"}
+    assert get_multidict_plan(AliasQuery, get_pydantic_model_adapter()) is plan
+
+    multidict = MultiDict([("tag", "a"), ("id", "1"), ("title", "t"), ("x", "y")])
+    assert plan.decode(multidict.items(multi=True)) == {
+        "tag": ["a"],
+        "id": ["1"],
+        "title": "t",
+    }
+    starlette_multidict = ImmutableMultiDict([("title", "a"), ("title", "b")])
+    assert plan.decode(starlette_multidict.multi_items()) == {"title": ["a", "b"]}
+
+    plan = get_multidict_plan(RenamedQuery, get_msgspec_model_adapter())
+    assert plan.list_keys == {"user_names", "userNames"}
+    assert plan.decode([("userNames", "a")]) == {"userNames": ["a"]}
+
+
+def test_get_projected_items():
+    headers = Headers({"Content-Type": "text/plain", "X-Request-Id": "abc"})
+
+    assert get_projected_items(headers.get, ("x-request-id", "missing")) == {
+        "x-request-id": "abc"
+    }
 
 
 def test_json_compatible_schema():
@@ -325,6 +421,49 @@ def test_json_compatible_schema():
     assert json.dumps(json_schema)
 
 
+def test_json_compatible_deepcopy_rewrites_refs():
+    schema = {
+        "$ref": "#/a",
+        "items": [{"$ref": "#/a"}, {"$ref": "#/b", "minimum": float("-inf")}],
+        "$defs": {"a": {"$ref": "#/a"}},
+    }
+
+    copied = json_compatible_deepcopy(schema, refs={"#/a": "#/A"})
+    assert copied == {
+        "$ref": "#/A",
+        "items": [{"$ref": "#/A"}, {"$ref": "#/b", "minimum": "-Infinity"}],
+        "$defs": {"a": {"$ref": "#/A"}},
+    }
+    assert schema["$ref"] == "#/a"
+
+
+def test_get_definition_digests():
+    template = "#/components/schemas/{model}"
+
+    def ref(key):
+        return {"$ref": template.format(model=key)}
+
+    country = {"type": "string"}
+    first = get_definition_digests(
+        {"Address": {"properties": {"c": ref("Country")}}, "Country": country},
+        template,
+    )
+    same = get_definition_digests(
+        {"Country": country, "Address": {"properties": {"c": ref("Country")}}},
+        template,
+    )
+    other_country = get_definition_digests(
+        {"Address": {"properties": {"c": ref("Country")}}, "Country": {}},
+        template,
+    )
+    assert first == same
+    assert first["Address"] != other_country["Address"]
+    assert first["Country"] != other_country["Country"]
+
+    cycle = get_definition_digests({"A": ref("B"), "B": ref("A")}, template)
+    assert cycle["A"] != cycle["B"]
+
+
 def test_get_model_schema_mode_parameter():
     """Test get_model_schema mode parameter for Pydantic v2"""
 